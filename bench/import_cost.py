@@ -0,0 +1,78 @@
+"""
+Measures import time and memory of the headless engine in fresh interpreters
+and fails when a budget is exceeded or tkinter/requests get pulled in.
+
+    python -m bench.import_cost
+    python -m bench.import_cost --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> (import time budget in ms, traced memory budget in KiB)
+BUDGETS = {
+    "src.engine": (5.0, 128),
+    "src.engine.domineering_game": (20.0, 1024),
+    "src.engine.move_codec": (20.0, 512),
+    "src.engine.solver": (50.0, 2048),
+    "dog_server.server": (300.0, 8192),
+}
+FORBIDDEN = ("tkinter", "requests")
+
+_PROBE = """
+import json, sys, time, tracemalloc
+tracemalloc.start()
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+current, peak = tracemalloc.get_traced_memory()
+print(json.dumps({{"ms": elapsed * 1000, "kib": peak / 1024,
+                  "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat=5):
+    """Best-of-`repeat` import time and peak traced memory of `module` in a new interpreter."""
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, forbidden=FORBIDDEN)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout))
+    best = min(samples, key=lambda s: s["ms"])
+    return {"module": module, "ms": round(best["ms"], 2), "kib": round(best["kib"], 1), "loaded": best["loaded"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless import cost check")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results, failures = [], []
+    for module, (ms_budget, kib_budget) in BUDGETS.items():
+        result = measure(module, args.repeat)
+        result.update(ms_budget=ms_budget, kib_budget=kib_budget)
+        results.append(result)
+        if result["loaded"]:
+            failures.append(f"{module} imports {', '.join(result['loaded'])}")
+        if result["ms"] > ms_budget:
+            failures.append(f"{module} took {result['ms']} ms (budget {ms_budget} ms)")
+        if result["kib"] > kib_budget:
+            failures.append(f"{module} used {result['kib']} KiB (budget {kib_budget} KiB)")
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    else:
+        for r in results:
+            print(f"{r['module']:32} {r['ms']:8.2f} ms {r['kib']:9.1f} KiB")
+        for failure in failures:
+            print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""
+Benchmark suite for the engine, rendering and network hot paths.
+
+Groups:
+- engine: Game.is_valid_move and place/undo throughput, random playouts/sec
+- perft: move-generation leaf counts (checked against known values) and nodes/sec
+- render: Board.refresh_board, preview_move and large-board panning on a stub canvas
+- proxy: DogProxy send/poll round trips against the local server, in-process
+
+Every metric has a direction (higher or lower is better). Results can be
+saved as a baseline and later runs compared against it; a metric that got
+worse by more than --threshold (a fraction) is a regression, and so is a
+wrong perft count. The exit code is 1 when there is either. Baselines are
+only comparable on the machine that recorded them, so none is checked in.
+
+    python -m bench.suite --save-baseline
+    python -m bench.suite --threshold 0.2
+    python -m bench.suite --only engine perft --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from threading import Thread
+
+from src.engine.domineering_game import Game
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "bench", "baseline.json")
+
+# (rows, cols, depth) -> leaf count with vertical moving first
+PERFT = {
+    (4, 4, 4): 3628,
+    (5, 5, 4): 57564,
+    (6, 6, 3): 19360,
+    (8, 8, 3): 146580,
+}
+
+
+def metric(name, value, unit, better):
+    return {"name": name, "value": round(value, 3), "unit": unit, "better": better}
+
+
+def best_time(fn, repeat):
+    """Fastest of `repeat` calls of fn(), in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def random_position(rows, cols, fill, seed):
+    """A reproducible position with about `fill` of the cells covered, vertical to move."""
+    game = Game(rows=rows, cols=cols)
+    rng = random.Random(seed)
+    target = int(rows * cols * fill) // 2
+    for _ in range(target * 8):
+        if len(game.history) >= target:
+            break
+        game.place_domino(rng.randrange(rows), rng.randrange(cols))
+        game.toggle_orientation()
+    game.current_orientation = game.VERTICAL
+    return game
+
+
+# engine
+
+def bench_engine(repeat):
+    results = []
+    for size in (8, 32, 256):
+        game = random_position(size, size, 0.3, seed=size)
+        cells = [(row, col) for row in range(size) for col in range(size)][:4096]
+        orientations = (game.VERTICAL, game.HORIZONTAL)
+
+        def validity():
+            for orientation in orientations:
+                for row, col in cells:
+                    game.is_valid_move(row, col, orientation)
+        elapsed = best_time(validity, repeat)
+        results.append(metric(f"engine.is_valid_move.{size}x{size}", 2 * len(cells) / elapsed, "calls/s", "higher"))
+
+        moves = game.legal_moves(game.VERTICAL)[:2000]
+
+        def place_undo():
+            for row, col in moves:
+                game.place_domino(row, col)
+                game.undo_move()
+        elapsed = best_time(place_undo, repeat)
+        results.append(metric(f"engine.place_undo.{size}x{size}", len(moves) / elapsed, "moves/s", "higher"))
+
+    for size, games in ((8, 200), (16, 40), (32, 8)):
+        def playouts():
+            rng = random.Random(size)
+            for _ in range(games):
+                game = Game(board_size=size)
+                while True:
+                    moves = game.legal_moves(game.current_orientation)
+                    if not moves:
+                        break
+                    game.place_domino(*rng.choice(moves))
+                    game.toggle_orientation()
+        elapsed = best_time(playouts, repeat)
+        results.append(metric(f"engine.playout.{size}x{size}", games / elapsed, "games/s", "higher"))
+    return results, []
+
+
+# perft
+
+def perft(game, depth):
+    """Leaf nodes of the move tree `depth` plies below the position, side to move alternating."""
+    moves = game.legal_moves(game.current_orientation)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    total = 0
+    for row, col in moves:
+        game.place_domino(row, col)
+        game.toggle_orientation()
+        total += perft(game, depth - 1)
+        game.undo_move()
+    return total
+
+
+def bench_perft(repeat):
+    results, failures = [], []
+    for (rows, cols, depth), expected in PERFT.items():
+        counts = []
+
+        def run():
+            counts.append(perft(Game(rows=rows, cols=cols), depth))
+        elapsed = best_time(run, repeat)
+        if counts[-1] != expected:
+            failures.append(f"perft {rows}x{cols} depth {depth}: {counts[-1]} nodes, expected {expected}")
+        results.append(metric(f"perft.{rows}x{cols}.d{depth}", expected / elapsed, "nodes/s", "higher"))
+    return results, failures
+
+
+# render
+
+class StubCanvas:
+    """Just enough of tk.Canvas for Board, keeping items in a dict so item counts stay realistic."""
+
+    def __init__(self, parent=None, width=0, height=0, **options):
+        self.width = width
+        self.height = height
+        self.items = {}
+        self.next_id = 0
+        self.x_origin = 0
+        self.y_origin = 0
+        self.region = (0, 0, width, height)
+        self.mark = (0, 0, 0, 0)
+
+    def _create(self, kind, coords, options):
+        self.next_id += 1
+        tags = options.get("tags", ())
+        self.items[self.next_id] = [kind, list(coords), (tags,) if isinstance(tags, str) else tuple(tags), options]
+        return self.next_id
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_image(self, *coords, **options):
+        return self._create("image", coords, options)
+
+    def delete(self, *targets):
+        for target in targets:
+            if isinstance(target, int):
+                self.items.pop(target, None)
+            else:
+                for item in [i for i, value in self.items.items() if target == "all" or target in value[2]]:
+                    del self.items[item]
+
+    def coords(self, item, *coords):
+        if coords:
+            self.items[item][1] = list(coords)
+        return self.items[item][1]
+
+    def itemconfig(self, item, **options):
+        self.items[item][3].update(options)
+
+    def configure(self, **options):
+        if "scrollregion" in options:
+            self.region = options["scrollregion"]
+            self._clamp()
+
+    def canvasx(self, x):
+        return self.x_origin + x
+
+    def canvasy(self, y):
+        return self.y_origin + y
+
+    def _clamp(self):
+        self.x_origin = max(0, min(self.x_origin, self.region[2] - self.width))
+        self.y_origin = max(0, min(self.y_origin, self.region[3] - self.height))
+
+    def xview_moveto(self, fraction):
+        self.x_origin = fraction * self.region[2]
+        self._clamp()
+
+    def yview_moveto(self, fraction):
+        self.y_origin = fraction * self.region[3]
+        self._clamp()
+
+    def scan_mark(self, x, y):
+        self.mark = (x, y, self.x_origin, self.y_origin)
+
+    def scan_dragto(self, x, y, gain=10):
+        mark_x, mark_y, x_origin, y_origin = self.mark
+        self.x_origin = x_origin - (x - mark_x) * gain
+        self.y_origin = y_origin - (y - mark_y) * gain
+        self._clamp()
+
+    def after(self, ms, callback, *args):
+        return None  # nothing runs later; the benchmark calls the deferred work itself
+
+    def after_cancel(self, job):
+        pass
+
+    def _ignore(self, *args, **options):
+        pass
+
+    pack = grid = bind = focus_set = destroy = tag_raise = tag_lower = _ignore
+    config = configure
+    itemconfigure = itemconfig
+
+
+class StubScrollbar:
+    def __init__(self, *args, **options):
+        pass
+
+    def _ignore(self, *args, **options):
+        pass
+
+    set = grid = destroy = _ignore
+
+
+class _Event:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def bench_render(repeat):
+    try:
+        import tkinter
+    except ImportError:
+        return [], ["render: tkinter is not available"]
+    from src import board as board_module
+
+    canvas, scrollbar = tkinter.Canvas, tkinter.Scrollbar
+    tkinter.Canvas, tkinter.Scrollbar = StubCanvas, StubScrollbar
+    try:
+        results = []
+
+        # Small board: one refresh per move of a whole random game
+        game = Game(board_size=8)
+        rng = random.Random(8)
+        history = []
+        while game.has_moves(game.current_orientation):
+            row, col = rng.choice(game.legal_moves(game.current_orientation))
+            history.append((row, col, game.current_orientation))
+            game.place_domino(row, col)
+            game.toggle_orientation()
+
+        def replay(board):
+            board.reset()
+            for row, col, orientation in history:
+                board.game.current_orientation = orientation
+                board.game.place_domino(row, col)
+                board.refresh_board()
+        board = board_module.Board(None, None, game=Game(board_size=8))
+        elapsed = best_time(lambda: replay(board), repeat)
+        results.append(metric("render.refresh_board.8x8", elapsed / len(history) * 1e6, "us/move", "lower"))
+
+        cells = [(row, col) for row in range(8) for col in range(8)]
+
+        def previews():
+            for row, col in cells:
+                board.preview_move(row, col, True)
+                board.preview_move(row, col, False)
+        elapsed = best_time(previews, repeat)
+        results.append(metric("render.preview_move.8x8", elapsed / (2 * len(cells)) * 1e6, "us/call", "lower"))
+
+        # Large board: refresh after moves in view, then pan across a filled board
+        board = board_module.Board(None, None, game=random_position(500, 500, 0.4, seed=500))
+        moves = [move for move in board.game.legal_moves(board.game.VERTICAL) if move[0] < 60 and move[1] < 60][:100]
+
+        def large_moves():
+            for row, col in moves:
+                board.game.place_domino(row, col)
+                board.refresh_board()
+                board.game.undo_move()
+                board.refresh_board()
+        board.game.current_orientation = board.game.VERTICAL
+        elapsed = best_time(large_moves, repeat)
+        results.append(metric("render.refresh_board.500x500", elapsed / (2 * len(moves)) * 1e6, "us/move", "lower"))
+
+        def pan():
+            board.canvas.xview_moveto(0)
+            board.canvas.yview_moveto(0)
+            board._sync_view()
+            for _ in range(60):
+                board._start_pan(_Event(300, 300))
+                board._pan(_Event(300 - 40, 300 - 25))
+                board._sync_view()
+        elapsed = best_time(pan, repeat)
+        results.append(metric("render.pan.500x500", elapsed / 61 * 1e3, "ms/frame", "lower"))
+        results.append(metric("render.items.500x500", len(board.canvas.items), "items", "lower"))
+        return results, []
+    finally:
+        tkinter.Canvas, tkinter.Scrollbar = canvas, scrollbar
+
+
+# proxy
+
+class _Recorder:
+    """Stands in for DogActor: counts what the proxy delivers."""
+
+    def __init__(self):
+        self.moves = 0
+
+    def receive_start(self, start_status):
+        pass
+
+    def receive_move(self, a_move):
+        self.moves += 1
+
+    def receive_withdrawal_notification(self):
+        pass
+
+
+class LocalServer:
+    """The local DOG server on its own event-loop thread, on a free port."""
+
+    def __enter__(self):
+        from dog_server.server import serve
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.loop.run_forever, name="bench-server", daemon=True)
+        self.thread.start()
+        self.server = asyncio.run_coroutine_threadsafe(serve("127.0.0.1", 0), self.loop).result()
+        host, port = self.server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}/"
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(5.0)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5.0)
+        self.loop.close()
+
+    async def _shutdown(self):
+        # Connection handlers end on their own once the clients hang up
+        self.server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if tasks:
+            await asyncio.wait(tasks, timeout=2.0)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def bench_proxy(repeat, games=None):
+    try:
+        from dog.dog_proxy import DogProxy
+        from dog.transport import DogTransport
+    except ImportError as error:
+        return [], [f"proxy: {error}"]
+
+    games = games or 5 * repeat
+    send, poll, round_trip = [], [], []
+    with LocalServer() as server:
+        proxies = []
+        for player_id in ("1", "2"):
+            proxy = DogProxy(transport=DogTransport(server.url, retries=0))
+            proxy.player_id, proxy.game_id, proxy.dog_actor = player_id, "bench", _Recorder()
+            proxy.status = 2  # registered, as after initialize()
+            proxy.register_player(f"bench{player_id}", player_id, "bench")
+            proxies.append(proxy)
+        rng = random.Random(5)
+        try:
+            for _ in range(games):
+                status = proxies[0].start_match(2)
+                if status.get_code() != "2":
+                    return [], [f"proxy: could not start a match ({status.get_message()})"]
+                proxies[1].start_status()
+                game = Game(board_size=8)
+                turn = 0
+                while game.has_moves(game.current_orientation):
+                    row, col = rng.choice(game.legal_moves(game.current_orientation))
+                    game.place_domino(row, col)
+                    game.toggle_orientation()
+                    last = not game.has_moves(game.current_orientation)
+                    mover, waiter = proxies[turn % 2], proxies[(turn + 1) % 2]
+                    move = {"row": row, "col": col, "orientation": game.VERTICAL if turn % 2 == 0 else game.HORIZONTAL,
+                            "match_status": "finished" if last else "next"}
+                    start = time.perf_counter()
+                    if mover.send_move(move) is None:
+                        return [], ["proxy: the server did not accept a legal move"]
+                    sent = time.perf_counter()
+                    if not waiter.match_status():
+                        return [], ["proxy: a move was sent but never seen by the opponent"]
+                    done = time.perf_counter()
+                    send.append(sent - start)
+                    poll.append(done - sent)
+                    round_trip.append(done - start)
+                    turn += 1
+        finally:
+            for proxy in proxies:
+                proxy.transport.close()
+
+    results = []
+    for name, samples in (("send_move", send), ("match_status", poll), ("round_trip", round_trip)):
+        results.append(metric(f"proxy.{name}.p50", percentile(samples, 0.50) * 1e3, "ms", "lower"))
+        results.append(metric(f"proxy.{name}.p99", percentile(samples, 0.99) * 1e3, "ms", "lower"))
+    return results, []
+
+
+GROUPS = {
+    "engine": bench_engine,
+    "perft": bench_perft,
+    "render": bench_render,
+    "proxy": bench_proxy,
+}
+
+
+def compare(results, baseline, threshold):
+    """Regressions of `results` against a baseline {name: metric}: worse by more than threshold."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if base is None or not base["value"]:
+            continue
+        change = result["value"] / base["value"] - 1
+        if result["better"] == "lower":
+            change = -change
+        result["change"] = round(change, 4)
+        if change < -threshold:
+            regressions.append(f"{result['name']}: {result['value']} {result['unit']} "
+                               f"(baseline {base['value']}, {change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine, rendering and network benchmarks")
+    parser.add_argument("--only", nargs="+", choices=sorted(GROUPS), help="run only these groups")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark; the fastest counts")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="largest allowed slowdown against the baseline, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results, failures = [], []
+    for group in args.only or GROUPS:
+        group_results, group_failures = GROUPS[group](args.repeat)
+        results.extend(group_results)
+        failures.extend(group_failures)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = {m["name"]: m for m in json.load(f)["results"]}
+    regressions = compare(results, baseline, args.threshold)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "threshold": args.threshold,
+        },
+        "results": results,
+        "failures": failures,
+        "regressions": regressions,
+    }
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": report["meta"], "results": results}, f, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for r in results:
+            change = f"{r['change']:+8.1%}" if "change" in r else ""
+            print(f"{r['name']:34} {r['value']:14.3f} {r['unit']:9} {change}")
+        for failure in failures:
+            print("FAIL:", failure)
+        for regression in regressions:
+            print("REGRESSION:", regression)
+        if not baseline and not args.save_baseline:
+            print(f"No baseline at {args.baseline}; record one with --save-baseline")
+    sys.exit(1 if failures or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
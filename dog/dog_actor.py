@@ -3,10 +3,13 @@ from dog.polling_thread import PollingThread
 
 
 class DogActor:
-    def __init__(self):
+    def __init__(self, dispatch=None):
         super().__init__()
         self.proxy = DogProxy()
         self.player_actor = None
+        # Server events arrive on the polling thread. dispatch(callback, *args), when
+        # given, must run the callback on the UI thread (see src.dispatcher.UiDispatcher)
+        self.dispatch = dispatch
         self.polling_thread = PollingThread(self.proxy, True)
 
     def initialize(self, player_name, a_player_actor):
@@ -15,17 +18,43 @@ class DogActor:
         self.polling_thread.start()
         return resp_dict
 
+    def reconnect(self, player_name):
+        """Register again after a failed attempt; the polling thread is already running."""
+        message = self.proxy.initialize(player_name, self)
+        self.polling_thread.wake()
+        return message
+
+    def stop(self):
+        """Stop polling and release the server connections."""
+        self.polling_thread.stop(timeout=1.0)
+        self.proxy.transport.close()
+
     def start_match(self, number_of_players):
         return self.proxy.start_match(number_of_players)
 
     def send_move(self, move):
-        self.proxy.send_move(move)
+        """Send a local move; None when the server did not accept it."""
+        return self.proxy.send_move(move)
+
+    def resync(self):
+        """Rebuild the match from the server; done on the polling thread, which is woken up for it."""
+        self.proxy.resync_pending = True
+        self.polling_thread.wake()
+
+    def _deliver(self, callback, *args):
+        if self.dispatch is None:
+            callback(*args)
+        else:
+            self.dispatch(callback, *args)
 
     def receive_start(self, start_status):
-        self.player_actor.receive_start(start_status)
+        self._deliver(self.player_actor.receive_start, start_status)
 
     def receive_move(self, a_move):
-        self.player_actor.receive_move(a_move)
+        self._deliver(self.player_actor.receive_move, a_move)
+
+    def receive_snapshot(self, snapshot, moves):
+        self._deliver(self.player_actor.receive_snapshot, snapshot, moves)
 
     def receive_withdrawal_notification(self):
-        self.player_actor.receive_withdrawal_notification()
+        self._deliver(self.player_actor.receive_withdrawal_notification)
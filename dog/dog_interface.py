@@ -9,5 +9,8 @@ class DogPlayerInterface:
     def receive_move(self, a_move):
         print("O método receive_move() precisa ser sobrescrito")
 
+    def receive_snapshot(self, snapshot, moves):
+        print("O método receive_snapshot() precisa ser sobrescrito")
+
     def receive_withdrawal_notification(self):
         print("O método receive_withdrawal_notification() precisa ser sobrescrito")
@@ -1,12 +1,20 @@
 import json
+import os
 from urllib.parse import urldefrag
 import requests
 from dog.start_status import StartStatus
+from dog.transport import DogTransport
+from src.engine.move_codec import MATCH_STATUSES, MoveFormatError, decode_snapshot, encode_move, parse_move
+
+COMPACT_FIELDS = {"row", "col", "orientation", "order", "match_status"}
 
 
 class DogProxy:
-    def __init__(self):
+    def __init__(self, transport=None, wire_format=None):
         super().__init__()
+        self.transport = transport if transport is not None else DogTransport()
+        # "json" works with any DOG server; "compact" needs one that understands src.engine.move_codec
+        self.wire_format = wire_format or os.environ.get("DOG_WIRE_FORMAT", "json")
         self.dog_actor = None
         self.player_id = 0
         self.player_name = ""
@@ -14,7 +22,16 @@ class DogProxy:
         self.status = 0
         # 0 - file game.id not found; 1 - not connected to server; 2 - connected without match; 3 - waiting move (even if it's the local player's turn)
         self.move_order = 0
-        self.url = "https://api-dog-server.herokuapp.com/"
+        self.url = self.transport.base_url
+        # True while the local player has to move, so there is nothing to poll for
+        self.local_turn = False
+        # None until the server has been probed for the long-poll endpoint
+        self.long_poll_supported = None
+        # None until the server has been probed for match/sync/
+        self.sync_supported = None
+        # Set when the board has to be rebuilt from the server; the poller then calls resync()
+        self.resync_pending = False
+        self.poller = None  # PollingThread, woken up after each local move
 
     def get_status(self):
         return self.status
@@ -32,7 +49,11 @@ class DogProxy:
             self.status = 0
             return "Arquivo de configuração do jogo não encontrado"
         config_file.close()
-        resp = self.register_player(self.player_name, self.player_id, self.game_id)
+        try:
+            resp = self.register_player(self.player_name, self.player_id, self.game_id)
+        except requests.RequestException:
+            self.status = 1
+            return "Você está sem conexão"
         result = resp.status_code
         if result == 200:
             resp_json = resp.text
@@ -40,6 +61,7 @@ class DogProxy:
             resp1 = resp_dict["0"]
             resp2 = resp_dict["1"]
             self.status = 2
+            self.resync_pending = True  # a restarted client may still be in a match
             message = "Conectado a Dog Server"
         else:
             self.status = 1
@@ -47,21 +69,24 @@ class DogProxy:
         return message
 
     def generate_player_id(self):
+        if os.environ.get("DOG_PLAYER_ID"):
+            return os.environ["DOG_PLAYER_ID"]  # keep the same id across restarts, to resume a match
         from time import time
         milliseconds = int(time() * 1000)
         an_id = str(milliseconds - 1639872000000)
         return an_id
 
     def register_player(self, a_player_name, a_player_id, a_game_id):
-        url = self.url + "player/"
         post_data = {"player_name": a_player_name, "player_id": a_player_id, "game_id": a_game_id}
-        resp = requests.post(url, data=post_data)
+        resp = self.transport.post("player/", post_data, idempotent=True)
         return resp
 
     def start_match(self, number_of_players):
-        url = self.url + "start/"
         post_data = {"player_id": self.player_id, "game_id": self.game_id, "number_of_players": number_of_players}
-        resp = requests.post(url, data=post_data)
+        try:
+            resp = self.transport.post("start/", post_data)
+        except requests.RequestException:
+            return StartStatus("0", "Voce está offline", [], self.player_id)
         result = resp.status_code
         if result == 200:
             resp_json = resp.text
@@ -73,14 +98,27 @@ class DogProxy:
             if code == "2":
                 self.status = 3
                 self.move_order = 0
+                self.local_turn = self.local_player_starts(players)
+                if self.poller is not None:
+                    self.poller.wake()
         else:
             start_status = StartStatus("0", "Voce está offline", [], self.player_id)
         return start_status
 
+    def local_player_starts(self, players):
+        """True when the first entry of the match's player list is the local player."""
+        try:
+            return str(players[0][1]) == str(self.player_id)
+        except (IndexError, KeyError, TypeError):
+            return False
+
     def start_status(self):
-        url = self.url + "started/"
+        """Poll for a match started by another player. Returns True if one started."""
         post_data = {"player_id": self.player_id, "game_id": self.game_id}
-        resp = requests.post(url, data=post_data)
+        try:
+            resp = self.transport.post("started/", post_data, idempotent=True)
+        except requests.RequestException:
+            return False  # try again on the next poll
         result = resp.status_code
         if result == 200 and self.status == 2:
             resp_json = resp.text
@@ -92,40 +130,130 @@ class DogProxy:
                 start_status = StartStatus(code, message, players, self.player_id)
                 self.status = 3
                 self.move_order = 0
+                self.local_turn = self.local_player_starts(players)
                 self.dog_actor.receive_start(start_status)
+                return True
+        return False
+
+    def encode_move(self, a_move):
+        """Wire text for a move: compact when enabled and the move fits, JSON otherwise."""
+        if self.wire_format == "compact" and "row" in a_move and set(a_move) <= COMPACT_FIELDS:
+            return encode_move(a_move["row"], a_move["col"], a_move["orientation"],
+                               a_move.get("order", self.move_order + 1), a_move["match_status"])
+        return json.dumps(a_move)  # convert move to json
 
     def send_move(self, a_move):
-        url = self.url + "move/"
-        json_move = json.dumps(a_move)  # convert move to json
-        post_data = {"player_id": self.player_id, "game_id": self.game_id, "move": json_move}
-        resp = requests.post(url, data=post_data)
+        """
+        Send a local move. Returns the server's answer, or None when the move
+        was not accepted (network error or non-200 reply); the turn then
+        stays with the local player so the move can be sent again.
+        """
+        post_data = {"player_id": self.player_id, "game_id": self.game_id, "move": self.encode_move(a_move)}
+        try:
+            resp = self.transport.post("move/", post_data)
+        except requests.RequestException:
+            return None
+        if resp.status_code != 200:
+            return None
+        self.move_order += 1  # our move took the next order, so a later gap means missed moves
+        self.local_turn = False
         if a_move["match_status"] == "next":
             self.status = 3  #   pass the turn and start looking for a move
         elif a_move["match_status"] == "finished":
             self.status = 2  #   connected without match
+        if self.poller is not None:
+            self.poller.wake()  #   the reply is most likely soon
         return resp.text
 
-    def match_status(self):
-        url = self.url + "match/"
+    def match_status(self, wait=None):
+        """
+        Poll for the opponent's move. With wait (seconds) and a server that
+        offers match/wait/, the request is held open until a move arrives or
+        the wait expires. Returns True when a move or withdrawal was handled,
+        False when there was nothing new and None when the request failed.
+        """
         post_data = {"player_id": self.player_id, "game_id": self.game_id}
-        resp = requests.post(url, data=post_data)
+        try:
+            if wait and self.long_poll_supported is not False:
+                post_data["timeout"] = wait
+                resp = self.transport.post("match/wait/", post_data, read_timeout=wait + self.transport.timeout[1])
+                if resp.status_code == 404:
+                    self.long_poll_supported = False
+                    return False
+                self.long_poll_supported = True
+            else:
+                resp = self.transport.post("match/", post_data, idempotent=True)
+        except requests.RequestException:
+            return None  # try again on the next poll
         resp_json = resp.text
-        seek_result = json.loads(resp_json)
+        try:
+            seek_result = json.loads(resp_json)
+            #   move is contained in seek_result as a compact or JSON string
+            move_dictionary = parse_move(seek_result["1"]) if seek_result else {}
+            if move_dictionary:
+                #   the server is not trusted: check what is read below before acting on any of it
+                move_dictionary.setdefault("player", str(seek_result.get("0", "")))
+                match_status = move_dictionary["match_status"]
+                if match_status not in MATCH_STATUSES:
+                    raise MoveFormatError(f"unknown match status {match_status!r}")
+                if match_status != "interrupted":
+                    move_player_order = int(move_dictionary["order"])
+        except (MoveFormatError, ValueError, KeyError, TypeError, AttributeError):
+            return None
         if bool(seek_result):
-            move_dictionary = eval(
-                seek_result["1"]
-            )  #   move is contained in seek_result as a string (to be converted in dictionary)
             if bool(move_dictionary):
-                match_status = move_dictionary["match_status"]
                 if match_status == "interrupted":  #  an opponent has abandoned the match
                     self.dog_actor.receive_withdrawal_notification()
                     self.status = 2
+                    return True
                 else:
                     move_player_id = move_dictionary["player"]
-                    move_player_order = move_dictionary["order"]
-                    if move_player_id != str(self.player_id):  #  not from the player himself
-                        if int(move_player_order) > self.move_order:  #  not an already handled move
-                            self.move_order = int(move_player_order)
+                    if str(move_player_id) != str(self.player_id):  #  not from the player himself
+                        if move_player_order > self.move_order + 1 and self.sync_supported is not False:
+                            # Moves were missed (e.g. polls lost while offline): rebuild from a snapshot
+                            synced = self.resync()
+                            if synced is not None:
+                                return synced
+                        if move_player_order > self.move_order:  #  not an already handled move
+                            self.move_order = move_player_order
+                            self.local_turn = match_status == "next"
                             self.dog_actor.receive_move(move_dictionary)
-                            if move_dictionary["match_status"] == "finished":
+                            if match_status == "finished":
                                 self.status = 2
+                            return True
+        return False
+
+    def resync(self):
+        """
+        Rebuild the local match from the server in one request: a position
+        snapshot plus the moves after move_order, instead of replaying the
+        match. Returns True when a match was restored, False when the server
+        has none for this player and None when the request failed or the
+        server does not offer match/sync/.
+        """
+        self.resync_pending = False
+        post_data = {"player_id": self.player_id, "game_id": self.game_id, "since": self.move_order}
+        try:
+            resp = self.transport.post("match/sync/", post_data, idempotent=True)
+        except requests.RequestException:
+            return None
+        if resp.status_code == 404:
+            self.sync_supported = False
+            return None
+        self.sync_supported = True
+        try:
+            sync = json.loads(resp.text)
+            if not sync:
+                return False
+            snapshot = decode_snapshot(sync["snapshot"])
+            order = int(sync["order"])
+            moves = [parse_move(text) for _, text in sync["moves"]]
+        except (MoveFormatError, ValueError, KeyError, TypeError):
+            return None
+        if sync["finished"] and self.status != 3:
+            return False  # nothing to resume; a match in progress here still gets its final position
+        self.move_order = order
+        self.status = 2 if sync["finished"] else 3
+        self.local_turn = not sync["finished"] and str(sync["turn"]) == str(self.player_id)
+        self.dog_actor.receive_snapshot(snapshot, moves)
+        return True
@@ -1,17 +1,69 @@
-from threading import Thread
 import time
+from threading import Thread, Event
+from src.engine import metrics
 
 
 class PollingThread(Thread):
-    def __init__(self, a_proxy, daemon_value):
+    """
+    Polls the DOG server with an adaptive interval: min_interval right after
+    something happened (or after a local move), growing by backoff_factor up
+    to max_interval while nothing changes, and no requests at all while it is
+    the local player's turn. When the server offers long polling, waiting
+    for the opponent's move is done with held-open requests instead.
+    """
+
+    def __init__(self, a_proxy, daemon_value, min_interval=0.1, max_interval=2.0,
+                 backoff_factor=1.5, long_poll_timeout=20.0):
         Thread.__init__(self, daemon=daemon_value)
         self.proxy = a_proxy
+        self.proxy.poller = self
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.long_poll_timeout = long_poll_timeout
+        self.interval = min_interval
+        self._wake_event = Event()
+        self._stop_event = Event()
 
     def run(self):
-        while True:
+        while not self._stop_event.is_set():
+            metrics.count("dog.poll.iterations")
             status = self.proxy.get_status()
-            if status == 2:  #   connected without match
-                self.proxy.start_status()
-            elif status == 3:  #   waiting remote move
-                self.proxy.match_status()
-            time.sleep(1)  # Sleep for 1 second
+            if self.proxy.resync_pending and status >= 2:
+                changed = self.proxy.resync()
+            elif status == 2:  #   connected without match
+                changed = self.proxy.start_status()
+            elif status == 3 and not self.proxy.local_turn:  #   waiting remote move
+                if self.long_poll_timeout and self.proxy.long_poll_supported is not False:
+                    started = time.monotonic()
+                    changed = self.proxy.match_status(wait=self.long_poll_timeout)
+                    held = time.monotonic() - started >= self.long_poll_timeout / 2
+                    if self.proxy.long_poll_supported and (changed or (changed is not None and held)):
+                        continue  # the server already did the waiting
+                else:
+                    changed = self.proxy.match_status()
+            else:
+                # Our turn, or offline: sleep until a local move wakes us up
+                self._wake_event.wait()
+                self._wake_event.clear()
+                continue
+
+            if changed:
+                metrics.count("dog.poll.changes")
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+    def wake(self):
+        """Poll again right away, starting over from the shortest interval."""
+        self.interval = self.min_interval
+        self._wake_event.set()
+
+    def stop(self, timeout=None):
+        """Ask the loop to exit and wait for it (an in-flight request may finish first)."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self.is_alive():
+            self.join(timeout)
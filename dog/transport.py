@@ -0,0 +1,62 @@
+import os
+import random
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from src.engine import metrics
+
+DEFAULT_URL = "https://api-dog-server.herokuapp.com/"
+RETRY_STATUS = (502, 503, 504)
+
+
+class DogTransport:
+    """
+    HTTP transport for the DOG server: one keep-alive connection pool shared
+    by every call, connect/read timeouts on every request and bounded retries
+    with jittered exponential backoff for idempotent calls.
+
+    The base URL can be passed in or set with the DOG_SERVER_URL environment
+    variable, e.g. to talk to a local stand-in server.
+    """
+
+    def __init__(self, base_url=None, connect_timeout=3.05, read_timeout=10.0,
+                 retries=3, backoff=0.25, pool_size=4):
+        base_url = base_url or os.environ.get("DOG_SERVER_URL", DEFAULT_URL)
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, endpoint, data, idempotent=False, read_timeout=None):
+        """
+        POST form data to base_url + endpoint and return the response.
+        Only idempotent calls are retried; errors of the last attempt propagate
+        as requests.RequestException.
+        """
+        url = self.base_url + endpoint
+        timeout = self.timeout if read_timeout is None else (self.timeout[0], read_timeout)
+        attempts = 1 + self.retries if idempotent else 1
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                resp = self.session.post(url, data=data, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.count("dog.http.errors")
+                if last:
+                    raise
+            else:
+                if last or resp.status_code not in RETRY_STATUS:
+                    return resp
+            metrics.count("dog.http.retries")
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def close(self):
+        self.session.close()
+
+
+# Per endpoint, including retries and backoff
+metrics.instrument(DogTransport, "post", "dog.http", key=lambda self, endpoint, *args, **kwargs: endpoint)
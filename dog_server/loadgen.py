@@ -0,0 +1,178 @@
+"""
+Load generator for the local DOG server.
+
+Drives N headless clients (N/2 concurrent pairs) through complete random
+games over keep-alive connections, the receiving side waiting on match/wait/
+like the real client, and reports request latency percentiles and matches/sec.
+
+    python -m dog_server.loadgen --clients 2000 --games 5
+    python -m dog_server.loadgen --host 127.0.0.1 --port 8000 --clients 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlencode
+from src.engine.domineering_game import Game
+
+
+class LoadClient:
+    """One headless player with its own persistent HTTP/1.1 connection."""
+
+    def __init__(self, host, port, player_id, latencies):
+        self.host = host
+        self.port = port
+        self.player_id = player_id
+        self.latencies = latencies
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def post(self, path, form):
+        body = urlencode(form).encode("utf-8")
+        start = time.perf_counter()
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/x-www-form-urlencoded\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length)) if length else {}
+        if path != "/match/wait/":  # long polls measure the opponent, not the server
+            self.latencies.setdefault(path, []).append(time.perf_counter() - start)
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def play_pair(pair_id, host, port, games, board_size, latencies, rng):
+    """Register two clients and play `games` random games between them."""
+    game_id = f"load-{pair_id}"
+    clients = [LoadClient(host, port, f"{pair_id}-{i}", latencies) for i in range(2)]
+    finished = 0
+    try:
+        for client in clients:
+            await client.connect()
+            await client.post("/player/", {"player_name": client.player_id,
+                                           "player_id": client.player_id, "game_id": game_id})
+        for number in range(games):
+            first, second = clients if number % 2 == 0 else clients[::-1]
+            _, resp = await first.post("/start/", {"player_id": first.player_id, "game_id": game_id,
+                                                   "number_of_players": 2})
+            if resp.get("code") != "2":
+                raise RuntimeError(f"pair {pair_id}: match did not start ({resp})")
+            while (await second.post("/started/", {"player_id": second.player_id,
+                                                   "game_id": game_id}))[1].get("code") != "2":
+                await asyncio.sleep(0.01)
+
+            # The player who started the match plays vertical and moves first
+            game = Game(board_size=board_size)
+            mover, waiter = first, second
+            while True:
+                moves = game.legal_moves(game.current_orientation)
+                row, col = rng.choice(moves)
+                game.place_domino(row, col)
+                orientation = game.current_orientation
+                game.toggle_orientation()
+                done = not game.legal_moves(game.current_orientation)
+                move = {"row": row, "col": col, "orientation": orientation,
+                        "match_status": "finished" if done else "next"}
+                status, _ = await mover.post("/move/", {"player_id": mover.player_id, "game_id": game_id,
+                                                        "move": json.dumps(move)})
+                if status != 200:
+                    raise RuntimeError(f"pair {pair_id}: move rejected with {status}")
+                await waiter.post("/match/wait/", {"player_id": waiter.player_id, "game_id": game_id,
+                                                   "timeout": 5})
+                if done:
+                    break
+                mover, waiter = waiter, mover
+            finished += 1
+    finally:
+        for client in clients:
+            client.close()
+    return finished
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_load(host, port, clients, games, board_size, seed=0):
+    """Run the load and return a report dict."""
+    latencies = {}
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        play_pair(pair, host, port, games, board_size, latencies, random.Random(rng.random()))
+        for pair in range(clients // 2)
+    ), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    matches = sum(r for r in results if isinstance(r, int))
+    errors = [r for r in results if isinstance(r, BaseException)]
+    every = [x for samples in latencies.values() for x in samples]
+    report = {
+        "clients": clients,
+        "matches": matches,
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "matches_per_s": round(matches / elapsed, 2) if elapsed else 0.0,
+        "requests": len(every),
+        "p50_ms": round(percentile(every, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(every, 0.99) * 1000, 3),
+        "endpoints": {
+            path: {"count": len(samples),
+                   "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+                   "p99_ms": round(percentile(samples, 0.99) * 1000, 3)}
+            for path, samples in sorted(latencies.items())
+        },
+    }
+    if errors:
+        report["first_error"] = repr(errors[0])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the local DOG server")
+    parser.add_argument("--host", default=None, help="server host (default: run a server in-process)")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--clients", type=int, default=200, help="number of headless clients (pairs = clients / 2)")
+    parser.add_argument("--games", type=int, default=3, help="games per pair")
+    parser.add_argument("--board-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async def run():
+        if args.host is None:
+            from dog_server.server import serve
+            server = await serve("127.0.0.1", 0, args.board_size)
+            host, port = server.sockets[0].getsockname()[:2]
+        else:
+            server, host, port = None, args.host, args.port
+        try:
+            return await run_load(host, port, args.clients, args.games, args.board_size, args.seed)
+        finally:
+            if server is not None:
+                server.close()
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Local DOG-compatible match server.
+
+Speaks the form-encoded POST protocol used by dog.dog_proxy.DogProxy
+(player/, start/, started/, move/, match/, the long-poll match/wait/ and
+match/sync/ for reconnecting clients) on plain asyncio streams, so one
+process can hold thousands of matches.
+
+    python -m dog_server.server --port 8000
+    DOG_SERVER_URL=http://127.0.0.1:8000/ python main.py
+"""
+import argparse
+import asyncio
+import json
+from collections import deque
+from urllib.parse import parse_qs
+from src.engine.domineering_game import Game
+from src.engine.move_codec import MoveFormatError, encode_move, encode_snapshot, is_compact, parse_move
+
+MAX_HEADER_BYTES = 16384
+MAX_BODY_BYTES = 65536
+MAX_WAIT = 60.0
+RECENT_MOVES = 16  # moves kept per match for match/sync/
+
+
+class Player:
+    __slots__ = ("player_id", "name", "game_id", "match", "notified")
+
+    def __init__(self, player_id, name, game_id):
+        self.player_id = player_id
+        self.name = name
+        self.game_id = game_id
+        self.match = None  # current or most recently finished Match
+        self.notified = False  # has this player seen the start of its match
+
+    def in_match(self):
+        return self.match is not None and not self.match.finished
+
+
+class Match:
+    """One match: its players in turn order, a compact Game and the latest moves."""
+
+    __slots__ = ("players", "game", "order", "turn", "last_move", "last_player", "recent", "finished", "changed")
+
+    def __init__(self, players, board_size):
+        self.players = players
+        self.game = Game(board_size=board_size)
+        self.order = 0  # number of moves published
+        self.turn = 0  # number of times the turn was passed
+        self.last_move = None  # JSON text of the latest move, as sent back by match/
+        self.last_player = None
+        self.recent = deque(maxlen=RECENT_MOVES)  # (order, player_id, move text)
+        self.finished = False
+        self.changed = asyncio.Event()
+
+    def player_list(self):
+        return [[p.name, p.player_id, str(i + 1)] for i, p in enumerate(self.players)]
+
+    def to_move(self):
+        return self.players[self.turn % len(self.players)]
+
+    def publish(self, move, player_id, compact=False):
+        """Record a move and wake everyone long-polling on this match."""
+        self.order += 1
+        if move["match_status"] == "next":
+            self.turn += 1
+        if compact:
+            # The player travels in the "0" field of match/ answers
+            self.last_move = encode_move(move["row"], move["col"], move["orientation"],
+                                         self.order, move["match_status"])
+        else:
+            move["player"] = player_id
+            move["order"] = self.order
+            self.last_move = json.dumps(move)
+        self.last_player = player_id
+        self.recent.append((self.order, player_id, self.last_move))
+        # The first player places vertical dominoes, so snapshots carry the right side to move
+        self.game.current_orientation = Game.VERTICAL if self.to_move() is self.players[0] else Game.HORIZONTAL
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class DogServer:
+    """Match bookkeeping and the protocol endpoints, independent of the HTTP layer."""
+
+    def __init__(self, board_size=8):
+        self.board_size = board_size
+        self.players = {}
+        self.waiting = {}  # game_id -> players registered and not in a match
+        self.matches_started = 0
+        self.matches_finished = 0
+
+    def handle(self, path, form):
+        handler = self.routes.get(path)
+        if handler is None:
+            return 404, {"message": "not found"}
+        return handler(self, form)
+
+    def _player(self, form):
+        return self.players.get(form.get("player_id", ""))
+
+    def register(self, form):
+        player_id = form.get("player_id", "")
+        game_id = form.get("game_id", "")
+        if not player_id or not game_id:
+            return 400, {"message": "player_id e game_id são obrigatórios"}
+        player = self.players.get(player_id)
+        if player is None:
+            player = self.players[player_id] = Player(player_id, form.get("player_name", ""), game_id)
+        if not player.in_match():
+            self.waiting.setdefault(game_id, {})[player_id] = player
+        return 200, {"0": player_id, "1": "Conectado"}
+
+    def start(self, form):
+        player = self._player(form)
+        if player is None:
+            return 200, {"code": "0", "message": "Jogador não registrado", "players": []}
+        try:
+            wanted = int(form.get("number_of_players", "2"))
+        except ValueError:
+            wanted = 2
+        idle = self.waiting.get(player.game_id, {})
+        others = [p for pid, p in idle.items() if pid != player.player_id][:wanted - 1]
+        if player.in_match() or len(others) < wanted - 1:
+            return 200, {"code": "1", "message": "Jogadores insuficientes", "players": []}
+
+        match = Match([player] + others, self.board_size)
+        for p in match.players:
+            idle.pop(p.player_id, None)
+            p.match = match
+            p.notified = False
+        player.notified = True
+        self.matches_started += 1
+        return 200, {"code": "2", "message": "Partida iniciada", "players": match.player_list()}
+
+    def started(self, form):
+        player = self._player(form)
+        if player is None or not player.in_match() or player.notified:
+            return 200, {"code": "1", "message": "Aguardando partida", "players": []}
+        player.notified = True
+        return 200, {"code": "2", "message": "Partida iniciada", "players": player.match.player_list()}
+
+    def move(self, form):
+        player = self._player(form)
+        if player is None or player.match is None:
+            return 400, {"message": "Jogador fora de partida"}
+        match = player.match
+        if match.finished:
+            return 400, {"message": "Partida encerrada"}
+        text = form.get("move", "")
+        try:
+            move = parse_move(text)
+        except MoveFormatError:
+            return 400, {"message": "Jogada inválida"}
+        if not isinstance(move, dict) or move.get("match_status") not in ("next", "progress", "finished", "interrupted"):
+            return 400, {"message": "Jogada inválida"}
+
+        if move["match_status"] != "interrupted":
+            if match.to_move() is not player:
+                return 409, {"message": "Não é a sua vez"}
+            # Only a withdrawal may come without a placement; anything else would skip a turn
+            if "row" not in move or "col" not in move:
+                return 400, {"message": "Jogada inválida"}
+            error = self._apply(match, player, move)
+            if error:
+                return 400, {"message": error}
+        match.publish(move, player.player_id, compact=is_compact(text))
+        if move["match_status"] in ("finished", "interrupted"):
+            self._end(match)
+        return 200, {"message": "ok"}
+
+    def _apply(self, match, player, move):
+        """Validate a placement server-side and play it on the match's Game."""
+        game = match.game
+        orientation = game.VERTICAL if match.players.index(player) == 0 else game.HORIZONTAL
+        try:
+            row, col = int(move["row"]), int(move["col"])
+        except (KeyError, TypeError, ValueError):
+            return "Jogada inválida"
+        if move.get("orientation", orientation) != orientation or not game.is_valid_move(row, col, orientation):
+            return "Jogada ilegal"
+        game.current_orientation = orientation
+        game.place_domino(row, col)
+        return None
+
+    def _end(self, match):
+        # Players keep a reference to the finished match so the last move can still be read
+        match.finished = True
+        self.matches_finished += 1
+        for p in match.players:
+            self.waiting.setdefault(p.game_id, {})[p.player_id] = p
+
+    def match_status(self, form):
+        player = self._player(form)
+        match = player.match if player is not None else None
+        if match is None or match.last_move is None:
+            return 200, {}
+        return 200, {"0": match.last_player, "1": match.last_move}
+
+    async def wait_match_status(self, form):
+        """match/wait/: hold the request until the opponent moves or the timeout expires."""
+        player = self._player(form)
+        match = player.match if player is not None else None
+        try:
+            timeout = min(float(form.get("timeout", "20")), MAX_WAIT)
+        except ValueError:
+            timeout = 20.0
+        if match is not None and not match.finished and match.to_move() is not player:
+            try:
+                await asyncio.wait_for(match.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if match is None or match.last_move is None:
+            return 200, {}
+        return 200, {"0": match.last_player, "1": match.last_move}
+
+    def sync(self, form):
+        """
+        match/sync/: everything a reconnecting client needs in one answer: the
+        position as a snapshot and the moves published after `since` that are
+        still in the recent log (for their statuses; the board is the snapshot).
+        """
+        player = self._player(form)
+        match = player.match if player is not None else None
+        if match is None:
+            return 200, {}
+        try:
+            since = int(form.get("since", "0"))
+        except ValueError:
+            since = 0
+        return 200, {
+            "order": match.order,
+            "snapshot": encode_snapshot(match.game.snapshot(match.order)),
+            "players": match.player_list(),
+            "turn": match.to_move().player_id,
+            "finished": match.finished,
+            "moves": [[player_id, text] for order, player_id, text in match.recent if order > since],
+        }
+
+    routes = {
+        "/player/": register,
+        "/start/": start,
+        "/started/": started,
+        "/move/": move,
+        "/match/": match_status,
+        "/match/sync/": sync,
+    }
+
+
+class HttpFrontend:
+    """Minimal keep-alive HTTP/1.1 front end for DogServer on asyncio streams."""
+
+    def __init__(self, server):
+        self.server = server
+        self.requests = 0
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"message": "bad content-length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"message": "payload too large"}, False)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                try:
+                    form = {k: v[0] for k, v in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()}
+                except UnicodeDecodeError:
+                    await self._respond(writer, 400, {"message": "body is not UTF-8"}, False)
+                    break
+                path = target.split("?", 1)[0]
+                if not path.endswith("/"):
+                    path += "/"
+                self.requests += 1
+                if method != "POST":
+                    status, payload = 405, {"message": "method not allowed"}
+                elif path == "/match/wait/":
+                    status, payload = await self.server.wait_match_status(form)
+                else:
+                    status, payload = self.server.handle(path, form)
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  409: "Conflict", 413: "Payload Too Large"}.get(status, "OK")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8000, board_size=8):
+    """Start the server and return the asyncio Server (already listening)."""
+    frontend = HttpFrontend(DogServer(board_size))
+    server = await asyncio.start_server(frontend.handle_connection, host, port,
+                                        limit=MAX_HEADER_BYTES, backlog=4096)
+    server.frontend = frontend
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local DOG-compatible match server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--board-size", type=int, default=8)
+    args = parser.parse_args()
+
+    async def run():
+        server = await serve(args.host, args.port, args.board_size)
+        print(f"DOG server listening on http://{args.host}:{args.port}/")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from src.dom_interface import DomInterface
-
 if __name__ == "__main__":
-    DomInterface()
\ No newline at end of file
+    import time
+    started_at = time.perf_counter()  # time to first frame is measured from here
+    from src.dom_interface import DomInterface  # only load Tk when running the client
+    DomInterface(started_at)
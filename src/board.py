@@ -1,44 +1,109 @@
 import tkinter as tk
-from src.cell import Cell
-from src.domineering_game import Game
+from src.engine import metrics
+from src.engine.domineering_game import Game
+from src.move_overlay import MoveOverlay
 from src.settings import *
 
 class Board:
-    def __init__(self, parent_interface, parent_frame, click_callback=None, hover_callback=None, leave_callback=None):
+    def __init__(self, parent_interface, parent_frame, click_callback=None, hover_callback=None, leave_callback=None,
+                 game=None):
         self.parent_interface = parent_interface
         self.parent_frame = parent_frame
         self.click_callback = click_callback
         self.hover_callback = hover_callback
         self.leave_callback = leave_callback
         self.cell_size = CELL_SIZE
-        self.game = Game(board_size=BOARD_SIZE)
-
-        # Instead of multiple canvases, use one canvas for the whole board
-        self.canvas = tk.Canvas(
-            parent_frame,
-            width=self.game.board_size * self.cell_size,
-            height=self.game.board_size * self.cell_size,
-            bg="white"
-        )
-        self.canvas.pack()
-
-        # Store Cell objects in a 2D list
-        self.cells = [
-            [Cell(row, col) for col in range(self.game.board_size)]
-            for row in range(self.game.board_size)
-        ]
-
-        # Track preview rectangle ID (if any)
+        # The rules live in the headless engine; the board only draws them
+        self.game = game if game is not None else Game(board_size=BOARD_SIZE)
+
+        # Boards that do not fit are shown through a scrollable, zoomable view
+        # that only has canvas items for the cells and dominoes in view
+        self.virtual = max(self.game.rows, self.game.cols) * CELL_SIZE > VIEWPORT_SIZE
+        self.x_scrollbar = None
+        self.y_scrollbar = None
+        if self.virtual:
+            self.cell_size = max(MIN_CELL_SIZE, VIEWPORT_SIZE // max(self.game.rows, self.game.cols))
+            self._build_viewport(parent_frame)
+        else:
+            # Instead of multiple canvases, use one canvas for the whole board
+            self.canvas = tk.Canvas(
+                parent_frame,
+                width=self.game.cols * self.cell_size,
+                height=self.game.rows * self.cell_size,
+                bg="white"
+            )
+            self.canvas.pack()
+
+        # Single reusable preview rectangle, moved and hidden instead of recreated.
+        # _preview_key is the (row, col, is_vertical) it was last asked to show.
         self.preview_id = None
+        self._preview_key = None
+
+        # Motion events are coalesced: only the latest cell is handled once per frame
+        self._pending_hover = None
+        self._hover_job = None
+
+        self.hint_id = None  # dashed outline of a suggested move
+        self._hint_move = None  # its (row, col, is_vertical), redrawn when zooming
+
+        # Canvas item id of every drawn domino, keyed by (anchor index, vertical),
+        # plus the cells already on screen, so redraws only touch what changed
+        self._domino_items = {}
+        self._drawn_vertical = 0
+        self._drawn_horizontal = 0
+        self._drawn_hash = 0  # large boards: board hash at the last refresh
+
+        # Large boards: the cell range the grid lines were drawn for, and the
+        # pending redraw after a pan (coalesced like hover events)
+        self._view = None
+        self._view_job = None
+
+        self.overlay = None  # MoveOverlay while the legal/safe move heatmap is shown
 
         self._bind_events()
+        if self.virtual:
+            self._sync_view()
+        else:
+            self._draw_grid()
         self.refresh_board()
 
+    def _build_viewport(self, parent_frame):
+        """Create the fixed-size canvas and scrollbars of a large board."""
+        self.canvas = tk.Canvas(parent_frame, width=VIEWPORT_SIZE, height=VIEWPORT_SIZE, bg="white")
+        self.x_scrollbar = tk.Scrollbar(parent_frame, orient="horizontal", command=self._xview)
+        self.y_scrollbar = tk.Scrollbar(parent_frame, orient="vertical", command=self._yview)
+        self.canvas.configure(xscrollcommand=self.x_scrollbar.set, yscrollcommand=self.y_scrollbar.set)
+        self.canvas.grid(row=0, column=0)
+        self.y_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.x_scrollbar.grid(row=1, column=0, sticky="ew")
+        self._set_scroll_region()
+
+    def _set_scroll_region(self):
+        self.canvas.configure(scrollregion=(0, 0, self.game.cols * self.cell_size,
+                                            self.game.rows * self.cell_size))
+
     def _bind_events(self):
         """Bind canvas events for clicks and mouse movement."""
         self.canvas.bind("<Button-1>", self._handle_click)
         self.canvas.bind("<Motion>", self._handle_motion)
         self.canvas.bind("<Leave>", self._handle_leave)
+        if self.virtual:
+            # Drag with the middle or right button to pan, wheel to scroll,
+            # Shift+wheel to scroll sideways, Ctrl+wheel or +/- to zoom
+            for button in ("2", "3"):
+                self.canvas.bind(f"<ButtonPress-{button}>", self._start_pan)
+                self.canvas.bind(f"<B{button}-Motion>", self._pan)
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.canvas.bind(sequence, self._handle_wheel)
+            self.canvas.bind("<Enter>", lambda _event: self.canvas.focus_set())
+            self.canvas.bind("<Left>", lambda _event: self._xview("scroll", -1, "units"))
+            self.canvas.bind("<Right>", lambda _event: self._xview("scroll", 1, "units"))
+            self.canvas.bind("<Up>", lambda _event: self._yview("scroll", -1, "units"))
+            self.canvas.bind("<Down>", lambda _event: self._yview("scroll", 1, "units"))
+            for key in ("<plus>", "<equal>", "<KP_Add>"):
+                self.canvas.bind(key, lambda _event: self.zoom(ZOOM_STEP))
+            for key in ("<minus>", "<KP_Subtract>"):
+                self.canvas.bind(key, lambda _event: self.zoom(1 / ZOOM_STEP))
 
     def _canvas_coords_to_cell(self, x, y):
         """Convert canvas x,y coords to (row,col)."""
@@ -47,49 +112,208 @@ class Board:
         return (row, col)
 
     def _handle_click(self, event):
-        row, col = self._canvas_coords_to_cell(event.x, event.y)
+        row, col = self._canvas_coords_to_cell(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
         if self.click_callback:
             self.click_callback(row, col)
 
     def _handle_motion(self, event):
-        row, col = self._canvas_coords_to_cell(event.x, event.y)
-        if 0 <= row < self.game.board_size and 0 <= col < self.game.board_size:
-            if self.hover_callback:
-                self.hover_callback(row, col)
+        row, col = self._canvas_coords_to_cell(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if 0 <= row < self.game.rows and 0 <= col < self.game.cols:
+            self._pending_hover = (row, col)
+            if self._hover_job is None:
+                self._hover_job = self.canvas.after(PREVIEW_FRAME_MS, self._flush_hover)
+
+    def _flush_hover(self):
+        """Deliver the latest hovered cell of the frame to the hover callback."""
+        self._hover_job = None
+        pending, self._pending_hover = self._pending_hover, None
+        if pending is not None and self.hover_callback:
+            self.hover_callback(*pending)
 
     def _handle_leave(self, _event):
+        if self._hover_job is not None:
+            self.canvas.after_cancel(self._hover_job)
+            self._hover_job = None
+        self._pending_hover = None
         if self.leave_callback:
             # We pass -1, -1 or similar so the callback knows we're off the board
             self.leave_callback(-1, -1)
 
-    def refresh_board(self):
-        """Redraw the entire board with background squares and dominos."""
-        self.canvas.delete("all")
-        board_size = self.game.board_size
-
-        # Draw checkerboard squares
-        for row in range(board_size):
-            for col in range(board_size):
+    def _draw_grid(self):
+        """Draw the checkerboard squares once; they never change."""
+        for row in range(self.game.rows):
+            for col in range(self.game.cols):
                 x1 = col * self.cell_size
                 y1 = row * self.cell_size
                 x2 = x1 + self.cell_size
                 y2 = y1 + self.cell_size
                 color = "white" if (row + col) % 2 == 0 else "#f0f0f0"
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, width=1, outline=GRID_COLOR)
-
-        # Draw placed dominos as single rectangles
-        for row in range(board_size):
-            for col in range(board_size):
-                cell_state = self.game.get_cell_state(row, col)
-                if cell_state == self.game.VERTICAL:
-                    # Draw only if it's the top part of vertical domino
-                    # to avoid drawing twice
-                    if row + 1 < board_size and self.game.get_cell_state(row + 1, col) == self.game.VERTICAL:
-                        self._draw_domino(row, col, vertical=True)
-                elif cell_state == self.game.HORIZONTAL:
-                    # Draw only if it's the left part of horizontal domino
-                    if col + 1 < board_size and self.game.get_cell_state(row, col + 1) == self.game.HORIZONTAL:
-                        self._draw_domino(row, col, vertical=False)
+                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, width=1, outline=GRID_COLOR, tags="grid")
+
+    # Large boards. Canvas coordinates stay board pixels (col * cell_size),
+    # so scrolling moves the view over items that are already there and only
+    # the edges that come into view need new ones.
+
+    def _xview(self, *args):
+        self.canvas.xview(*args)
+        self._schedule_view_sync()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_view_sync()
+
+    def _start_pan(self, event):
+        self.canvas.scan_mark(event.x, event.y)
+
+    def _pan(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._schedule_view_sync()
+
+    def _handle_wheel(self, event):
+        up = event.num == 4 or event.delta > 0
+        if event.state & 0x0004:  # Control: zoom around the pointer
+            self.zoom(ZOOM_STEP if up else 1 / ZOOM_STEP, event.x, event.y)
+        elif event.state & 0x0001:  # Shift: scroll sideways
+            self._xview("scroll", -1 if up else 1, "units")
+        else:
+            self._yview("scroll", -1 if up else 1, "units")
+
+    def zoom(self, factor, x=None, y=None):
+        """
+        Scale a large board's cells by factor, keeping the point under the
+        window coordinates (x, y) (default: the middle of the view) in place.
+        """
+        if not self.virtual:
+            return
+        size = min(CELL_SIZE, max(MIN_CELL_SIZE, int(round(self.cell_size * factor))))
+        if size == self.cell_size:
+            return
+        if x is None:
+            x = y = VIEWPORT_SIZE / 2
+        col = self.canvas.canvasx(x) / self.cell_size
+        row = self.canvas.canvasy(y) / self.cell_size
+        self.cell_size = size
+        self._set_scroll_region()
+        self.canvas.xview_moveto((col * size - x) / (self.game.cols * size))
+        self.canvas.yview_moveto((row * size - y) / (self.game.rows * size))
+
+        # Everything on the canvas is in the old scale
+        self.canvas.delete("domino")
+        self._domino_items.clear()
+        self._view = None
+        self.clear_preview()
+        if self._hint_move is not None:
+            self.show_hint(*self._hint_move)
+        self._sync_view()
+
+    def see(self, row, col):
+        """Scroll a large board so that (row, col) is in view."""
+        if not self.virtual:
+            return
+        first_row, end_row, first_col, end_col = self._visible_range()
+        if first_row <= row < end_row - 1 and first_col <= col < end_col - 1:
+            return
+        size = self.cell_size
+        self.canvas.xview_moveto((col * size - VIEWPORT_SIZE / 2) / (self.game.cols * size))
+        self.canvas.yview_moveto((row * size - VIEWPORT_SIZE / 2) / (self.game.rows * size))
+        self._sync_view()
+
+    def _schedule_view_sync(self):
+        if self._view_job is None:
+            self._view_job = self.canvas.after(PREVIEW_FRAME_MS, self._sync_view)
+
+    def _visible_range(self):
+        """(first row, end row, first col, end col) of the cells in view, ends exclusive."""
+        size = self.cell_size
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        return (max(0, int(top // size)), min(self.game.rows, int((top + VIEWPORT_SIZE) // size) + 1),
+                max(0, int(left // size)), min(self.game.cols, int((left + VIEWPORT_SIZE) // size) + 1))
+
+    def _sync_view(self):
+        """Give the cells in view their grid lines and dominoes, and drop the dominoes out of view."""
+        self._view_job = None
+        view = self._visible_range()
+        if view != self._view:
+            self._view = view
+            self._draw_grid_lines(*view)
+            if self.overlay is not None:
+                self.overlay.place(*view)
+        wanted = self._visible_dominoes(*view)
+        items = self._domino_items
+        for key in [key for key in items if key not in wanted]:
+            self.canvas.delete(items.pop(key))
+        cols = self.game.cols
+        for key in wanted:
+            if key not in items:
+                row, col = divmod(key[0], cols)
+                items[key] = self._draw_domino(row, col, vertical=key[1])
+        if self.hint_id is not None:
+            self.canvas.tag_raise(self.hint_id)
+
+    def _draw_grid_lines(self, first_row, end_row, first_col, end_col):
+        """Grid lines for a block of cells; one line per row and column instead of a square per cell."""
+        size = self.cell_size
+        top, bottom = first_row * size, end_row * size
+        left, right = first_col * size, end_col * size
+        self.canvas.delete("grid")
+        for col in range(first_col, end_col + 1):
+            self.canvas.create_line(col * size, top, col * size, bottom, fill=GRID_COLOR, tags="grid")
+        for row in range(first_row, end_row + 1):
+            self.canvas.create_line(left, row * size, right, row * size, fill=GRID_COLOR, tags="grid")
+        self.canvas.tag_lower("grid")
+
+    def _visible_dominoes(self, first_row, end_row, first_col, end_col):
+        """
+        (anchor index, vertical) of the dominoes in a block of cells, read
+        from the game's cell bytes. The scan starts one row and column early
+        for dominoes anchored just outside the block.
+        """
+        game = self.game
+        cells, cols = game.cells, game.cols
+        left = max(0, first_col - 1)
+        anchors = set()
+        for row in range(max(0, first_row - 1), end_row):
+            start = row * cols + left
+            line = cells[start:row * cols + end_col]
+            for code, vertical in ((game.CELL_VERTICAL, True), (game.CELL_HORIZONTAL, False)):
+                offset = line.find(code)
+                while offset >= 0:
+                    anchors.add((start + offset, vertical))
+                    offset = line.find(code, offset + 1)
+        return anchors
+
+    def refresh_board(self):
+        """
+        Bring the canvas in line with the game state. Only dominoes placed or
+        removed since the last refresh create or delete canvas items; on a
+        large board, only those in view.
+        """
+        if self.virtual:
+            if self.game.board_hash != self._drawn_hash:
+                self.clear_hint()  # a hint is only good for the position it was computed for
+            self._drawn_hash = self.game.board_hash
+            if self.overlay is not None:
+                self.overlay.update()
+            self._sync_view()
+            return
+        bitboard = self.game.bitboard
+        if bitboard.vertical != self._drawn_vertical or bitboard.horizontal != self._drawn_horizontal:
+            # Diff the anchors read from the cells: the changed cells alone do not say which dominoes
+            # changed when the game was swapped for one with overlapping dominoes (e.g. a snapshot)
+            wanted = self._visible_dominoes(0, self.game.rows, 0, self.game.cols)
+            items = self._domino_items
+            for key in [key for key in items if key not in wanted]:
+                self.canvas.delete(items.pop(key))
+            for key in wanted:
+                if key not in items:
+                    row, col = bitboard.position(key[0])
+                    items[key] = self._draw_domino(row, col, vertical=key[1])
+            self.clear_hint()  # a hint is only good for the position it was computed for
+        self._drawn_vertical = bitboard.vertical
+        self._drawn_horizontal = bitboard.horizontal
+        if self.overlay is not None:
+            self.overlay.update()
 
     def _draw_domino(self, row, col, vertical=True, preview=False):
         """Draw a single rectangle spanning two cells."""
@@ -107,41 +331,142 @@ class Board:
         tag = "preview" if preview else "domino"
         stipple_val = "gray50" if preview else ""
 
-        self.canvas.create_rectangle(x1, y1, x2, y2,
-                                     fill=color, outline="black",
-                                     width=2, stipple=stipple_val,
-                                     tags=tag)
+        return self.canvas.create_rectangle(x1, y1, x2, y2,
+                                            fill=color, outline="black",
+                                            width=2, stipple=stipple_val,
+                                            tags=tag)
 
     def place_vertical_domino(self, row, col):
         self.game.current_orientation = self.game.VERTICAL
-        self.game.place_domino(row, col)
+        placed = self.game.place_domino(row, col)
         self.refresh_board()
+        return placed
 
     def place_horizontal_domino(self, row, col):
         self.game.current_orientation = self.game.HORIZONTAL
-        self.game.place_domino(row, col)
+        placed = self.game.place_domino(row, col)
         self.refresh_board()
+        return placed
+
+    def update_board(self, a_move, refresh=True):
+        """
+        Apply a decoded move received from the opponent (a dict with row, col
+        and orientation) and hand the turn back to the other orientation.
+        Returns False when the move carries no placement or is not legal here.
+        With refresh=False the canvas is left for a later refresh_board().
+        """
+        try:
+            row, col = int(a_move["row"]), int(a_move["col"])
+            orientation = a_move["orientation"]
+        except (KeyError, TypeError, ValueError):
+            return False
+        if orientation not in (self.game.VERTICAL, self.game.HORIZONTAL):
+            return False
+        self.game.current_orientation = orientation
+        if not self.game.place_domino(row, col):
+            return False
+        self.game.toggle_orientation()
+        self.clear_preview()
+        if refresh:
+            self.refresh_board()
+        return True
 
     def is_valid_move(self, row, col, is_vertical=True):
         orientation = self.game.VERTICAL if is_vertical else self.game.HORIZONTAL
         return self.game.is_valid_move(row, col, orientation)
 
     def preview_move(self, row, col, is_vertical=True):
-        """Draw a single preview rectangle if valid."""
-        self.clear_preview()
+        """Show the preview rectangle at (row, col) if the move is valid, else hide it."""
+        key = (row, col, is_vertical)
+        if key == self._preview_key:
+            return
+        self._preview_key = key
         orientation = self.game.VERTICAL if is_vertical else self.game.HORIZONTAL
         if not self.game.is_valid_move(row, col, orientation):
+            self._hide_preview()
+            return
+
+        if self.preview_id is None:
+            self.preview_id = self._draw_domino(row, col, vertical=is_vertical, preview=True)
             return
-        self._draw_domino(row, col, vertical=is_vertical, preview=True)
-        # We won't track a full ID list, just clear all "preview" on next call
-        self.preview_id = True
+        x1 = col * self.cell_size
+        y1 = row * self.cell_size
+        x2 = x1 + (1 if is_vertical else 2) * self.cell_size
+        y2 = y1 + (2 if is_vertical else 1) * self.cell_size
+        self.canvas.coords(self.preview_id, x1, y1, x2, y2)
+        self.canvas.itemconfig(self.preview_id, state="normal",
+                               fill=VERTICAL_PLAYER_COLOR if is_vertical else HORIZONTAL_PLAYER_COLOR)
+        self.canvas.tag_raise(self.preview_id)
+
+    def _hide_preview(self):
+        if self.preview_id is not None:
+            self.canvas.itemconfig(self.preview_id, state="hidden")
 
     def clear_preview(self):
-        """Clear any preview rectangle."""
-        if self.preview_id:
-            self.canvas.delete("preview")
-            self.preview_id = None
+        """Hide the preview rectangle; the next preview_move always redraws."""
+        self._preview_key = None
+        self._hide_preview()
+
+    def show_hint(self, row, col, is_vertical=True):
+        """Outline a suggested move until clear_hint() or the next refresh."""
+        self._hint_move = (row, col, is_vertical)
+        x1 = col * self.cell_size
+        y1 = row * self.cell_size
+        x2 = x1 + (1 if is_vertical else 2) * self.cell_size
+        y2 = y1 + (2 if is_vertical else 1) * self.cell_size
+        color = VERTICAL_PLAYER_COLOR if is_vertical else HORIZONTAL_PLAYER_COLOR
+        if self.hint_id is None:
+            self.hint_id = self.canvas.create_rectangle(x1, y1, x2, y2, outline=color, width=4,
+                                                        dash=(6, 4), tags="hint")
+        else:
+            self.canvas.coords(self.hint_id, x1, y1, x2, y2)
+            self.canvas.itemconfig(self.hint_id, state="normal", outline=color)
+        self.canvas.tag_raise(self.hint_id)
+        self.see(row, col)
+
+    def clear_hint(self):
+        self._hint_move = None
+        if self.hint_id is not None:
+            self.canvas.itemconfig(self.hint_id, state="hidden")
 
     def reset(self):
         self.game.clear_board()
-        self.refresh_board()
+        self.clear_hint()
+        self.canvas.delete("domino")
+        self._domino_items.clear()
+        self._drawn_vertical = 0
+        self._drawn_horizontal = 0
+        self._drawn_hash = 0
+        if self.overlay is not None:
+            self.overlay.update()
+
+    def show_overlay(self, visible=True):
+        """Show or hide the heatmap of the cells each side can still cover."""
+        if visible and self.overlay is None:
+            self.overlay = MoveOverlay(self)
+            if self.virtual:
+                self._view = None  # redraw the grid lines of the view over the image
+                self._sync_view()
+            else:
+                self.overlay.place(0, self.game.rows, 0, self.game.cols)
+        elif not visible and self.overlay is not None:
+            self.overlay.destroy()
+            self.overlay = None
+
+    def destroy(self):
+        """Remove the board's widgets, e.g. to replace it with a board of another size."""
+        for job in (self._hover_job, self._view_job):
+            if job is not None:
+                self.canvas.after_cancel(job)
+        self._hover_job = self._view_job = None
+        if self.overlay is not None:
+            self.overlay.destroy()
+            self.overlay = None
+        for widget in (self.x_scrollbar, self.y_scrollbar, self.canvas):
+            if widget is not None:
+                widget.destroy()
+
+
+metrics.instrument(Board, "refresh_board", "ui.refresh_board")
+metrics.instrument(Board, "preview_move", "ui.preview_move")
+metrics.instrument(Board, "_sync_view", "ui.sync_view")
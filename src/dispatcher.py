@@ -0,0 +1,68 @@
+import traceback
+from collections import deque
+from src.settings import DISPATCH_INTERVAL_MS, DISPATCH_MAX_BATCH
+
+
+class UiDispatcher:
+    """
+    Hands calls from background threads (the DOG polling thread, searches)
+    over to the Tk thread. post() only appends to a deque, which is safe from
+    any thread without a lock; the Tk thread drains it with after() in batches
+    and runs the on_batch_end hooks once per batch, so several network events
+    that arrive together cause a single redraw.
+    """
+
+    def __init__(self, widget, interval_ms=DISPATCH_INTERVAL_MS, max_batch=DISPATCH_MAX_BATCH):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self.on_batch_end = []
+        self.dispatched = 0
+        self.batches = 0
+        self._events = deque()
+        self._job = None
+        self._running = False
+
+    def start(self):
+        """Start draining on the Tk thread."""
+        self._running = True
+        if self._job is None:
+            self._job = self.widget.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        self._running = False
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def post(self, callback, *args):
+        """Run callback(*args) on the Tk thread. Safe to call from any thread."""
+        self._events.append((callback, args))
+
+    def _drain(self):
+        self._job = None
+        try:
+            handled = 0
+            while handled < self.max_batch:
+                try:
+                    callback, args = self._events.popleft()
+                except IndexError:
+                    break
+                handled += 1
+                self._run(callback, args)
+            if handled:
+                self.dispatched += handled
+                self.batches += 1
+                for hook in self.on_batch_end:
+                    self._run(hook, ())
+        finally:
+            # Reschedule last, so a modal dialog opened by a callback cannot re-enter the drain
+            if self._running:
+                self._job = self.widget.after(0 if self._events else self.interval_ms, self._drain)
+
+    @staticmethod
+    def _run(callback, args):
+        try:
+            callback(*args)
+        except Exception:
+            traceback.print_exc()
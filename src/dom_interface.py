@@ -1,37 +1,210 @@
+import os
+import time
 import tkinter as tk
+from threading import Thread
 from tkinter import simpledialog, messagebox
 from src.board import Board
+from src.engine import metrics
+from src.engine.bitboard import popcount
+from src.engine.domineering_game import Game
 from src.settings import *
+from src.dispatcher import UiDispatcher
+from src.engine.search_worker import SearchWorker
+from src.engine.tablebase import load_default
 from dog.dog_interface import DogPlayerInterface
-from dog.dog_actor import DogActor
 
 class DomInterface(DogPlayerInterface):
   """Main player interface class that coordinates between game logic and UI"""
 
-  def __init__(self):
+  def __init__(self, started_at=None):
+    self.started_at = time.perf_counter() if started_at is None else started_at
+    self.time_to_first_frame = None
     self.main_window = tk.Tk()
 
     self.build_window()
+
+    # Computer opponent and hints: searches run on a background thread and
+    # their results are picked up with after(), so the window never waits
+    self.search_worker = SearchWorker(tablebase=load_default())
+    self.ai_level = tk.StringVar(self.main_window, value=AI_DEFAULT_LEVEL)
+    self.vs_computer = False
+    self.computer_orientation = None
+    self._search_job = None
+
+    # Hot-path metrics and the sampling profiler are off unless switched on
+    # from the menu or with DOMINEERING_METRICS / DOMINEERING_PROFILE=<path>
+    self.metrics_path = os.environ.get("DOMINEERING_METRICS") or METRICS_DUMP_PATH
+    self.profile_path = os.environ.get("DOMINEERING_PROFILE") or PROFILE_PATH
+    self.metrics_on = tk.BooleanVar(self.main_window, value="DOMINEERING_METRICS" in os.environ)
+    self.profiler_on = tk.BooleanVar(self.main_window, value="DOMINEERING_PROFILE" in os.environ)
+    self.profiler = None
+    self.toggle_metrics()
+    self.toggle_profiler()
+
+    # Heatmap of the cells each side can still cover, kept across board changes
+    self.overlay_on = tk.BooleanVar(self.main_window, value=False)
+
     self.build_menu()
 
+    # Server events are queued by the polling thread and handled here, on the Tk thread
+    self.dispatcher = UiDispatcher(self.main_window)
+    self.dispatcher.on_batch_end.append(self._flush_redraw)
+    self._redraw_pending = False
+    self.dispatcher.start()
+
     # Board handles logic via its internal Game instance
-    self.board = Board(
+    self.board = self._create_board()
+
+    # DOG: set once registration has started, which never holds up the first frame
+    self.dog_server_interface = None
+    self.player_name = None
+    self.connected = False
+    self._status_job = None
+    self._registering = False
+    self._timeout_job = None
+    self._retry_job = None
+    self._retry_delay = REGISTER_RETRY_S
+
+    self.main_window.protocol("WM_DELETE_WINDOW", self.close)
+    self.main_window.after_idle(self._on_first_frame)
+    if ASYNC_STARTUP:
+      self.main_window.after_idle(self.connect)
+    else:
+      self.player_name = simpledialog.askstring(title="Nome do Jogador", prompt="Digite seu nome:")
+      message = self._register(self.player_name)
+      self._on_registered(message)
+    self.main_window.mainloop() # iniciar o loop de eventos
+
+  def _on_first_frame(self):
+    """Runs once the window has been drawn; records how long startup took."""
+    self.time_to_first_frame = time.perf_counter() - self.started_at
+    if metrics.enabled:
+      metrics.histogram("ui.time_to_first_frame").record(int(self.time_to_first_frame * 1e9))
+    print(f"Primeiro quadro em {self.time_to_first_frame * 1000:.0f} ms")
+
+  def connect(self):
+    """
+    Ask for the player's name in the status bar, without blocking the
+    window; registration starts once it is entered. Local games and hints
+    work meanwhile.
+    """
+    self.status_label.place_forget()
+    self.name_frame.place(relx=0.5, rely=0.98, anchor="s")
+    self.name_entry.focus_set()
+
+  def _submit_name(self, _event=None):
+    self.player_name = self.name_entry.get().strip()
+    self.name_frame.place_forget()
+    self.status_label.place(relx=0.5, rely=0.98, anchor="s")
+    self._start_registration()
+
+  def reconnect(self):
+    """Menu action: register again now instead of waiting for the next retry."""
+    if self.connected:
+      messagebox.showinfo(message="Já conectado ao Dog Server")
+    elif self.player_name is None:
+      self.connect()
+    else:
+      self._retry_delay = REGISTER_RETRY_S
+      self._start_registration()
+
+  def _start_registration(self):
+    """
+    Register with the DOG server on a worker thread. The status bar follows
+    the attempt and says so when the server has not answered after
+    REGISTER_TIMEOUT_S; failed attempts are retried with a growing wait.
+    """
+    if self._registering:
+      return
+    for job in (self._retry_job, self._timeout_job):
+      if job is not None:
+        self.main_window.after_cancel(job)
+    self._retry_job = None
+    self._registering = True
+    self._set_status("Conectando ao Dog Server", progress=True)
+    self._timeout_job = self.main_window.after(int(REGISTER_TIMEOUT_S * 1000), self._registration_timed_out)
+    Thread(target=self._register_in_background, args=(self.player_name,), name="dog-register",
+           daemon=True).start()
+
+  def _register(self, player_name):
+    """Create the DOG actor (or reuse it) and register the player. Blocks on the network; returns the status message."""
+    if self.dog_server_interface is not None:
+      return self.dog_server_interface.reconnect(player_name)
+    from dog.dog_actor import DogActor  # networking (and requests) only loads once the window exists
+    self.dog_server_interface = DogActor(dispatch=self.dispatcher.post)
+    return self.dog_server_interface.initialize(player_name, self)
+
+  def _register_in_background(self, player_name):
+    try:
+      message = self._register(player_name)
+    except Exception as error:  # anything the network layer did not turn into a message
+      message = f"Você está sem conexão ({error})"
+    self.dispatcher.post(self._on_registered, message)
+
+  def _on_registered(self, message):
+    print(message)
+    print(f"Player name: {self.player_name}")
+    self._registering = False
+    if self._timeout_job is not None:
+      self.main_window.after_cancel(self._timeout_job)
+      self._timeout_job = None
+    status = self.dog_server_interface.proxy.get_status() if self.dog_server_interface is not None else 1
+    self.connected = status >= 2
+    if not ASYNC_STARTUP:
+      self._set_status(message)
+      messagebox.showinfo(message=message)
+    elif self.connected:
+      self._retry_delay = REGISTER_RETRY_S
+      self._set_status(message)
+    elif status == 0:
+      self._set_status(message)  # no game id to register with; retrying would not help
+    else:
+      delay = self._retry_delay
+      self._retry_delay = min(delay * 2, REGISTER_RETRY_MAX_S)
+      self._set_status(f"{message}; nova tentativa em {delay:.0f} s")
+      self._retry_job = self.main_window.after(int(delay * 1000), self._start_registration)
+
+  def _registration_timed_out(self):
+    self._timeout_job = None
+    if self._registering:  # the attempt goes on; its answer still updates the status
+      self._set_status("Dog Server não respondeu; aguardando resposta", progress=True)
+
+  def _set_status(self, text, progress=False):
+    """Show text in the status bar, with animated dots while progress is True."""
+    if self._status_job is not None:
+      self.main_window.after_cancel(self._status_job)
+      self._status_job = None
+    self.status_label.config(text=text)
+    if progress:
+      self._animate_status(text, 0)
+
+  def _animate_status(self, text, step):
+    self.status_label.config(text=text + "." * (step % 4))
+    self._status_job = self.main_window.after(400, self._animate_status, text, step + 1)
+
+  def _create_board(self, game=None):
+    board = Board(
         parent_interface=self,
         parent_frame=self.board_frame, 
         click_callback=self._on_cell_click_internal,
         hover_callback=self._on_cell_hover_internal,
-        leave_callback=self._on_cell_leave_internal
+        leave_callback=self._on_cell_leave_internal,
+        game=game
     )
+    board.show_overlay(self.overlay_on.get())
+    return board
 
-    # DOG
-    self.player_name = simpledialog.askstring(title="Nome do Jogador", prompt="Digite seu nome:")
-    self.dog_server_interface = DogActor()
-    message = self.dog_server_interface.initialize(self.player_name, self)
-    messagebox.showinfo(message=message)
-    print(message)
-    print(f"Player name: {self.player_name}")
-
-    self.main_window.mainloop() # iniciar o loop de eventos
+  def close(self):
+    """Stop polling the server and close the window."""
+    self.search_worker.close()
+    self.dispatcher.stop()
+    if self.dog_server_interface is not None:
+      self.dog_server_interface.stop()
+    self.metrics_on.set(False)
+    self.toggle_metrics()
+    self.profiler_on.set(False)
+    self.toggle_profiler()
+    self.main_window.destroy()
 
     
   def build_window(self):
@@ -78,32 +251,99 @@ class DomInterface(DogPlayerInterface):
     self.player_moves_label.grid(row=1, column=0, padx=20, pady=5)
     self.opponent_moves_label = tk.Label(score_frame, text="0", font=("Arial", 16), fg="white", bg="#2f4255")
     self.opponent_moves_label.grid(row=1, column=1, padx=20, pady=5)
+
+    # connection status (DOG registration runs in the background)
+    self.status_label = tk.Label(self.main_window, text="", font=("Arial", 11), fg="white", bg=BG_COLOR)
+    self.status_label.place(relx=0.5, rely=0.98, anchor="s")
+    # ...where the player's name is also asked for, instead of a dialog that blocks the window
+    self.name_frame = tk.Frame(self.main_window, bg=BG_COLOR)
+    tk.Label(self.name_frame, text="Seu nome:", font=("Arial", 11), fg="white", bg=BG_COLOR).pack(side="left")
+    self.name_entry = tk.Entry(self.name_frame, width=20)
+    self.name_entry.pack(side="left", padx=5)
+    self.name_entry.bind("<Return>", self._submit_name)
+    tk.Button(self.name_frame, text="Conectar", command=self._submit_name).pack(side="left")
     
   def build_menu(self):
     """Create the menu bar with "Ações"."""
     menubar = tk.Menu(self.main_window)
     acoes_menu = tk.Menu(menubar, tearoff=0)
     acoes_menu.add_command(label="Iniciar partida", command=self.start_match)
+    acoes_menu.add_command(label="Reconectar ao Dog Server", command=self.reconnect)
     acoes_menu.add_command(label="Restaurar estado inicial", command=self.restore_initial_state)
+    acoes_menu.add_separator()
+    acoes_menu.add_command(label="Jogar contra o computador", command=self.start_computer_match)
+    acoes_menu.add_command(label="Dica", command=self.request_hint)
+    nivel_menu = tk.Menu(acoes_menu, tearoff=0)
+    for level in AI_LEVELS:
+      nivel_menu.add_radiobutton(label=level, variable=self.ai_level, value=level)
+    acoes_menu.add_cascade(label="Dificuldade", menu=nivel_menu)
+    acoes_menu.add_command(label="Tamanho do tabuleiro...", command=self.choose_board_size)
+    acoes_menu.add_checkbutton(label="Mostrar jogadas possíveis", variable=self.overlay_on,
+                               command=self.toggle_overlay)
+    acoes_menu.add_separator()
+    acoes_menu.add_checkbutton(label="Coletar métricas", variable=self.metrics_on, command=self.toggle_metrics)
+    acoes_menu.add_checkbutton(label="Perfilador de amostragem", variable=self.profiler_on,
+                               command=self.toggle_profiler)
     menubar.add_cascade(label="Ações", menu=acoes_menu)
     self.main_window.config(menu=menubar)
     
+  def toggle_overlay(self):
+    """Show or hide the legal/safe move heatmap on the board."""
+    self.board.show_overlay(self.overlay_on.get())
+
+  def toggle_metrics(self):
+    """Start or stop timing the hot paths, dumping them to self.metrics_path every few seconds."""
+    if self.metrics_on.get():
+      metrics.enable()
+      metrics.start_dump(self.metrics_path, METRICS_DUMP_INTERVAL_S)
+    elif metrics.enabled:
+      metrics.disable()
+      metrics.stop_dump()  # writes the final numbers
+
+  def toggle_profiler(self):
+    """Start or stop sampling stacks; they are written to self.profile_path when it stops."""
+    if self.profiler_on.get():
+      if self.profiler is None:
+        self.profiler = metrics.start_profiler(PROFILE_INTERVAL_S)
+    elif self.profiler is not None:
+      self.profiler.stop(self.profile_path)
+      self.profiler = None
+
   def restore_initial_state(self):
-    """Restore the initial state of the game."""
+    """
+    Restore the initial state of the game. During an online match that is
+    the match as the server has it, so the board is rebuilt from a snapshot.
+    """
     print("Restaurando estado inicial...")
-    # Add restoration logic here
+    if not self.vs_computer and self.connected and self.dog_server_interface.proxy.get_status() == 3:
+      self.dog_server_interface.resync()
+      return
+    self.search_worker.cancel()
+    self.board.reset()
+    self.board.game.current_orientation = self.board.game.VERTICAL
+    self.board.clear_preview()
+    self.player_moves_label.config(text="0")
+    self.opponent_moves_label.config(text="0")
     
   def _on_cell_click_internal(self, row, col):
     """Handle cell click and place using the orientation in Board.game if needed."""
     print(f"Cell clicked: {row}, {col}")
+    game = self.board.game
+    if self.vs_computer and game.current_orientation == self.computer_orientation:
+        return  # the computer is still thinking
     self.board.clear_preview()
     # Domino placement now draws one piece automatically
-    if self.board.game.current_orientation == self.board.game.VERTICAL:
-        self.board.place_vertical_domino(row, col)
-        self.board.game.toggle_orientation()
+    if game.current_orientation == game.VERTICAL:
+        placed = self.board.place_vertical_domino(row, col)
     else:
-        self.board.place_horizontal_domino(row, col)
-        self.board.game.toggle_orientation()
+        placed = self.board.place_horizontal_domino(row, col)
+    if not placed:
+        return
+    game.toggle_orientation()
+    self.search_worker.cancel()  # a pending hint was for the previous position
+    self.player_moves_label.config(text=str(int(self.player_moves_label.cget("text")) + 1))
+    if self.vs_computer:
+        self._computer_turn()
     
   def _on_cell_hover_internal(self, row, col):
     """Preview potential move based on current orientation in self.board.game."""
@@ -120,27 +360,116 @@ class DomInterface(DogPlayerInterface):
     if hasattr(self, 'board'):
         self.board.refresh_board()
 
+  def start_computer_match(self):
+    """Start a local game against the computer; the player places vertical dominoes and moves first."""
+    self.search_worker.cancel()
+    self.board.reset()
+    self.board.game.current_orientation = self.board.game.VERTICAL
+    self.board.clear_preview()
+    self.player_moves_label.config(text="0")
+    self.opponent_moves_label.config(text="0")
+    self.vs_computer = True
+    self.computer_orientation = self.board.game.HORIZONTAL
+
+  def choose_board_size(self):
+    """Replace the board with an empty one of another size, for local games against the computer."""
+    size = simpledialog.askinteger(title="Tamanho do tabuleiro", prompt="Número de linhas e colunas:",
+                                   initialvalue=self.board.game.rows, minvalue=2, maxvalue=MAX_BOARD_SIZE)
+    if size is None:
+      return
+    self.search_worker.cancel()
+    self.vs_computer = False
+    self.board.destroy()
+    self.board = self._create_board(Game(board_size=size))
+    self.player_moves_label.config(text="0")
+    self.opponent_moves_label.config(text="0")
+
+  def request_hint(self):
+    """Search for a good move for the side to move and outline it on the board."""
+    game = self.board.game
+    if self.vs_computer and game.current_orientation == self.computer_orientation:
+      return
+    if not game.has_moves(game.current_orientation):
+      return
+    time_limit, max_depth = AI_LEVELS[self.ai_level.get()]
+    self.search_worker.submit(game, time_limit=time_limit, max_depth=max_depth, purpose="hint")
+    self._schedule_search_poll()
+
+  def _computer_turn(self):
+    game = self.board.game
+    if not game.has_moves(game.current_orientation):
+      self.vs_computer = False
+      messagebox.showinfo(message="Você venceu!")
+      return
+    time_limit, max_depth = AI_LEVELS[self.ai_level.get()]
+    self.search_worker.submit(game, time_limit=time_limit, max_depth=max_depth, purpose="move")
+    self._schedule_search_poll()
+
+  def _schedule_search_poll(self):
+    if self._search_job is None:
+      self._search_job = self.main_window.after(AI_POLL_MS, self._poll_search)
+
+  def _poll_search(self):
+    """Apply finished searches; keep polling while one is still running."""
+    self._search_job = None
+    game = self.board.game
+    for outcome in self.search_worker.poll():
+      if outcome.best_move is None:
+        continue
+      row, col = outcome.best_move
+      is_vertical = outcome.orientation == game.VERTICAL
+      if outcome.purpose == "hint":
+        self.board.show_hint(row, col, is_vertical)
+      elif outcome.purpose == "move" and self.vs_computer:
+        self._play_computer_move(row, col, is_vertical)
+    if self.search_worker.busy:
+      self._schedule_search_poll()
+
+  def _play_computer_move(self, row, col, is_vertical):
+    game = self.board.game
+    if is_vertical:
+      placed = self.board.place_vertical_domino(row, col)
+    else:
+      placed = self.board.place_horizontal_domino(row, col)
+    if not placed:
+      return
+    self.board.see(row, col)
+    game.toggle_orientation()
+    self.opponent_moves_label.config(text=str(int(self.opponent_moves_label.cget("text")) + 1))
+    if not game.has_moves(game.current_orientation):
+      self.vs_computer = False
+      messagebox.showinfo(message="O computador venceu!")
+
   def start_match(self):
     """Start a new match"""
     print("Starting match...")
+    if not self.connected:
+      messagebox.showinfo(message="Ainda não conectado ao Dog Server")
+      return
     start_status = self.dog_server_interface.start_match(2)
     message = start_status.get_message()
     messagebox.showinfo(message=message)
-    self.start_game(start_status)
+    if str(start_status.get_code()) == "2":
+      self.start_game(start_status)
 
   def start_game(self, start_status):
-    """Start a new game"""
+    """Start a new game: an empty board with vertical, the first player in the match, to move."""
     print("Starting game...")
-    self.board.initialize()
+    self.search_worker.cancel()
+    self.vs_computer = False
+    self.board.reset()
+    self.board.game.current_orientation = self.board.game.VERTICAL
+    self.board.clear_preview()
     self.player_moves_label.config(text="0")
     self.opponent_moves_label.config(text="0")
+    self._set_status("Partida em andamento")
 
 
   # DOG
   def receive_start(self, start_status):
     message = start_status.get_message()
     code = start_status.get_code()
-    if code == 2:
+    if str(code) == "2":
         self.start_game(start_status)
         messagebox.showinfo(message=message)
     else:
@@ -149,12 +478,56 @@ class DomInterface(DogPlayerInterface):
 
   # DOG
   def receive_move(self, a_move):
-    print(f"Received move: {a_move}")
-    self.board.update_board(a_move)
-    self.opponent_moves_label.config(text=str(int(self.opponent_moves_label.cget("text")) + 1))
-    self.update_board()
+    self.search_worker.cancel()
+    if self.board.update_board(a_move, refresh=False):
+      self._redraw_pending = True  # drawn once the whole batch of events is handled
+      # Only moves the board accepted count; a duplicate or illegal one is dropped
+      self.opponent_moves_label.config(text=str(int(self.opponent_moves_label.cget("text")) + 1))
+
+  # DOG
+  def receive_snapshot(self, snapshot, moves):
+    """Rebuild the board from the server's snapshot of the match, after a restart or missed moves."""
+    self.search_worker.cancel()
+    try:
+      game, _ = Game.from_snapshot(snapshot)
+    except ValueError as error:
+      print(f"Snapshot inválido: {error}")
+      return
+    self.vs_computer = False
+    if (game.rows, game.cols) == (self.board.game.rows, self.board.game.cols):
+      self.board.game = game  # the board only redraws the dominoes that differ
+      self.board.clear_preview()
+      self._redraw_pending = True
+    else:
+      self.board.destroy()
+      self.board = self._create_board(game)
+    local = game.current_orientation
+    if not self.dog_server_interface.proxy.local_turn:
+      local = game.HORIZONTAL if local == game.VERTICAL else game.VERTICAL
+    vertical = popcount(game.bitboard.vertical) // 2
+    horizontal = popcount(game.bitboard.horizontal) // 2
+    self.player_moves_label.config(text=str(vertical if local == game.VERTICAL else horizontal))
+    self.opponent_moves_label.config(text=str(horizontal if local == game.VERTICAL else vertical))
+    # The board is the snapshot; the missed moves say where play went on and how the match stands
+    placed = [move for move in moves if "row" in move]
+    if placed:
+      self.board.see(int(placed[-1]["row"]), int(placed[-1]["col"]))
+    self._set_status(f"Partida sincronizada ({len(moves)} jogadas recuperadas)")
+    status = moves[-1].get("match_status") if moves else None
+    if status == "interrupted":
+      self.receive_withdrawal_notification()
+    elif status == "finished":
+      self._set_status("Partida encerrada")
+
+  def _flush_redraw(self):
+    if self._redraw_pending:
+      self._redraw_pending = False
+      self.update_board()
 
   # DOG
   def receive_withdrawal_notification(self):
     print("Received withdrawal notification")
-    self.board.handle_opponent_withdrawal()
\ No newline at end of file
+    self.search_worker.cancel()
+    self.board.clear_preview()
+    self._set_status("O adversário abandonou a partida")
+    messagebox.showinfo(message="O adversário abandonou a partida")
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Headless Domineering engine: game state, rules, serialization and analysis.
+
+Nothing in this package imports tkinter or requests, so servers, bots and
+CI workers can use the rules without a display or network stack. Names are
+resolved lazily, so `import src.engine` itself costs almost nothing.
+"""
+
+_EXPORTS = {
+    "Game": "src.engine.domineering_game",
+    "Bitboard": "src.engine.bitboard",
+    "Solver": "src.engine.solver",
+    "SolveResult": "src.engine.solver",
+    "RegionAnalyzer": "src.engine.regions",
+    "RegionMap": "src.engine.regions",
+    "encode_move": "src.engine.move_codec",
+    "decode_move": "src.engine.move_codec",
+    "parse_move": "src.engine.move_codec",
+    "MoveFormatError": "src.engine.move_codec",
+    "encode_snapshot": "src.engine.move_codec",
+    "decode_snapshot": "src.engine.move_codec",
+    "GameLog": "src.engine.game_log",
+    "GameLogWriter": "src.engine.game_log",
+    "Tablebase": "src.engine.tablebase",
+    "ParallelSolver": "src.engine.parallel",
+    "SearchWorker": "src.engine.search_worker",
+    "MCTS": "src.engine.mcts",
+    "Tournament": "src.engine.tournament",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,193 @@
+"""
+Vectorized self-play: many Domineering games advanced together with NumPy.
+
+All K boards of a batch live in one (K, rows, cols) boolean array of free
+cells. Each ply computes the legal-move masks of every game with two sliced
+ANDs, picks one move per game in a single vectorized step and drops finished
+games from the arrays. Requires numpy.
+
+    python -m src.engine.batch_sim --sizes 6x6 8x8 --games 100000 --policy mobility
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+POLICIES = ("random", "mobility")
+
+
+def legal_masks(free, vertical):
+    """Anchor masks of every legal placement: (K, rows-1, cols) or (K, rows, cols-1)."""
+    if vertical:
+        return free[:, :-1, :] & free[:, 1:, :]
+    return free[:, :, :-1] & free[:, :, 1:]
+
+
+def _covered(moves, vertical, shape):
+    """Per cell, how many of the given placements cover it."""
+    cover = np.zeros(shape, dtype=np.int8)
+    if vertical:
+        cover[:, :-1, :] += moves
+        cover[:, 1:, :] += moves
+    else:
+        cover[:, :, :-1] += moves
+        cover[:, :, 1:] += moves
+    return cover
+
+
+class BatchResult:
+    """Outcome of one batch: who won each game and after how many plies."""
+
+    def __init__(self, rows, cols, first, vertical_won, lengths, elapsed):
+        self.rows = rows
+        self.cols = cols
+        self.first = first
+        self.vertical_won = vertical_won  # bool array, one entry per game
+        self.lengths = lengths  # plies played in each game
+        self.elapsed = elapsed
+
+    @property
+    def games(self):
+        return len(self.lengths)
+
+    @property
+    def vertical_win_rate(self):
+        return float(self.vertical_won.mean()) if self.games else 0.0
+
+    @property
+    def horizontal_win_rate(self):
+        return 1.0 - self.vertical_win_rate if self.games else 0.0
+
+    @property
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    def length_histogram(self):
+        """{plies: number of games that lasted that long}."""
+        counts = np.bincount(self.lengths)
+        return {int(plies): int(n) for plies, n in enumerate(counts) if n}
+
+    def summary(self):
+        return {
+            "size": f"{self.rows}x{self.cols}",
+            "first": self.first,
+            "games": self.games,
+            "vertical_win_rate": round(self.vertical_win_rate, 4),
+            "horizontal_win_rate": round(self.horizontal_win_rate, 4),
+            "mean_length": round(float(self.lengths.mean()), 2) if self.games else 0.0,
+            "length_histogram": self.length_histogram(),
+            "games_per_second": round(self.games_per_second, 1),
+        }
+
+
+class BatchSimulator:
+    """
+    Plays `batch_size` games of rows x cols at once.
+
+    policy "random" picks uniformly among legal moves; "mobility" picks the
+    move that destroys the most opponent placements (random tie-break).
+    """
+
+    def __init__(self, rows, cols, batch_size, policy="random", seed=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+        self.rows = rows
+        self.cols = cols
+        self.batch_size = batch_size
+        self.policy = policy
+        self.rng = np.random.default_rng(seed)
+
+    def _choose(self, free, moves, vertical):
+        """Flat index of the chosen anchor for every game."""
+        scores = self.rng.random(moves.shape, dtype=np.float32)
+        if self.policy == "mobility":
+            opponent = legal_masks(free, not vertical)
+            cover = _covered(opponent, not vertical, free.shape)
+            if vertical:
+                kills = cover[:, :-1, :] + cover[:, 1:, :]
+            else:
+                kills = cover[:, :, :-1] + cover[:, :, 1:]
+            scores += kills
+        scores += 1.0  # keep every legal score above the masked-out zeros
+        scores *= moves
+        return scores.reshape(len(free), -1).argmax(axis=1)
+
+    def run(self, first="vertical"):
+        start = time.perf_counter()
+        k = self.batch_size
+        rows, cols = self.rows, self.cols
+        free = np.ones((k, rows, cols), dtype=bool)
+        ids = np.arange(k)
+        vertical_won = np.zeros(k, dtype=bool)
+        lengths = np.zeros(k, dtype=np.int32)
+
+        vertical = first == "vertical"
+        ply = 0
+        while len(ids):
+            moves = legal_masks(free, vertical)
+            stuck = ~moves.reshape(len(ids), -1).any(axis=1)
+            if stuck.any():
+                # The side to move has no placement and loses
+                done = ids[stuck]
+                vertical_won[done] = not vertical
+                lengths[done] = ply
+                keep = ~stuck
+                ids, free, moves = ids[keep], free[keep], moves[keep]
+                if not len(ids):
+                    break
+
+            choice = self._choose(free, moves, vertical)
+            width = moves.shape[2]
+            r, c = np.divmod(choice, width)
+            games = np.arange(len(ids))
+            free[games, r, c] = False
+            if vertical:
+                free[games, r + 1, c] = False
+            else:
+                free[games, r, c + 1] = False
+            vertical = not vertical
+            ply += 1
+
+        return BatchResult(rows, cols, first, vertical_won, lengths, time.perf_counter() - start)
+
+
+def sweep(sizes, games, policy="random", batch_size=20000, seed=0, first="vertical"):
+    """Run `games` games for every (rows, cols) in sizes and merge each size's batches."""
+    results = []
+    for rows, cols in sizes:
+        sim = BatchSimulator(rows, cols, 0, policy, seed)
+        won, lengths, elapsed = [], [], 0.0
+        remaining = games
+        while remaining > 0:
+            sim.batch_size = min(batch_size, remaining)
+            batch = sim.run(first)
+            won.append(batch.vertical_won)
+            lengths.append(batch.lengths)
+            elapsed += batch.elapsed
+            remaining -= sim.batch_size
+        results.append(BatchResult(rows, cols, first, np.concatenate(won), np.concatenate(lengths), elapsed))
+    return results
+
+
+def _parse_size(text):
+    rows, _, cols = text.lower().partition("x")
+    return int(rows), int(cols or rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch Domineering self-play")
+    parser.add_argument("--sizes", nargs="+", default=["8x8"], help="board sizes such as 8x8 or 5x7")
+    parser.add_argument("--games", type=int, default=100000, help="games per size")
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--first", choices=("vertical", "horizontal"), default="vertical")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = sweep([_parse_size(s) for s in args.sizes], args.games, args.policy,
+                    args.batch_size, args.seed, args.first)
+    print(json.dumps([r.summary() for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+class Bitboard:
+    """
+    Packs the occupancy of a rows x cols Domineering board into Python ints.
+    Cell (row, col) maps to bit row * cols + col. Vertical and horizontal
+    dominoes are kept in separate ints so the owner of a cell is known.
+
+    A move is identified by its anchor bit: the top cell of a vertical
+    domino or the left cell of a horizontal one.
+    """
+
+    def __init__(self, rows, cols):
+        if rows < 1 or cols < 1:
+            raise ValueError("Board must have at least one row and one column")
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.full_mask = (1 << self.size) - 1
+
+        # Anchors that keep a domino inside the board
+        self.vertical_anchors = (1 << ((rows - 1) * cols)) - 1
+        row_anchors = (1 << (cols - 1)) - 1
+        self.horizontal_anchors = 0
+        for row in range(rows):
+            self.horizontal_anchors |= row_anchors << (row * cols)
+
+        # Two-cell footprint of a domino anchored at bit 0
+        self.vertical_pair = 1 | (1 << cols)
+        self.horizontal_pair = 0b11
+
+        self.vertical = 0
+        self.horizontal = 0
+
+    @property
+    def occupied(self):
+        return self.vertical | self.horizontal
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def position(self, index):
+        """Return the (row, col) of a bit index."""
+        return divmod(index, self.cols)
+
+    def vertical_moves(self, occupied=None):
+        """Anchor mask of every legal vertical placement."""
+        if occupied is None:
+            occupied = self.vertical | self.horizontal
+        free = ~occupied & self.full_mask
+        return free & (free >> self.cols) & self.vertical_anchors
+
+    def horizontal_moves(self, occupied=None):
+        """Anchor mask of every legal horizontal placement."""
+        if occupied is None:
+            occupied = self.vertical | self.horizontal
+        free = ~occupied & self.full_mask
+        return free & (free >> 1) & self.horizontal_anchors
+
+    def moves(self, vertical, occupied=None):
+        if vertical:
+            return self.vertical_moves(occupied)
+        return self.horizontal_moves(occupied)
+
+    def footprint(self, index, vertical):
+        """Mask of the two cells covered by a domino anchored at index."""
+        return (self.vertical_pair if vertical else self.horizontal_pair) << index
+
+    def is_legal(self, index, vertical):
+        anchors = self.vertical_anchors if vertical else self.horizontal_anchors
+        if not (anchors >> index) & 1:
+            return False
+        return not (self.vertical | self.horizontal) & self.footprint(index, vertical)
+
+    def place(self, index, vertical):
+        if vertical:
+            self.vertical |= self.vertical_pair << index
+        else:
+            self.horizontal |= self.horizontal_pair << index
+
+    def remove(self, index, vertical):
+        if vertical:
+            self.vertical &= ~(self.vertical_pair << index)
+        else:
+            self.horizontal &= ~(self.horizontal_pair << index)
+
+    def clear(self):
+        self.vertical = 0
+        self.horizontal = 0
+
+
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+    def popcount(mask):
+        """Number of set bits in mask (int.bit_count before Python 3.10)."""
+        return bin(mask).count("1")
+
+
+def iter_bits(mask):
+    """Yield the index of every set bit, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
@@ -0,0 +1,196 @@
+"""
+Combinatorial game values in canonical form.
+
+Left is the vertical player and Right the horizontal player, as is usual
+for Domineering. Canonical forms are unique, so every value is interned and
+two values are equal exactly when they are the same object.
+
+Memory stays bounded however many games are analysed: the interning table
+only holds values something else still refers to, and the comparison, sum
+and negation memos are LRU caches of MEMO_SIZE entries each.
+"""
+import weakref
+from functools import lru_cache
+
+MEMO_SIZE = 1 << 18  # entries per memo (le, add, neg)
+
+
+class CGValue:
+    """A short game {left | right} in canonical form. Build them with make_value."""
+
+    __slots__ = ("left", "right", "_hash", "__weakref__")
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self._hash = hash((left, right))
+
+    def __hash__(self):
+        return self._hash
+
+    def __add__(self, other):
+        return add(self, other)
+
+    def __neg__(self):
+        return neg(self)
+
+    def __repr__(self):
+        return describe(self)
+
+
+# A value that nothing refers to any more may be dropped and made again later:
+# as no other object with its form exists meanwhile, identity still means equality
+_interned = weakref.WeakValueDictionary()
+
+
+def _intern(left, right):
+    key = (left, right)
+    value = _interned.get(key)
+    if value is None:
+        value = _interned[key] = CGValue(left, right)
+    return value
+
+
+ZERO = _intern(frozenset(), frozenset())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def le(g, h):
+    """g <= h: no Left option of g is >= h and no Right option of h is <= g."""
+    return (not any(le(h, gl) for gl in g.left)
+            and not any(le(hr, g) for hr in h.right))
+
+
+def _form_le(left, right, h):
+    """{left | right} <= h, for a form whose options are canonical but that may not be."""
+    return (not any(le(h, gl) for gl in left)
+            and not any(_le_form(hr, left, right) for hr in h.right))
+
+
+def _le_form(g, left, right):
+    """g <= {left | right}, for a form whose options are canonical but that may not be."""
+    return (not any(_form_le(left, right, gl) for gl in g.left)
+            and not any(le(gr, g) for gr in right))
+
+
+def make_value(left, right):
+    """
+    Canonical value of {left | right}, where the options are canonical values.
+    Removes dominated options and bypasses reversible ones until stable.
+    """
+    left = set(left)
+    right = set(right)
+    while True:
+        # Dominated options: Left keeps maximal options, Right minimal ones
+        left = {a for a in left if not any(b is not a and le(a, b) for b in left)}
+        right = {a for a in right if not any(b is not a and le(b, a) for b in right)}
+
+        changed = False
+        # Left option gl is reversible through glr when glr <= G
+        for gl in list(left):
+            for glr in gl.right:
+                if _le_form(glr, left, right):
+                    left.discard(gl)
+                    left.update(glr.left)
+                    changed = True
+                    break
+            if changed:
+                break
+        if not changed:
+            # Right option gr is reversible through grl when grl >= G
+            for gr in list(right):
+                for grl in gr.left:
+                    if _form_le(left, right, grl):
+                        right.discard(gr)
+                        right.update(grl.right)
+                        changed = True
+                        break
+                if changed:
+                    break
+        if not changed:
+            return _intern(frozenset(left), frozenset(right))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def neg(g):
+    return _intern(frozenset(neg(gr) for gr in g.right),
+                   frozenset(neg(gl) for gl in g.left))
+
+
+def add(g, h):
+    if g is ZERO:
+        return h
+    if h is ZERO:
+        return g
+    return _add(g, h) if id(g) <= id(h) else _add(h, g)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _add(g, h):
+    """g + h, memoized with the operands in id order (the sum commutes)."""
+    left = [add(gl, h) for gl in g.left] + [add(g, hl) for hl in h.left]
+    right = [add(gr, h) for gr in g.right] + [add(g, hr) for hr in h.right]
+    return make_value(left, right)
+
+
+def outcome_class(g):
+    """
+    'L' (vertical wins), 'R' (horizontal wins), 'P' (the player to move
+    loses) or 'N' (the player to move wins).
+    """
+    g_ge_zero = le(ZERO, g)
+    g_le_zero = le(g, ZERO)
+    if g_ge_zero and g_le_zero:
+        return "P"
+    if g_ge_zero:
+        return "L"
+    if g_le_zero:
+        return "R"
+    return "N"
+
+
+def integer(n):
+    """The canonical value of the integer n."""
+    value = ZERO
+    for _ in range(abs(n)):
+        value = _intern(frozenset([value]), frozenset()) if n > 0 else _intern(frozenset(), frozenset([value]))
+    return value
+
+
+def _as_integer(g):
+    """The integer g equals, or None when g is not an integer."""
+    if g is ZERO:
+        return 0
+    if not g.right and len(g.left) == 1:
+        inner = _as_integer(next(iter(g.left)))
+        if inner is not None and inner >= 0:
+            return inner + 1
+    if not g.left and len(g.right) == 1:
+        inner = _as_integer(next(iter(g.right)))
+        if inner is not None and inner <= 0:
+            return inner - 1
+    return None
+
+
+def describe(g, _depth=0):
+    """Short text for a value: integers and * by name, the rest as {L|R}."""
+    n = _as_integer(g)
+    if n is not None:
+        return str(n)
+    if g is STAR:
+        return "*"
+    if _depth > 6:
+        return "{...}"
+    left = ",".join(sorted(describe(x, _depth + 1) for x in g.left))
+    right = ",".join(sorted(describe(x, _depth + 1) for x in g.right))
+    return "{" + left + "|" + right + "}"
+
+
+STAR = _intern(frozenset([ZERO]), frozenset([ZERO]))
+
+
+def clear_caches():
+    """Drop comparison and sum memos (interned values stay valid)."""
+    le.cache_clear()
+    _add.cache_clear()
+    neg.cache_clear()
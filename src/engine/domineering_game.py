@@ -0,0 +1,490 @@
+import struct
+from src.engine import metrics
+from src.engine.bitboard import Bitboard, iter_bits, popcount
+from src.engine.zobrist import keys_for
+
+SNAPSHOT_VERSION = 1
+# version, rows, cols, vertical to move, move order, board hash; the vertical
+# and horizontal occupancy bitmaps follow, ceil(rows * cols / 8) bytes each
+_SNAPSHOT_HEADER = struct.Struct("<BHHBIQ")
+_FREE_BITS = b"1" + b"0" * 255  # cell code -> "1" for a free cell, for bytes.translate
+
+
+class Game:
+    """
+    Core Domineering game logic without direct UI references.
+    Manages a rows x cols grid (board_size x board_size by default)
+    backed by a Bitboard, so every cell is 'vertical', 'horizontal' or None.
+
+    Per-orientation counts of legal and safe placements are kept up to date
+    by every placement and removal, so game-over checks never scan the board.
+    The same goes for the Zobrist hash of the occupancy, and every placement
+    is recorded in self.history as (row, col, orientation) so it can be
+    undone and redone without copying the board.
+
+    self.cells mirrors the board as one byte per cell (CELL_* codes), which
+    also tells which cell of a domino it is; single-cell lookups read it
+    instead of shifting bitboards, which grow with the board.
+    """
+
+    CELL_EMPTY = 0
+    CELL_VERTICAL = 1  # top cell of a vertical domino
+    CELL_VERTICAL_END = 2
+    CELL_HORIZONTAL = 3  # left cell of a horizontal domino
+    CELL_HORIZONTAL_END = 4
+
+    VERTICAL = "vertical"
+    HORIZONTAL = "horizontal"
+
+    def __init__(self, board_size=8, rows=None, cols=None):
+        self.board_size = board_size
+        self.rows = board_size if rows is None else rows
+        self.cols = board_size if cols is None else cols
+        self.bitboard = Bitboard(self.rows, self.cols)
+        self.cells = bytearray(self.rows * self.cols)
+        self.regions = None  # RegionMap, once track_regions() is called
+        self.current_orientation = self.VERTICAL  # Example default
+        self.keys = keys_for(self.rows, self.cols)
+        self.board_hash = 0  # Zobrist hash of the occupied cells only
+        self.history = []
+        self._redo = []
+        self._reset_counters()
+
+    def toggle_orientation(self):
+        """Switch between vertical/horizontal placement."""
+        if self.current_orientation == self.VERTICAL:
+            self.current_orientation = self.HORIZONTAL
+        else:
+            self.current_orientation = self.VERTICAL
+
+    def get_cell_state(self, row, col):
+        """Return the state of a cell."""
+        code = self.cells[row * self.cols + col]
+        if not code:
+            return None
+        return self.VERTICAL if code <= self.CELL_VERTICAL_END else self.HORIZONTAL
+
+    def place_domino(self, row, col):
+        """
+        Attempt to place a domino with the current orientation.
+        Returns True if successful, False if invalid move.
+        """
+        if not self._is_valid(row, col, self.current_orientation):
+            return False
+
+        self._place(row, col, self.current_orientation)
+        self._redo.clear()
+        return True
+
+    def _place(self, row, col, orientation):
+        vertical = orientation == self.VERTICAL
+        index = row * self.cols + col
+        self._update_counters(row, col, vertical, True)
+        if self.regions is not None:
+            self.regions.place(self.bitboard.footprint(index, vertical))
+        self.board_hash ^= (self.keys.vertical_move if vertical else self.keys.horizontal_move)[index]
+        self.history.append((row, col, orientation))
+
+    def remove_domino(self, row, col, orientation):
+        """
+        Take back a domino of `orientation` anchored at (row, col).
+        Returns False if no such domino is on the board.
+        """
+        vertical = orientation == self.VERTICAL
+        index = row * self.cols + col
+        if row < 0 or col < 0 or row >= self.rows or col >= self.cols:
+            return False
+        # (row, col) must be the anchor of such a domino, not its second cell or a cell wrapping onto the next row
+        anchors = self.bitboard.vertical_anchors if vertical else self.bitboard.horizontal_anchors
+        anchor_code = self.CELL_VERTICAL if vertical else self.CELL_HORIZONTAL
+        if not (anchors >> index) & 1 or self.cells[index] != anchor_code:
+            return False
+        footprint = self.bitboard.footprint(index, vertical)
+
+        self._update_counters(row, col, vertical, False)
+        if self.regions is not None:
+            self.regions.remove(footprint)
+        self.board_hash ^= (self.keys.vertical_move if vertical else self.keys.horizontal_move)[index]
+        move = (row, col, orientation)
+        if self.history and self.history[-1] == move:
+            self.history.pop()
+        elif move in self.history:
+            self.history.remove(move)
+        return True
+
+    def _mark(self, index, vertical, placed):
+        """Set or clear a domino in both the bitboard and the cell bytes."""
+        second = index + (self.cols if vertical else 1)
+        if placed:
+            self.bitboard.place(index, vertical)
+            if vertical:
+                self.cells[index], self.cells[second] = self.CELL_VERTICAL, self.CELL_VERTICAL_END
+            else:
+                self.cells[index], self.cells[second] = self.CELL_HORIZONTAL, self.CELL_HORIZONTAL_END
+        else:
+            self.bitboard.remove(index, vertical)
+            self.cells[index] = self.cells[second] = self.CELL_EMPTY
+
+    def undo_move(self):
+        """
+        Take back the last placement and give the turn back to whoever made it.
+        Returns the (row, col, orientation) undone, or None if there is nothing to undo.
+        """
+        if not self.history:
+            return None
+        move = self.history[-1]
+        self.remove_domino(*move)
+        self._redo.append(move)
+        self.current_orientation = move[2]
+        return move
+
+    def redo_move(self):
+        """
+        Replay the last undone placement and pass the turn to the other side.
+        Returns the (row, col, orientation) redone, or None if there is nothing to redo.
+        A new placement through place_domino discards the redo stack.
+        """
+        if not self._redo:
+            return None
+        move = self._redo.pop()
+        self._place(*move)
+        self.current_orientation = move[2]
+        self.toggle_orientation()
+        return move
+
+    def can_undo(self):
+        return bool(self.history)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def copy(self):
+        """An independent Game with the same moves (and side to move), e.g. for a background search."""
+        game = Game(rows=self.rows, cols=self.cols)
+        game.board_size = self.board_size
+        # Copied field by field; replaying the history costs too much on large boards
+        game.bitboard.vertical = self.bitboard.vertical
+        game.bitboard.horizontal = self.bitboard.horizontal
+        game.cells = bytearray(self.cells)
+        game.board_hash = self.board_hash
+        game.history = list(self.history)
+        game._move_counts = dict(self._move_counts)
+        game._safe_lines = {orientation: list(lines) for orientation, lines in self._safe_lines.items()}
+        game._safe_counts = {orientation: list(counts) for orientation, counts in self._safe_counts.items()}
+        game._safe_totals = dict(self._safe_totals)
+        game._vertical_safe_rows = list(self._vertical_safe_rows)
+        game.current_orientation = self.current_orientation
+        return game
+
+    def snapshot(self, order=None):
+        """
+        The position as compact bytes: a header with the size, side to move,
+        move order (default: placements so far) and hash, then one occupancy
+        bitmap per orientation. 34 bytes for an 8x8 board.
+        """
+        size = (self.rows * self.cols + 7) // 8
+        header = _SNAPSHOT_HEADER.pack(SNAPSHOT_VERSION, self.rows, self.cols,
+                                       self.current_orientation == self.VERTICAL,
+                                       len(self.history) if order is None else order, self.board_hash)
+        return (header + self.bitboard.vertical.to_bytes(size, "little")
+                + self.bitboard.horizontal.to_bytes(size, "little"))
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """A new Game with the position of a snapshot; returns (game, move order)."""
+        try:
+            _, rows, cols, _, _, _ = _SNAPSHOT_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("truncated snapshot") from None
+        game = cls(rows=rows, cols=cols)
+        game.board_size = rows
+        return game, game.load_snapshot(data)
+
+    def load_snapshot(self, data):
+        """
+        Replace the position with a snapshot of a board of the same size and
+        return its move order. The board is rebuilt from the bitmaps without
+        replaying any move; history and redo start over empty. Raises
+        ValueError on a malformed snapshot or one whose hash does not match.
+        """
+        try:
+            version, rows, cols, vertical_to_move, order, board_hash = _SNAPSHOT_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("truncated snapshot") from None
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        if (rows, cols) != (self.rows, self.cols):
+            raise ValueError(f"snapshot is {rows}x{cols}, the board is {self.rows}x{self.cols}")
+        n = rows * cols
+        size = (n + 7) // 8
+        start = _SNAPSHOT_HEADER.size
+        if len(data) != start + 2 * size:
+            raise ValueError("snapshot has the wrong length")
+        vertical = int.from_bytes(data[start:start + size], "little")
+        horizontal = int.from_bytes(data[start + size:], "little")
+        if vertical & horizontal or (vertical | horizontal) >> n:
+            raise ValueError("snapshot has overlapping or out-of-board cells")
+
+        # Pair up the cells of each orientation, lowest cell first, as in Board
+        cells = bytearray(n)
+        new_hash = 0
+        for bits, is_vertical, first_code, keys in (
+                (vertical, True, self.CELL_VERTICAL, self.keys.vertical_move),
+                (horizontal, False, self.CELL_HORIZONTAL, self.keys.horizontal_move)):
+            pending = _bit_string(bits, n)
+            index = pending.find(b"1")
+            while index >= 0:
+                second = index + (cols if is_vertical else 1)
+                if second >= n or pending[second] != 0x31 or (not is_vertical and second % cols == 0):
+                    raise ValueError("snapshot has a cell that is not part of a domino")
+                pending[second] = 0x30
+                cells[index], cells[second] = first_code, first_code + 1
+                new_hash ^= keys[index]
+                index = pending.find(b"1", index + 1)
+        if new_hash != board_hash:
+            raise ValueError("snapshot hash does not match its position")
+
+        self.bitboard.vertical = vertical
+        self.bitboard.horizontal = horizontal
+        self.cells = cells
+        self.board_hash = board_hash
+        self.current_orientation = self.VERTICAL if vertical_to_move else self.HORIZONTAL
+        self.history = []
+        self._redo = []
+        self._rebuild_counters()
+        if self.regions is not None:
+            self.track_regions()
+        return order
+
+    def zobrist_hash(self, orientation=None):
+        """
+        64-bit Zobrist hash of the position with `orientation` (default: the
+        current one) to move; the same key the solver uses for its table.
+        """
+        if orientation is None:
+            orientation = self.current_orientation
+        return self.board_hash ^ self.keys.side if orientation == self.VERTICAL else self.board_hash
+
+    def is_valid_move(self, row, col, orientation):
+        """Check if the current orientation domino can be placed at (row, col)."""
+        return self._is_valid(row, col, orientation)
+
+    def _is_valid(self, row, col, orientation):
+        # Uninstrumented, for the engine's own checks; is_valid_move is timed when metrics are on
+        if row < 0 or col < 0 or row >= self.rows or col >= self.cols:
+            return False
+        index = row * self.cols + col
+        if orientation == self.VERTICAL:
+            return row + 1 < self.rows and not self.cells[index] and not self.cells[index + self.cols]
+        return col + 1 < self.cols and not self.cells[index] and not self.cells[index + 1]
+
+    def legal_move_mask(self, orientation):
+        """Bitboard of the anchor cell of every legal placement."""
+        return self.bitboard.moves(orientation == self.VERTICAL)
+
+    def legal_moves(self, orientation):
+        """List the (row, col) anchor of every legal placement."""
+        cols = self.cols
+        mask = self.legal_move_mask(orientation)
+        if self.rows * cols <= 1024:
+            return [divmod(index, cols) for index in iter_bits(mask)]
+        # iter_bits is quadratic on long masks, so split large boards into rows first
+        row_mask = (1 << cols) - 1
+        moves = []
+        for row in range(self.rows):
+            moves.extend((row, col) for col in iter_bits(mask & row_mask))
+            mask >>= cols
+        return moves
+
+    def has_moves(self, orientation):
+        """True while `orientation` can still place a domino; the player to move without one loses."""
+        return self._move_counts[orientation] > 0
+
+    def move_count(self, orientation):
+        """Number of legal placements for `orientation`."""
+        return self._move_counts[orientation]
+
+    def safe_move_count(self, orientation):
+        """
+        Number of disjoint placements for `orientation` that the opponent can
+        never block: both cells are flanked across the opponent's direction
+        by occupied cells or the edge.
+        """
+        return self._safe_totals[orientation]
+
+    def move_coverage(self):
+        """
+        Whole-board cell masks for move analysis: (vertical, horizontal,
+        vertical safe, horizontal safe). The first two hold every cell some
+        legal placement of that orientation covers, the safe ones the cells of
+        placements the opponent can never block.
+        """
+        bitboard = self.bitboard
+        cols = self.cols
+        vertical = bitboard.vertical_moves()
+        horizontal = bitboard.horizontal_moves()
+        vertical_safe, horizontal_safe = self._safe_cells()
+        # A safe cell is only usable next to another safe cell along the domino
+        vertical_safe &= (vertical_safe << cols) | (vertical_safe >> cols)
+        horizontal_safe &= ((horizontal_safe << 1) & (bitboard.horizontal_anchors << 1)) | (
+            (horizontal_safe >> 1) & bitboard.horizontal_anchors)
+        return (vertical | (vertical << cols), horizontal | (horizontal << 1),
+                vertical_safe, horizontal_safe)
+
+    def track_regions(self):
+        """Start keeping self.regions, the board's independent empty regions, up to date."""
+        from src.engine.regions import RegionMap
+        self.regions = RegionMap(self.rows, self.cols, self.bitboard.occupied)
+        return self.regions
+
+    def clear_board(self):
+        """Reset the board to empty."""
+        self.bitboard.clear()
+        self.cells = bytearray(self.rows * self.cols)
+        self.board_hash = 0
+        self.history.clear()
+        self._redo.clear()
+        self._reset_counters()
+        if self.regions is not None:
+            self.regions.clear()
+
+    # Incremental counters. A placement only changes the legality of the
+    # anchors touching its two cells and the safety of the cells next to it,
+    # so both are recounted from the few rows and columns around it.
+
+    def _reset_counters(self):
+        rows, cols = self.rows, self.cols
+        self._move_counts = {
+            self.VERTICAL: (rows - 1) * cols,
+            self.HORIZONTAL: rows * (cols - 1),
+        }
+        # Safe cells as one bitmask per column (vertical) or per row (horizontal)
+        self._safe_lines = {
+            self.VERTICAL: [0] * cols,
+            self.HORIZONTAL: [0] * rows,
+        }
+        self._safe_counts = {
+            self.VERTICAL: [0] * cols,
+            self.HORIZONTAL: [0] * rows,
+        }
+        self._safe_totals = {self.VERTICAL: 0, self.HORIZONTAL: 0}
+        # The vertical safe cells again, one bitmask per row, to see which columns a placement changes
+        self._vertical_safe_rows = [0] * rows
+        # On an empty board a cell is only safe when the board is one cell wide (or tall)
+        if rows == 1 or cols == 1:
+            self._rebuild_counters()
+
+    def _rebuild_counters(self):
+        """Recompute every counter from the bitboards, e.g. after loading a snapshot."""
+        rows, cols, n = self.rows, self.cols, self.rows * self.cols
+        bitboard = self.bitboard
+        self._move_counts = {
+            self.VERTICAL: popcount(bitboard.vertical_moves()),
+            self.HORIZONTAL: popcount(bitboard.horizontal_moves()),
+        }
+        vertical_safe, horizontal_safe = self._safe_cells()
+        vertical_safe = _bit_string(vertical_safe, n).decode("ascii")
+        horizontal_safe = _bit_string(horizontal_safe, n).decode("ascii")
+        self._safe_lines = {
+            self.VERTICAL: [int(vertical_safe[col::cols][::-1], 2) for col in range(cols)],
+            self.HORIZONTAL: [int(horizontal_safe[row * cols:(row + 1) * cols][::-1], 2) for row in range(rows)],
+        }
+        self._safe_counts = {orientation: [_disjoint_pairs(mask) for mask in lines]
+                             for orientation, lines in self._safe_lines.items()}
+        self._safe_totals = {orientation: sum(counts) for orientation, counts in self._safe_counts.items()}
+        self._vertical_safe_rows = [int(vertical_safe[row * cols:(row + 1) * cols][::-1], 2) for row in range(rows)]
+
+    def _safe_cells(self):
+        """
+        Masks of the cells the opponent can never take away from vertical
+        (free, with left and right blocked) and from horizontal (free, with
+        above and below blocked).
+        """
+        bitboard = self.bitboard
+        cols = self.cols
+        free = ~bitboard.occupied & bitboard.full_mask
+        not_last_col = bitboard.horizontal_anchors
+        left_free = (free << 1) & (not_last_col << 1)
+        right_free = (free >> 1) & not_last_col
+        return (free & ~left_free & ~right_free,
+                free & ~(free << cols) & ~(free >> cols) & bitboard.full_mask)
+
+    def _update_counters(self, row, col, vertical, placed):
+        """
+        Place or remove a domino in the bitboard and cells, and patch the
+        counters from a free-cell mask of the rows around it, read straight
+        from the cell bytes (bit k * cols + c is cell c of the k-th row read).
+        """
+        rows, cols = self.rows, self.cols
+        index = row * cols + col
+        self._mark(index, vertical, placed)
+        last_row = row + 1 if vertical else row
+        first_row = row - 2 if row > 1 else 0
+        end_row = last_row + 3 if last_row + 3 < rows else rows
+        free = int(self.cells[first_row * cols:end_row * cols].translate(_FREE_BITS)[::-1], 2)
+
+        # The legal anchors touching the domino, counted with its cells free:
+        # all of them are lost by placing it and gained by removing it
+        bitboard = self.bitboard
+        anchors = bitboard.horizontal_anchors  # the same in every row, so it lines up with the band
+        footprint = bitboard.footprint(index - first_row * cols, vertical)
+        free_before = free | footprint
+        vertical_moves = popcount(free_before & (free_before >> cols) & (footprint | (footprint >> cols)))
+        horizontal_moves = popcount(free_before & (free_before >> 1) & (footprint | (footprint >> 1)) & anchors)
+        if placed:
+            self._move_counts[self.VERTICAL] -= vertical_moves
+            self._move_counts[self.HORIZONTAL] -= horizontal_moves
+        else:
+            self._move_counts[self.VERTICAL] += vertical_moves
+            self._move_counts[self.HORIZONTAL] += horizontal_moves
+
+        # Safe cells of the band (only rows with both neighbours in it are read).
+        # Horizontal safety depends on the rows above and below a cell, so it
+        # can change in rows row - 1 .. last_row + 1; vertical safety depends on
+        # the cells beside it, so it only changes in the domino's rows
+        horizontal_safe = free & ~(free << cols) & ~(free >> cols)
+        vertical_safe = free & ~((free & anchors) << 1) & ~((free >> 1) & anchors)
+        row_mask = (1 << cols) - 1
+        lines = self._safe_lines[self.HORIZONTAL]
+        for line in range(row - 1 if row else 0, last_row + 2 if last_row + 1 < rows else rows):
+            mask = (horizontal_safe >> ((line - first_row) * cols)) & row_mask
+            if mask != lines[line]:
+                self._set_safe_line(self.HORIZONTAL, line, mask)
+        safe_rows = self._vertical_safe_rows
+        lines = self._safe_lines[self.VERTICAL]
+        for line in range(row, last_row + 1):
+            mask = (vertical_safe >> ((line - first_row) * cols)) & row_mask
+            changed = mask ^ safe_rows[line]
+            if changed:
+                # Recount the columns where it did
+                safe_rows[line] = mask
+                bit = 1 << line
+                for c in iter_bits(changed):
+                    self._set_safe_line(self.VERTICAL, c, lines[c] ^ bit)
+
+    def _set_safe_line(self, orientation, line, mask):
+        """Store the safe cells of one column (vertical) or row (horizontal) and update its pair count."""
+        self._safe_lines[orientation][line] = mask
+        count = _disjoint_pairs(mask)
+        counts = self._safe_counts[orientation]
+        self._safe_totals[orientation] += count - counts[line]
+        counts[line] = count
+
+def _bit_string(bits, n):
+    """Bits 0..n-1 of an int as ASCII "0"/"1" bytes, bit i at position i."""
+    return bytearray(format(bits, f"0{n}b")[::-1], "ascii")
+
+
+def _disjoint_pairs(mask):
+    """Sum of len // 2 over the runs of consecutive set bits in mask."""
+    pairs = 0
+    while mask:
+        low = mask & -mask
+        run = mask & ~(mask + low)  # lowest run of set bits
+        pairs += popcount(run) // 2
+        mask ^= run
+    return pairs
+
+
+metrics.instrument(Game, "place_domino", "engine.place_domino")
+metrics.instrument(Game, "is_valid_move", "engine.is_valid_move")
@@ -0,0 +1,230 @@
+"""
+Compact append-only log of played games.
+
+A log file is a 12-byte header (magic, version, record size, rows, cols)
+followed by fixed-size little-endian records, one per move:
+
+    record = anchor_index * 2 + is_vertical + 1
+
+and a 0 record closing each game. Boards of up to 32767 cells use 2-byte
+records, larger ones 4 bytes, so an 8x8 game of 20 moves takes 42 bytes.
+GameLogWriter streams moves to disk as they are played; GameLog memory-maps
+a file for random access to any game and ply.
+"""
+import mmap
+import os
+import struct
+
+from src.engine.domineering_game import Game
+
+MAGIC = b"DLOG"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBHH2x")  # magic, version, record size, rows, cols
+END_OF_GAME = 0
+
+
+class GameLogError(ValueError):
+    """Raised when a log file is malformed or does not match the board."""
+
+
+def record_size(rows, cols):
+    """Bytes per record for a rows x cols board."""
+    return 2 if rows * cols * 2 < 0xFFFF else 4
+
+
+def encode_record(row, col, orientation, cols):
+    return (row * cols + col) * 2 + (orientation == Game.VERTICAL) + 1
+
+
+def decode_record(record, cols):
+    """(row, col, orientation) of a move record."""
+    index, vertical = divmod(record - 1, 2)
+    row, col = divmod(index, cols)
+    return row, col, Game.VERTICAL if vertical else Game.HORIZONTAL
+
+
+def _record_format(size):
+    return "H" if size == 2 else "I"
+
+
+def _read_header(data, path):
+    if len(data) < _HEADER.size:
+        raise GameLogError(f"{path}: truncated header")
+    magic, version, size, rows, cols = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise GameLogError(f"{path}: not a version {VERSION} game log")
+    if size != record_size(rows, cols):
+        raise GameLogError(f"{path}: bad record size {size}")
+    return size, rows, cols
+
+
+class GameLogWriter:
+    """
+    Appends games to a log, creating it (with its header) if needed.
+    Moves are buffered; call flush() to make them visible to readers.
+    """
+
+    def __init__(self, path, rows, cols):
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.record_size = record_size(rows, cols)
+        self._file = open(path, "a+b")
+        self._file.seek(0)
+        header = self._file.read(_HEADER.size)
+        if header:
+            size, log_rows, log_cols = _read_header(header, path)
+            if (log_rows, log_cols) != (rows, cols):
+                self._file.close()
+                raise GameLogError(f"{path}: log is for a {log_rows}x{log_cols} board")
+        else:
+            self._file.write(_HEADER.pack(MAGIC, VERSION, self.record_size, rows, cols))
+        self._file.seek(0, os.SEEK_END)
+        self._pack = struct.Struct("<" + _record_format(self.record_size)).pack
+        self._open_game = False
+
+    def append(self, row, col, orientation):
+        """Add one move to the game in progress."""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise GameLogError(f"move ({row}, {col}) is off the board")
+        self._file.write(self._pack(encode_record(row, col, orientation, self.cols)))
+        self._open_game = True
+
+    def end_game(self):
+        """Close the game in progress; the next append starts a new one."""
+        self._file.write(self._pack(END_OF_GAME))
+        self._open_game = False
+
+    def write_game(self, moves):
+        """Append a whole game, e.g. Game.history."""
+        pack, cols = self._pack, self.cols
+        self._file.write(b"".join(pack(encode_record(row, col, orientation, cols))
+                                  for row, col, orientation in moves))
+        self.end_game()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        """Flush and close; a game still in progress is closed first."""
+        if self._file.closed:
+            return
+        if self._open_game:
+            self.end_game()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameLog:
+    """
+    Read-only, memory-mapped view of a log. Games are found by scanning for
+    end records once; after that any move of any game is a single lookup.
+    A trailing game without its end record (a writer still running) is included.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise GameLogError(f"{path}: truncated header")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.record_size, self.rows, self.cols = _read_header(self._map, path)
+        self._format = _record_format(self.record_size)
+        self._records = (len(self._map) - _HEADER.size) // self.record_size
+        self._games = None
+
+    def _offset(self, record):
+        return _HEADER.size + record * self.record_size
+
+    def _index(self):
+        """(first, end) record range of every game."""
+        if self._games is None:
+            games, start, size = [], 0, self.record_size
+            separator = b"\0" * size
+            end_offset = self._offset(self._records)
+            offset = self._map.find(separator, _HEADER.size, end_offset)
+            while offset != -1:
+                if (offset - _HEADER.size) % size:
+                    # Zero bytes straddling two records, not an end record
+                    offset = self._map.find(separator, offset + 1, end_offset)
+                    continue
+                record = (offset - _HEADER.size) // size
+                games.append((start, record))
+                start = record + 1
+                offset = self._map.find(separator, offset + size, end_offset)
+            if start < self._records:
+                games.append((start, self._records))
+            self._games = games
+        return self._games
+
+    def __len__(self):
+        return len(self._index())
+
+    def game_length(self, game):
+        first, end = self._index()[game]
+        return end - first
+
+    def records(self, game):
+        """Raw move records of a game as a tuple of ints."""
+        first, end = self._index()[game]
+        return struct.unpack_from(f"<{end - first}{self._format}", self._map, self._offset(first))
+
+    def moves(self, game):
+        """The (row, col, orientation) moves of a game."""
+        cols = self.cols
+        return [decode_record(record, cols) for record in self.records(game)]
+
+    def move(self, game, ply):
+        """The move played at `ply` (0-based) of a game."""
+        first, end = self._index()[game]
+        if not 0 <= ply < end - first:
+            raise IndexError(f"game {game} has no ply {ply}")
+        (record,) = struct.unpack_from("<" + self._format, self._map, self._offset(first + ply))
+        return decode_record(record, self.cols)
+
+    def occupancy(self, game, ply=None):
+        """
+        (vertical, horizontal) bitboards after the first `ply` moves (all of
+        them by default), built straight from the records without rule checks.
+        """
+        records = self.records(game)
+        if ply is not None:
+            records = records[:ply]
+        vertical = horizontal = 0
+        cols = self.cols
+        for record in records:
+            index, is_vertical = divmod(record - 1, 2)
+            if is_vertical:
+                vertical |= (1 << index) | (1 << (index + cols))
+            else:
+                horizontal |= 3 << index
+        return vertical, horizontal
+
+    def position(self, game, ply=None):
+        """
+        A Game replayed through the first `ply` moves (all by default), with
+        its history, counters and hash in place and the next side to move set.
+        Raises GameLogError if the log contains an illegal move.
+        """
+        position = Game(rows=self.rows, cols=self.cols)
+        moves = self.moves(game)
+        for number, (row, col, orientation) in enumerate(moves[:ply] if ply is not None else moves):
+            position.current_orientation = orientation
+            if not position.place_domino(row, col):
+                raise GameLogError(f"game {game}, ply {number}: illegal move ({row}, {col}, {orientation})")
+            position.toggle_orientation()
+        return position
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,490 @@
+"""
+Monte Carlo Tree Search for boards far beyond exact search (16x16, 32x32).
+
+UCT selection over a tree of occupancy bitboards, one node expanded per
+iteration, a pluggable rollout policy and a wall-clock budget per move.
+The tree is kept between moves: when the next search starts from a position
+two plies (or one) below the old root, that subtree becomes the new root.
+A node cap keeps memory bounded by cutting the least-visited subtrees.
+
+With workers > 1, extra processes search the same position independently
+(root parallelization) and their root statistics are added to the local
+tree's, so more rollouts fit in the same wall-clock budget.
+
+    python -m src.engine.mcts --size 16x16 --time 2 --games 10
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.engine.bitboard import iter_bits
+from src.engine.domineering_game import Game
+
+
+class _Shape:
+    """Per-board-shape tables for tree moves and rollouts."""
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+        self.vertical_anchors = [i for i in range((rows - 1) * cols)]
+        self.horizontal_anchors = [i for i in range(self.size) if i % cols + 1 < cols]
+        self.vertical_mask = (1 << ((rows - 1) * cols)) - 1
+        self.horizontal_mask = 0
+        for i in self.horizontal_anchors:
+            self.horizontal_mask |= 1 << i
+        self.vertical_pair = 1 | (1 << cols)
+
+    def moves(self, occupied, vertical):
+        free = ~occupied & self.full
+        if vertical:
+            return free & (free >> self.cols) & self.vertical_mask
+        return free & (free >> 1) & self.horizontal_mask
+
+    def footprint(self, anchor, vertical):
+        return (self.vertical_pair if vertical else 3) << anchor
+
+
+_shapes = {}
+
+
+def _shape_for(rows, cols):
+    shape = _shapes.get((rows, cols))
+    if shape is None:
+        shape = _shapes[(rows, cols)] = _Shape(rows, cols)
+    return shape
+
+
+# Rollout policies: policy(shape, free, vertical, rng) plays the position out
+# on `free` (a bytearray, 1 = empty cell, modified in place) with `vertical`
+# to move, and returns True when vertical wins.
+
+def _pick_legal(candidates, free, step, rng):
+    """A random legal anchor from candidates, dropping dead ones on the way; None if none is left."""
+    while candidates:
+        i = rng.randrange(len(candidates))
+        anchor = candidates[i]
+        if free[anchor] and free[anchor + step]:
+            return anchor
+        candidates[i] = candidates[-1]
+        candidates.pop()
+    return None
+
+
+def random_rollout(shape, free, vertical, rng):
+    """Both sides play uniformly random legal moves."""
+    cols = shape.cols
+    pools = {True: list(shape.vertical_anchors), False: list(shape.horizontal_anchors)}
+    while True:
+        step = cols if vertical else 1
+        anchor = _pick_legal(pools[vertical], free, step, rng)
+        if anchor is None:
+            return not vertical
+        free[anchor] = free[anchor + step] = 0
+        vertical = not vertical
+
+
+def _mobility_gain(shape, free, anchor, vertical):
+    """Opponent placements a move destroys minus own placements it uses up besides itself."""
+    cols = shape.cols
+    gain = 0
+    if vertical:
+        for cell in (anchor, anchor + cols):
+            col = cell % cols
+            if col and free[cell - 1]:
+                gain += 1
+            if col + 1 < cols and free[cell + 1]:
+                gain += 1
+        if anchor >= cols and free[anchor - cols]:
+            gain -= 1
+        if anchor + 2 * cols < shape.size and free[anchor + 2 * cols]:
+            gain -= 1
+    else:
+        col = anchor % cols
+        for cell in (anchor, anchor + 1):
+            if cell >= cols and free[cell - cols]:
+                gain += 1
+            if cell + cols < shape.size and free[cell + cols]:
+                gain += 1
+        if col and free[anchor - 1]:
+            gain -= 1
+        if col + 2 < cols and free[anchor + 2]:
+            gain -= 1
+    return gain
+
+
+def _mobility_gain_bits(shape, free, anchor, vertical):
+    """_mobility_gain on a free-cell bitboard instead of a bytearray."""
+    cols = shape.cols
+    gain = 0
+    if vertical:
+        for cell in (anchor, anchor + cols):
+            col = cell % cols
+            if col and (free >> (cell - 1)) & 1:
+                gain += 1
+            if col + 1 < cols and (free >> (cell + 1)) & 1:
+                gain += 1
+        if anchor >= cols and (free >> (anchor - cols)) & 1:
+            gain -= 1
+        if anchor + 2 * cols < shape.size and (free >> (anchor + 2 * cols)) & 1:
+            gain -= 1
+    else:
+        col = anchor % cols
+        for cell in (anchor, anchor + 1):
+            if cell >= cols and (free >> (cell - cols)) & 1:
+                gain += 1
+            if cell + cols < shape.size and (free >> (cell + cols)) & 1:
+                gain += 1
+        if col and (free >> (anchor - 1)) & 1:
+            gain -= 1
+        if col + 2 < cols and (free >> (anchor + 2)) & 1:
+            gain -= 1
+    return gain
+
+
+def safe_rollout(shape, free, vertical, rng, samples=6):
+    """
+    Safe moves (ones the opponent can never block) are kept for last: each
+    side samples a few legal moves and plays the one that takes the most
+    placements away from the opponent while using up the fewest of its own.
+    A safe move takes nothing away, so it is only chosen when nothing
+    contested is left in the sample.
+    """
+    cols = shape.cols
+    pools = {True: list(shape.vertical_anchors), False: list(shape.horizontal_anchors)}
+    while True:
+        step = cols if vertical else 1
+        pool = pools[vertical]
+        best = _pick_legal(pool, free, step, rng)
+        if best is None:
+            return not vertical
+        best_gain = _mobility_gain(shape, free, best, vertical)
+        for _ in range(samples - 1):
+            anchor = pool[rng.randrange(len(pool))]
+            if free[anchor] and free[anchor + step]:
+                gain = _mobility_gain(shape, free, anchor, vertical)
+                if gain > best_gain:
+                    best, best_gain = anchor, gain
+        free[best] = free[best + step] = 0
+        vertical = not vertical
+
+
+ROLLOUT_POLICIES = {"random": random_rollout, "safe": safe_rollout}
+
+
+class Node:
+    """
+    A position in the tree. wins counts rollouts won by the side that made
+    the move leading here, so a parent picks the child with the best ratio.
+    """
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "vertical", "prior")
+
+    def __init__(self, move, parent, vertical, untried):
+        self.move = move  # anchor index; None at the root
+        self.parent = parent
+        self.children = []
+        self.untried = untried  # anchors not expanded yet, in random order
+        self.visits = 0
+        self.wins = 0.0
+        self.vertical = vertical  # side to move here
+        self.prior = 0  # mobility gain of the move leading here
+
+
+class MCTSResult:
+    """Best move of a search plus its statistics."""
+
+    def __init__(self, orientation, best_move, visits, win_rate, rollouts, elapsed, tree_nodes, moves):
+        self.orientation = orientation
+        self.best_move = best_move  # (row, col) or None when there is no legal move
+        self.visits = visits
+        self.win_rate = win_rate  # estimated chance that `orientation` wins after best_move
+        self.rollouts = rollouts
+        self.elapsed = elapsed
+        self.tree_nodes = tree_nodes
+        self.moves = moves  # [((row, col), visits, win rate)] of every root child, most visited first
+
+    @property
+    def rollouts_per_second(self):
+        return self.rollouts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"MCTSResult(best_move={self.best_move}, win_rate={self.win_rate:.2f}, rollouts={self.rollouts}, "
+                f"rollouts/s={self.rollouts_per_second:.0f}, tree_nodes={self.tree_nodes})")
+
+
+class MCTS:
+    """
+    UCT search. `policy` is a key of ROLLOUT_POLICIES or a function with the
+    same signature. Children are expanded best-first by how many opponent
+    placements their move destroys, and only as the node's visits grow, so
+    wide roots on large boards are not spread one visit per move. The tree
+    is reused between calls to search() on the same board and never grows
+    beyond max_nodes nodes.
+    """
+
+    def __init__(self, policy="safe", exploration=0.7, max_nodes=200000, workers=1, seed=None, widening=2.0,
+                 bias=0.1):
+        self.rollout = ROLLOUT_POLICIES[policy] if isinstance(policy, str) else policy
+        self.policy = policy
+        self.exploration = exploration
+        # Progressive widening: a node with N visits has at most widening * sqrt(N) children
+        self.widening = widening
+        # Progressive bias: the mobility gain of a move counts in UCT, fading as it gets visits
+        self.bias = bias
+        self.max_nodes = max_nodes
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_occupied = None
+        self.shape = None
+        self.tree_nodes = 0
+        self.pruned = 0
+        self._pool = None
+
+    def _new_node(self, move, parent, occupied, vertical):
+        untried = list(iter_bits(self.shape.moves(occupied, vertical)))
+        self.rng.shuffle(untried)
+        # Expanded from the end: the moves that hurt the opponent most come first
+        free = ~occupied & self.shape.full
+        untried.sort(key=lambda anchor: _mobility_gain_bits(self.shape, free, anchor, vertical))
+        self.tree_nodes += 1
+        return Node(move, parent, vertical, untried)
+
+    def _set_root(self, occupied, vertical):
+        """Reuse the subtree for this position if the previous search reached it."""
+        if self.root is not None:
+            shape = self.shape
+            frontier = [(self.root, self.root_occupied)]
+            for _ in range(2):
+                next_frontier = []
+                for node, node_occupied in frontier:
+                    for child in node.children:
+                        child_occupied = node_occupied | shape.footprint(child.move, node.vertical)
+                        if child_occupied == occupied and child.vertical == vertical:
+                            child.parent = None
+                            child.move = None
+                            self.root, self.root_occupied = child, occupied
+                            self.tree_nodes = _count(child)
+                            return True
+                        next_frontier.append((child, child_occupied))
+                frontier = next_frontier
+        self.tree_nodes = 0
+        self.root = self._new_node(None, None, occupied, vertical)
+        self.root_occupied = occupied
+        return False
+
+    def search(self, game, orientation=None, time_limit=1.0, max_rollouts=None):
+        """Search `game` with `orientation` (default: the side to move) to move for time_limit seconds."""
+        if orientation is None:
+            orientation = game.current_orientation
+        vertical = orientation == game.VERTICAL
+        if self.shape is None or (self.shape.rows, self.shape.cols) != (game.rows, game.cols):
+            self.shape = _shape_for(game.rows, game.cols)
+            self.root = None
+        occupied = game.bitboard.occupied
+        self._set_root(occupied, vertical)
+
+        start = time.perf_counter()
+        deadline = start + time_limit
+        futures = []
+        if self.workers > 1 and self.root.untried + self.root.children:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers - 1)
+            futures = [self._pool.submit(_worker_search, game.rows, game.cols, occupied, vertical,
+                                         self.policy if isinstance(self.policy, str) else "safe",
+                                         self.exploration, self.widening, self.bias, self.max_nodes, time_limit,
+                                         max_rollouts, self.rng.getrandbits(32))
+                       for _ in range(self.workers - 1)]
+
+        rollouts = self._run(deadline, max_rollouts)
+        moves = {child.move: [child.visits, child.wins] for child in self.root.children}
+        for future in futures:
+            worker_rollouts, worker_moves = future.result()
+            rollouts += worker_rollouts
+            for move, (visits, wins) in worker_moves.items():
+                totals = moves.setdefault(move, [0, 0.0])
+                totals[0] += visits
+                totals[1] += wins
+        elapsed = time.perf_counter() - start
+
+        cols = game.cols
+        ranked = sorted(((visits, wins, move) for move, (visits, wins) in moves.items() if visits),
+                        reverse=True)
+        if not ranked:
+            untried = self.root.untried
+            best_move = divmod(untried[0], cols) if untried else None
+            return MCTSResult(orientation, best_move, 0, 0.0, rollouts, elapsed, self.tree_nodes, [])
+        visits, wins, move = ranked[0]
+        return MCTSResult(orientation, divmod(move, cols), visits, wins / visits, rollouts, elapsed,
+                          self.tree_nodes,
+                          [(divmod(m, cols), v, w / v) for v, w, m in ranked])
+
+    def _run(self, deadline, max_rollouts):
+        """Run iterations until the deadline or max_rollouts; returns how many ran."""
+        shape, rng, rollout = self.shape, self.rng, self.rollout
+        root, root_occupied = self.root, self.root_occupied
+        exploration, bias = self.exploration, self.bias
+        root_free = bytearray(((root_occupied >> i) & 1) ^ 1 for i in range(shape.size))
+        count = 0
+        while max_rollouts is None or count < max_rollouts:
+            if not count & 15 and time.perf_counter() >= deadline:
+                break
+            node, occupied = root, root_occupied
+            path_moves = []
+
+            # Selection
+            while node.children and (not node.untried
+                                     or len(node.children) > self.widening * math.sqrt(node.visits)):
+                log_visits = math.log(node.visits)
+                best, best_score = None, -1.0
+                for child in node.children:
+                    score = (child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+                             + bias * child.prior / (child.visits + 1))
+                    if score > best_score:
+                        best, best_score = child, score
+                path_moves.append((best.move, node.vertical))
+                occupied |= shape.footprint(best.move, node.vertical)
+                node = best
+
+            # Expansion
+            if node.untried and len(node.children) <= self.widening * math.sqrt(node.visits):
+                move = node.untried.pop()
+                prior = _mobility_gain_bits(shape, ~occupied & shape.full, move, node.vertical)
+                occupied |= shape.footprint(move, node.vertical)
+                path_moves.append((move, node.vertical))
+                child = self._new_node(move, node, occupied, not node.vertical)
+                child.prior = prior
+                node.children.append(child)
+                node = child
+
+            # Simulation
+            if not node.untried and not node.children:
+                vertical_wins = not node.vertical  # the side to move here has no placement
+            else:
+                free = bytearray(root_free)
+                for move, vertical in path_moves:
+                    step = shape.cols if vertical else 1
+                    free[move] = free[move + step] = 0
+                vertical_wins = rollout(shape, free, node.vertical, rng)
+
+            # Backpropagation: credit the side that moved into each node
+            while node is not None:
+                node.visits += 1
+                if node.parent is not None and node.parent.vertical == vertical_wins:
+                    node.wins += 1
+                node = node.parent
+            count += 1
+
+            if self.tree_nodes > self.max_nodes:
+                self._prune()
+        return count
+
+    def _prune(self):
+        """Cut the least-visited subtrees until the tree is at half its cap."""
+        visits = []
+        stack = list(self.root.children)
+        while stack:
+            node = stack.pop()
+            visits.append(node.visits)
+            stack.extend(node.children)
+        visits.sort(reverse=True)
+        keep = self.max_nodes // 2
+        threshold = visits[keep] if keep < len(visits) else 0
+
+        # A child never has more visits than its parent, so what is left stays connected
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            kept = []
+            for child in node.children:
+                if child.visits <= threshold:
+                    # Forget the subtree; the move can be expanded again later
+                    self.pruned += 1
+                    node.untried.append(child.move)
+                else:
+                    kept.append(child)
+                    stack.append(child)
+            node.children = kept
+        self.tree_nodes = _count(self.root)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _count(node):
+    total = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        total += 1
+        stack.extend(node.children)
+    return total
+
+
+def _worker_search(rows, cols, occupied, vertical, policy, exploration, widening, bias, max_nodes, time_limit,
+                   max_rollouts, seed):
+    """Pool task: an independent search; returns (rollouts, {move: [visits, wins]}) for the root."""
+    engine = MCTS(policy, exploration, max_nodes, workers=1, seed=seed, widening=widening, bias=bias)
+    engine.shape = _shape_for(rows, cols)
+    engine._set_root(occupied, vertical)
+    rollouts = engine._run(time.perf_counter() + time_limit, max_rollouts)
+    return rollouts, {child.move: [child.visits, child.wins] for child in engine.root.children}
+
+
+def play_match(rows, cols, time_limit, games, policy="safe", workers=1, seed=0):
+    """MCTS against a uniformly random player, alternating sides; returns a report dict."""
+    rng = random.Random(seed)
+    wins = 0
+    rollouts = 0
+    elapsed = 0.0
+    with MCTS(policy, workers=workers, seed=seed) as engine:
+        for number in range(games):
+            game = Game(rows=rows, cols=cols)
+            engine_side = Game.VERTICAL if number % 2 == 0 else Game.HORIZONTAL
+            while game.has_moves(game.current_orientation):
+                if game.current_orientation == engine_side:
+                    result = engine.search(game, time_limit=time_limit)
+                    rollouts += result.rollouts
+                    elapsed += result.elapsed
+                    row, col = result.best_move
+                else:
+                    row, col = rng.choice(game.legal_moves(game.current_orientation))
+                game.place_domino(row, col)
+                game.toggle_orientation()
+            if game.current_orientation != engine_side:
+                wins += 1
+    return {"size": f"{rows}x{cols}", "policy": policy, "workers": workers, "games": games,
+            "wins_vs_random": wins, "rollouts_per_s": round(rollouts / elapsed) if elapsed else 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCTS against a random player")
+    parser.add_argument("--size", default="16x16", help="board size, ROWSxCOLS")
+    parser.add_argument("--time", type=float, default=1.0, help="seconds per move")
+    parser.add_argument("--games", type=int, default=4)
+    parser.add_argument("--policy", choices=sorted(ROLLOUT_POLICIES), default="safe")
+    parser.add_argument("--workers", type=int, default=1, help="processes per search (1 = no pool)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rows, cols = (int(n) for n in args.size.lower().split("x"))
+    print(json.dumps(play_match(rows, cols, args.time, args.games, args.policy,
+                                args.workers or os.cpu_count(), args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Low-overhead timers and counters for the UI, engine and network hot paths.
+
+Hot methods are registered with instrument(owner, attribute, name) where
+they are defined. While metrics are off the registered methods are the
+original functions, so there is nothing to pay; enable() swaps in timing
+wrappers and disable() puts the originals back, at any time.
+
+Timings go into log-linear histograms (HDR-style: 32 sub-buckets per power
+of two, so percentiles are within ~3%) in nanoseconds. snapshot() is a
+JSON-ready dict, prometheus() the Prometheus text format, and start_dump()
+rewrites a file with either every few seconds. start_profiler() samples the
+stacks of every thread and writes them in the folded format flame graph
+tools read.
+
+Updates are not locked: two threads recording at the same instant can lose
+a count, which is fine for metrics and keeps recording cheap.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+
+_SUB_BITS = 5
+_SUB = 1 << _SUB_BITS
+
+enabled = False
+_points = []  # [owner, attribute, name, key, original]
+_histograms = {}
+_counters = {}
+_lock = threading.RLock()  # guards switching and creating histograms, not recording
+
+
+class Histogram:
+    """Log-linear histogram of non-negative integer values (nanoseconds here)."""
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value):
+        if value < 2 * _SUB:
+            index = value
+        else:
+            shift = value.bit_length() - _SUB_BITS - 1
+            index = (shift + 1) * _SUB + (value >> shift) - _SUB
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @staticmethod
+    def _value_at(index):
+        """Middle of the value range of a bucket."""
+        if index < 2 * _SUB:
+            return index
+        shift = index // _SUB - 1
+        low = (index % _SUB + _SUB) << shift
+        return low + ((1 << shift) >> 1)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index, recorded in sorted(list(self.counts.items())):  # record() may add buckets meanwhile
+            seen += recorded
+            if seen >= rank:
+                return min(max(self._value_at(index), self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """Count, sum and percentiles in seconds."""
+        scale = 1e-9
+        return {
+            "count": self.count,
+            "sum_s": self.total * scale,
+            "min_s": (self.min or 0) * scale,
+            "max_s": self.max * scale,
+            "p50_s": self.percentile(0.50) * scale,
+            "p90_s": self.percentile(0.90) * scale,
+            "p99_s": self.percentile(0.99) * scale,
+            "p999_s": self.percentile(0.999) * scale,
+        }
+
+
+def histogram(name, label=None):
+    """The histogram for a metric name and optional label value, created on first use."""
+    key = (name, label)
+    found = _histograms.get(key)
+    if found is None:
+        with _lock:
+            found = _histograms.setdefault(key, Histogram())
+    return found
+
+
+def count(name, amount=1):
+    """Add to a counter; a no-op while metrics are off."""
+    if enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class timer:
+    """`with timer("name"):` records the block's duration while metrics are on."""
+
+    __slots__ = ("name", "label", "start")
+
+    def __init__(self, name, label=None):
+        self.name = name
+        self.label = label
+        self.start = None
+
+    def __enter__(self):
+        if enabled:
+            self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            histogram(self.name, self.label).record(time.perf_counter_ns() - self.start)
+
+
+# Instrumented methods
+
+def instrument(owner, attribute, name, key=None):
+    """
+    Time owner.attribute (a function defined on a class or module) under
+    `name` while metrics are enabled. key(*args, **kwargs), when given,
+    picks a label value per call, e.g. the endpoint of an HTTP request.
+    """
+    point = [owner, attribute, name, key, None]
+    _points.append(point)
+    if enabled:
+        _patch(point)
+
+
+def _patch(point):
+    owner, attribute, name, key, _ = point
+    original = vars(owner)[attribute]
+    point[4] = original
+    clock = time.perf_counter_ns
+    if key is None:
+        fixed = histogram(name)
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                fixed.record(clock() - start)
+    else:
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                histogram(name, key(*args, **kwargs)).record(clock() - start)
+    timed.__wrapped__ = original
+    timed.__name__ = getattr(original, "__name__", attribute)
+    timed.__doc__ = getattr(original, "__doc__", None)
+    setattr(owner, attribute, timed)
+
+
+def _unpatch(point):
+    owner, attribute, _, _, original = point
+    if original is not None:
+        setattr(owner, attribute, original)
+        point[4] = None
+
+
+def enable():
+    """Start recording; instrumented methods get their timing wrappers."""
+    global enabled
+    with _lock:
+        if enabled:
+            return
+        for point in _points:
+            _patch(point)
+        enabled = True
+
+
+def disable():
+    """Stop recording; instrumented methods are the original functions again. Data is kept."""
+    global enabled
+    with _lock:
+        if not enabled:
+            return
+        enabled = False
+        for point in _points:
+            _unpatch(point)
+
+
+def reset():
+    """Forget every recorded value."""
+    for histogram_ in list(_histograms.values()):
+        histogram_.__init__()
+    _counters.clear()
+
+
+# Export
+
+def snapshot():
+    """Every counter and histogram summary, as a JSON-ready dict."""
+    histograms = {}
+    for (name, label), recorded in sorted(list(_histograms.items()), key=lambda item: (item[0][0], str(item[0][1]))):
+        if recorded.count:
+            histograms[name if label is None else f"{name}[{label}]"] = recorded.summary()
+    return {"time": time.time(), "enabled": enabled, "counters": dict(sorted(list(_counters.items()))),
+            "histograms": histograms}
+
+
+def _prometheus_name(name):
+    return "domineering_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus():
+    """Counters and histograms in the Prometheus text format (histograms as summaries)."""
+    lines = []
+    for name, value in sorted(list(_counters.items())):
+        metric = _prometheus_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    names = {}
+    for (name, label), recorded in list(_histograms.items()):
+        if recorded.count:
+            names.setdefault(name, []).append((label, recorded))
+    for name in sorted(names):
+        metric = _prometheus_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for label, recorded in sorted(names[name], key=lambda item: str(item[0])):
+            labels = f'label="{label}",' if label is not None else ""
+            for quantile in (0.5, 0.9, 0.99, 0.999):
+                lines.append(f'{metric}{{{labels}quantile="{quantile}"}} {recorded.percentile(quantile) * 1e-9:.9f}')
+            suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{metric}_sum{suffix} {recorded.total * 1e-9:.9f}")
+            lines.append(f"{metric}_count{suffix} {recorded.count}")
+    return "\n".join(lines) + "\n"
+
+
+def write(path, fmt=None):
+    """Write the current metrics to path, replacing it atomically. fmt is "json" or "prometheus"
+    (default: from the extension, .prom for Prometheus)."""
+    if fmt is None:
+        fmt = "prometheus" if path.endswith((".prom", ".txt")) else "json"
+    if fmt == "prometheus":
+        text = prometheus()
+    else:
+        import json  # only needed for dumps, kept out of the engine's import time
+        text = json.dumps(snapshot(), indent=2)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+class _Dumper(threading.Thread):
+    def __init__(self, path, interval, fmt):
+        threading.Thread.__init__(self, name="metrics-dump", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.fmt = fmt
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                write(self.path, self.fmt)
+            except Exception:
+                traceback.print_exc()
+
+
+_dumper = None
+
+
+def start_dump(path, interval=10.0, fmt=None):
+    """Rewrite `path` with the current metrics every `interval` seconds (and once more on stop_dump())."""
+    global _dumper
+    stop_dump()
+    _dumper = _Dumper(path, interval, fmt)
+    _dumper.start()
+
+
+def stop_dump():
+    global _dumper
+    if _dumper is not None:
+        _dumper.stopped.set()
+        _dumper.join(1.0)
+        try:
+            write(_dumper.path, _dumper.fmt)
+        except Exception:
+            traceback.print_exc()
+        _dumper = None
+
+
+# Sampling profiler
+
+class SamplingProfiler(threading.Thread):
+    """
+    Samples the stack of every other thread every `interval` seconds and
+    counts identical stacks. Costs one sys._current_frames() per sample, and
+    nothing in the profiled code.
+    """
+
+    def __init__(self, interval=0.005, max_depth=64):
+        threading.Thread.__init__(self, name="metrics-profiler", daemon=True)
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = {}
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self.stopped.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def folded(self):
+        """One "thread;outer;...;inner count" line per distinct stack, most frequent first."""
+        return "".join(f"{stack} {hits}\n"
+                       for stack, hits in sorted(self.stacks.items(), key=lambda item: -item[1]))
+
+    def stop(self, path=None):
+        """Stop sampling and, if path is given, write the folded stacks there."""
+        self.stopped.set()
+        if self.is_alive():
+            self.join(1.0)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(self.folded())
+
+
+def start_profiler(interval=0.005):
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    return profiler
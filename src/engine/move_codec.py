@@ -0,0 +1,103 @@
+"""
+Compact wire format for moves.
+
+A move is packed into 9 bytes (flags, row, col, order) and sent as a short
+versioned string, e.g. "d1.AQADAAQAAAAH". Strings without the version prefix
+are read as JSON, so moves from older clients still decode. Nothing is ever
+evaluated as code.
+
+Position snapshots (Game.snapshot()) travel the same way, as "s1." strings.
+"""
+import base64
+import binascii
+import json
+import struct
+
+PREFIX = "d1."
+SNAPSHOT_PREFIX = "s1."
+_LAYOUT = struct.Struct(">BHHI")  # flags, row, col, order
+_ENCODED_LENGTH = len(PREFIX) + 12  # 9 bytes -> 12 base64 characters
+
+VERTICAL = "vertical"
+HORIZONTAL = "horizontal"
+MATCH_STATUSES = ("next", "progress", "finished", "interrupted")
+
+
+class MoveFormatError(ValueError):
+    """Raised when a move payload cannot be decoded."""
+
+
+def encode_move(row, col, orientation, order=0, match_status="next"):
+    """Pack a move into a compact "d1." string."""
+    if orientation not in (VERTICAL, HORIZONTAL):
+        raise MoveFormatError(f"unknown orientation {orientation!r}")
+    if match_status not in MATCH_STATUSES:
+        raise MoveFormatError(f"unknown match status {match_status!r}")
+    flags = (orientation == VERTICAL) | (MATCH_STATUSES.index(match_status) << 1)
+    try:
+        packed = _LAYOUT.pack(flags, row, col, order)
+    except struct.error as error:
+        raise MoveFormatError(str(error)) from None
+    return PREFIX + base64.urlsafe_b64encode(packed).decode("ascii")
+
+
+def decode_move(text):
+    """Strictly decode a "d1." string into a move dict."""
+    if len(text) != _ENCODED_LENGTH or not text.startswith(PREFIX):
+        raise MoveFormatError("not a compact move")
+    try:
+        packed = base64.b64decode(text[len(PREFIX):], altchars=b"-_", validate=True)
+    except (binascii.Error, ValueError):
+        raise MoveFormatError("bad compact move encoding") from None
+    if len(packed) != _LAYOUT.size:
+        raise MoveFormatError("bad compact move length")
+    flags, row, col, order = _LAYOUT.unpack(packed)
+    status = flags >> 1
+    if status >= len(MATCH_STATUSES):
+        raise MoveFormatError("bad compact move flags")
+    return {
+        "row": row,
+        "col": col,
+        "orientation": VERTICAL if flags & 1 else HORIZONTAL,
+        "order": order,
+        "match_status": MATCH_STATUSES[status],
+    }
+
+
+def encode_snapshot(data):
+    """Wrap the bytes of Game.snapshot() into an "s1." string."""
+    return SNAPSHOT_PREFIX + base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def decode_snapshot(text):
+    """The snapshot bytes of an "s1." string, for Game.load_snapshot()."""
+    if not isinstance(text, str) or not text.startswith(SNAPSHOT_PREFIX):
+        raise MoveFormatError("not a snapshot")
+    try:
+        return base64.b64decode(text[len(SNAPSHOT_PREFIX):], altchars=b"-_", validate=True)
+    except (binascii.Error, ValueError):
+        raise MoveFormatError("bad snapshot encoding") from None
+
+
+def is_compact(text):
+    return isinstance(text, str) and text.startswith(PREFIX)
+
+
+def parse_move(payload):
+    """
+    Decode a move received from the server: a compact string, a JSON object
+    string (the legacy format) or an already decoded dict.
+    """
+    if isinstance(payload, dict):
+        return payload
+    if not isinstance(payload, str):
+        raise MoveFormatError("move must be a string")
+    if is_compact(payload):
+        return decode_move(payload)
+    try:
+        move = json.loads(payload)
+    except ValueError:
+        raise MoveFormatError("move is neither compact nor JSON") from None
+    if not isinstance(move, dict):
+        raise MoveFormatError("move must be an object")
+    return move
@@ -0,0 +1,331 @@
+"""
+Root-split parallel search over a process pool, for boards the
+single-threaded Solver cannot finish alone (9x9, 10x10, rectangles).
+
+Every root move becomes one task: a worker process solves the position after
+that move with the opponent to move. The pool hands tasks to idle workers, so
+cheap subtrees do not hold anyone up. Workers share
+
+- the bound: every position is a win or a loss, so the only bound worth
+  sharing is "the root is won"; as soon as one child is proven lost, a shared
+  event stops every worker and the remaining tasks are cancelled;
+- proven results: a lockless table in shared memory holds every proven win
+  or loss, so subtrees one worker proved are lookups for the others.
+
+Only proven entries are shared, and each root move runs its own iterative
+deepening, so shallow iterations do not order the moves of its siblings as
+they do in Solver. The pool therefore searches more nodes than Solver for the
+same position: on a lost position, where every root move must be refuted,
+one worker took about four times the serial nodes (7x6). The split pays off
+only with enough workers; use Solver for a single process.
+
+    python -m src.engine.parallel --size 9x9 --workers 1 2 4 --time 30
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+
+from src.engine.domineering_game import Game
+from src.engine.solver import (Solver, SolveResult, TranspositionTable, geometry_for,
+                               WIN, PROVEN_DEPTH, EXACT, LOWER, UPPER)
+
+_VALID = 1 << 63
+
+
+class SharedTable:
+    """
+    Proven results in a shared-memory array of (key ^ data, data) word pairs.
+    Writes are not locked: a torn slot fails the key check and reads as a miss.
+    """
+
+    def __init__(self, size_bits=18, name=None):
+        self.size_bits = size_bits
+        self.mask = (1 << size_bits) - 1
+        create = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=create, size=16 << size_bits)
+        self.name = self.memory.name
+        self.words = self.memory.buf.cast("Q")
+        if create:
+            self.clear()
+
+    def probe(self, key):
+        """(won, move) for a proven position, or None."""
+        slot = (key & self.mask) << 1
+        data = self.words[slot + 1]
+        if not data or self.words[slot] ^ data != key:
+            return None
+        move = (data >> 1) & 0xFFFFFFFF
+        return bool(data & 1), move - 1 if move else None
+
+    def store(self, key, won, move):
+        slot = (key & self.mask) << 1
+        data = _VALID | ((move + 1 if move is not None and move >= 0 else 0) << 1) | bool(won)
+        self.words[slot] = key ^ data
+        self.words[slot + 1] = data
+
+    def clear(self):
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+
+    def close(self, unlink=False):
+        self.words.release()
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+class _MergedTable(TranspositionTable):
+    """A worker's private table, backed by the shared table for proven entries."""
+
+    def __init__(self, size_bits, shared):
+        TranspositionTable.__init__(self, size_bits)
+        self.shared = shared
+
+    def probe(self, key):
+        entry = TranspositionTable.probe(self, key)
+        if entry is not None:
+            return entry
+        proven = self.shared.probe(key)
+        if proven is None:
+            return None
+        self.hits += 1
+        won, move = proven
+        return (key, PROVEN_DEPTH, WIN if won else -WIN, EXACT, move, self.generation)
+
+    def store(self, key, depth, value, flag, move):
+        TranspositionTable.store(self, key, depth, value, flag, move)
+        if depth == PROVEN_DEPTH:
+            if value >= WIN and flag != UPPER:
+                self.shared.store(key, True, move)
+            elif value <= -WIN and flag != LOWER:
+                self.shared.store(key, False, move)
+
+
+_worker = None
+
+
+def _init_worker(stop, table_name, table_bits, tt_bits, tablebase):
+    global _worker
+    _worker = Solver(tt_bits=1, tablebase=tablebase, stop=stop)
+    _worker.tt = _MergedTable(tt_bits, SharedTable(table_bits, table_name))
+
+
+def _solve_child(snapshot, row, col, orientation, deadline, max_nodes):
+    """Worker task: solve the position after (row, col) with the opponent to move."""
+    game, _ = Game.from_snapshot(snapshot)
+    game.current_orientation = orientation
+    game.place_domino(row, col)
+    game.toggle_orientation()
+
+    time_limit = None if deadline is None else max(0.0, deadline - time.time())
+    result = _worker.solve(game, time_limit=time_limit, max_nodes=max_nodes)
+    return {
+        "move": (row, col),
+        "outcome": result.outcome,  # from the opponent's point of view
+        "value": result.value,
+        "depth": result.depth,
+        "nodes": result.nodes,
+        "elapsed": result.elapsed,
+        "tt_probes": result.tt_probes,
+        "tt_hits": result.tt_hits,
+        "pid": os.getpid(),
+    }
+
+
+class ParallelResult(SolveResult):
+    """
+    SolveResult of a parallel search. Adds the result of every root move that
+    finished and a per-worker report: tasks, nodes, busy seconds and nodes/sec.
+    nodes_per_second is the aggregate over the wall-clock time of the search.
+    """
+
+    def __init__(self, orientation, value, best_move, depth, exact, nodes, elapsed, tt_probes, tt_hits,
+                 moves, workers):
+        SolveResult.__init__(self, orientation, value, best_move, depth, exact, nodes, elapsed, tt_probes, tt_hits)
+        self.moves = moves
+        self.workers = workers
+
+    def report(self):
+        return {
+            "outcome": self.outcome,
+            "best_move": self.best_move,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "elapsed_s": round(self.elapsed, 3),
+            "nps": round(self.nodes_per_second),
+            "tt_hit_rate": round(self.tt_hit_rate, 4),
+            "workers": self.workers,
+        }
+
+
+class ParallelSolver:
+    """
+    Solve positions with `workers` processes (default: one per CPU). The
+    pool and the shared table live until close(); cancel() may be called from
+    another thread to stop a running solve().
+    """
+
+    def __init__(self, workers=None, tt_bits=20, shared_bits=20, tablebase=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_bits = tt_bits
+        self.shared_bits = shared_bits
+        self.tablebase = tablebase
+        self._stop = multiprocessing.Event()
+        self._table = None
+        self._pool = None
+        self._shape = None
+        self._local = Solver(tt_bits=10, tablebase=tablebase)  # root checks and move ordering
+
+    def _start(self):
+        if self._pool is None:
+            self._table = SharedTable(self.shared_bits)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self._stop, self._table.name, self.shared_bits, self.tt_bits, self.tablebase))
+
+    def cancel(self):
+        """Stop the running search; it returns whatever it has proven so far."""
+        self._stop.set()
+
+    def solve(self, game, orientation=None, time_limit=None, max_nodes=None):
+        """
+        Solve `game` with `orientation` (default: game.current_orientation)
+        to move. time_limit is a wall-clock budget in seconds for the whole
+        search, max_nodes a budget per root move.
+        """
+        if orientation is None:
+            orientation = game.current_orientation
+        vertical = orientation == game.VERTICAL
+        rows, cols = game.rows, game.cols
+        start = time.perf_counter()
+
+        geo = geometry_for(rows, cols)
+        free = ~game.bitboard.occupied & geo.full
+        vmoves = free & (free >> cols) & geo.vertical_anchors
+        hmoves = free & (free >> 1) & geo.horizontal_anchors
+        mine, theirs = (vmoves, hmoves) if vertical else (hmoves, vmoves)
+        if not mine or not theirs or self.tablebase is not None:
+            # Trivial (or tabled) positions are not worth a round trip to the pool
+            result = self._local.solve(game, orientation, max_nodes=1)
+            if result.exact:
+                return ParallelResult(orientation, result.value, result.best_move, result.depth, True,
+                                      result.nodes, time.perf_counter() - start, 0, 0, [], {})
+
+        self._start()
+        if self._shape != (rows, cols):
+            self._table.clear()
+            self._shape = (rows, cols)
+        self._stop.clear()
+        deadline = time.time() + time_limit if time_limit is not None else None
+        snapshot = game.snapshot()
+
+        futures = {
+            self._pool.submit(_solve_child, snapshot, *divmod(move, cols), orientation, deadline, max_nodes)
+            for move in self._local._ordered_moves(geo, mine, theirs, vertical, None)
+        }
+        finished = []
+        winning = None
+        pending = futures
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    child = future.result()
+                    finished.append(child)
+                    if child["outcome"] == "loss" and winning is None:
+                        winning = child
+                        self._stop.set()
+                if self._stop.is_set() or (deadline is not None and time.time() >= deadline):
+                    self._stop.set()
+                    for future in pending:
+                        future.cancel()
+        finally:
+            if pending:
+                self._stop.set()
+                wait(pending)
+        elapsed = time.perf_counter() - start
+        return self._merge(orientation, finished, winning, len(futures), elapsed)
+
+    def _merge(self, orientation, finished, winning, total, elapsed):
+        nodes = sum(child["nodes"] for child in finished)
+        probes = sum(child["tt_probes"] for child in finished)
+        hits = sum(child["tt_hits"] for child in finished)
+        workers = {}
+        for child in finished:
+            stats = workers.setdefault(child["pid"], {"tasks": 0, "nodes": 0, "busy_s": 0.0})
+            stats["tasks"] += 1
+            stats["nodes"] += child["nodes"]
+            stats["busy_s"] += child["elapsed"]
+        for stats in workers.values():
+            stats["nps"] = round(stats["nodes"] / stats["busy_s"]) if stats["busy_s"] > 0 else 0
+            stats["busy_s"] = round(stats["busy_s"], 3)
+
+        all_lost = len(finished) == total and all(child["outcome"] == "win" for child in finished)
+        if winning is not None:
+            value, best, exact = WIN, winning, True
+        elif all_lost:
+            value, best, exact = -WIN, max(finished, key=lambda child: child["depth"]), True
+        else:
+            # Inconclusive: prefer the move whose subtree looks worst for the opponent
+            best = min(finished, key=lambda child: child["value"], default=None)
+            value, exact = (-best["value"] if best is not None else 0), False
+        depth = 1 + min((child["depth"] for child in finished), default=0)
+        best_move = best["move"] if best is not None else None
+        return ParallelResult(orientation, value, best_move, depth, exact, nodes, elapsed, probes, hits,
+                              finished, workers)
+
+    def close(self):
+        """Shut the pool down and free the shared table."""
+        self._stop.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._table is not None:
+            self._table.close(unlink=True)
+            self._table = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel Domineering search scaling report")
+    parser.add_argument("--size", default="9x9", help="board size, ROWSxCOLS")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--time", type=float, default=30.0, help="wall-clock budget per run in seconds")
+    parser.add_argument("--max-nodes", type=int, default=None, help="node budget per root move")
+    parser.add_argument("--opening", default="", help="moves to play first, e.g. 0,0,v;3,4,h")
+    args = parser.parse_args()
+
+    rows, cols = (int(n) for n in args.size.lower().split("x"))
+    game = Game(rows=rows, cols=cols)
+    for move in filter(None, args.opening.split(";")):
+        row, col, kind = move.split(",")
+        game.current_orientation = Game.VERTICAL if kind.strip() == "v" else Game.HORIZONTAL
+        if not game.place_domino(int(row), int(col)):
+            parser.error(f"illegal opening move {move}")
+        game.toggle_orientation()
+
+    runs = []
+    for workers in args.workers:
+        with ParallelSolver(workers) as solver:
+            result = solver.solve(game, time_limit=args.time, max_nodes=args.max_nodes)
+        report = result.report()
+        report["processes"] = workers
+        runs.append(report)
+    base = runs[0]["nps"] or 1
+    for report in runs:
+        report["speedup"] = round(report["nps"] / base, 2)
+    print(json.dumps(runs, indent=2))
+
+
+if __name__ == "__main__":
+    main()
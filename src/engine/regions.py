@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from src.engine.bitboard import iter_bits, popcount
+from src.engine import cgt
+
+
+class RegionMap:
+    """
+    Connected empty regions of a rows x cols board, each kept as a bitmask.
+    Placing a domino only re-labels the region it was placed in, so the
+    cost of an update is bounded by the size of that region rather than
+    the whole board.
+    """
+
+    def __init__(self, rows, cols, occupied=0):
+        self.rows = rows
+        self.cols = cols
+        self.full = (1 << (rows * cols)) - 1
+        self.not_first_col = 0
+        self.not_last_col = 0
+        for row in range(rows):
+            base = row * cols
+            self.not_first_col |= ((1 << (cols - 1)) - 1) << (base + 1)
+            self.not_last_col |= ((1 << (cols - 1)) - 1) << base
+        self.regions = self.split(self.full & ~occupied)
+
+    def flood(self, seed, allowed):
+        """Grow seed through the 4-connected cells of allowed."""
+        cols = self.cols
+        region = seed
+        while True:
+            grown = (region | (region << cols) | (region >> cols)
+                     | ((region << 1) & self.not_first_col)
+                     | ((region >> 1) & self.not_last_col)) & allowed
+            if grown == region:
+                return region
+            region = grown
+
+    def split(self, cells):
+        """Partition a set of cells into its connected components."""
+        parts = []
+        while cells:
+            part = self.flood(cells & -cells, cells)
+            parts.append(part)
+            cells &= ~part
+        return parts
+
+    def place(self, footprint):
+        """Remove a domino footprint and re-label only the region it touched."""
+        for i, region in enumerate(self.regions):
+            if region & footprint:
+                del self.regions[i]
+                self.regions.extend(self.split(region & ~footprint))
+                return
+
+    def remove(self, footprint):
+        """Give a domino's cells back and merge the regions they reconnect."""
+        cols = self.cols
+        around = (footprint | (footprint << cols) | (footprint >> cols)
+                  | ((footprint << 1) & self.not_first_col)
+                  | ((footprint >> 1) & self.not_last_col))
+        merged = footprint
+        kept = []
+        for region in self.regions:
+            if region & around:
+                merged |= region
+            else:
+                kept.append(region)
+        kept.append(merged)
+        self.regions = kept
+
+    def clear(self):
+        self.regions = [self.full] if self.full else []
+
+
+def canonical_shape(region, cols):
+    """
+    Crop a region to its bounding box and pick the smallest of its images
+    under identity, left-right mirror, top-bottom mirror and 180 degree
+    rotation. None of these swap vertical and horizontal, so every image
+    has the same game value.
+
+    Returns (width, row_masks), where row_masks holds one int per row.
+    """
+    cells = [divmod(i, cols) for i in iter_bits(region)]
+    top = min(r for r, _ in cells)
+    bottom = max(r for r, _ in cells)
+    left = min(c for _, c in cells)
+    right = max(c for _, c in cells)
+    width = right - left + 1
+    rows = [0] * (bottom - top + 1)
+    mirrored = [0] * (bottom - top + 1)
+    for r, c in cells:
+        rows[r - top] |= 1 << (c - left)
+        mirrored[r - top] |= 1 << (right - c)
+    images = (tuple(rows), tuple(mirrored), tuple(reversed(rows)), tuple(reversed(mirrored)))
+    return width, min(images)
+
+
+class ValueCache:
+    """LRU-bounded memo of canonical region shape -> CGValue."""
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, shape):
+        value = self._entries.get(shape)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(shape)
+        self.hits += 1
+        return value
+
+    def put(self, shape, value):
+        self._entries[shape] = value
+        self._entries.move_to_end(shape)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RegionAnalyzer:
+    """
+    Evaluates positions as the sum of the combinatorial values of their
+    independent regions. Region values are memoized by canonical shape,
+    so a shape is only solved once across every game analysed with the
+    same analyzer. Regions larger than max_cells are not evaluated.
+    """
+
+    def __init__(self, max_cells=16, cache=None):
+        self.max_cells = max_cells
+        self.cache = cache if cache is not None else ValueCache()
+
+    def region_value(self, region, cols):
+        """CGValue of one region, or None when it is too large to evaluate."""
+        if popcount(region) > self.max_cells:
+            return None
+        return self._shape_value(canonical_shape(region, cols))
+
+    def _shape_value(self, shape):
+        value = self.cache.get(shape)
+        if value is not None:
+            return value
+        width, row_masks = shape
+        height = len(row_masks)
+        region = 0
+        for r, mask in enumerate(row_masks):
+            region |= mask << (r * width)
+
+        regions = RegionMap(height, width, occupied=(1 << (height * width)) - 1 & ~region)
+        left, right = set(), set()
+        for vertical, options in ((True, left), (False, right)):
+            if vertical:
+                moves = region & (region >> width) & ((1 << ((height - 1) * width)) - 1)
+                pair = 1 | (1 << width)
+            else:
+                moves = region & (region >> 1) & regions.not_last_col
+                pair = 0b11
+            for move in iter_bits(moves):
+                total = cgt.ZERO
+                for part in regions.split(region & ~(pair << move)):
+                    if part & (part - 1):  # a single cell is worth 0
+                        total = cgt.add(total, self._shape_value(canonical_shape(part, width)))
+                options.add(total)
+
+        value = cgt.make_value(left, right)
+        self.cache.put(shape, value)
+        return value
+
+    def position_value(self, game_or_regions):
+        """Sum of the region values of a Game or RegionMap, or None if any region is too large."""
+        regions = game_or_regions
+        if not isinstance(regions, RegionMap):
+            regions = RegionMap(regions.rows, regions.cols, regions.bitboard.occupied)
+        total = cgt.ZERO
+        for region in regions.regions:
+            if not region & (region - 1):
+                continue
+            value = self.region_value(region, regions.cols)
+            if value is None:
+                return None
+            total = cgt.add(total, value)
+        return total
+
+    def outcome(self, game, orientation=None):
+        """
+        'win' or 'loss' for the side to move (default: game.current_orientation),
+        or None when some region exceeds max_cells.
+        """
+        if orientation is None:
+            orientation = game.current_orientation
+        source = game.regions if game.regions is not None else game
+        value = self.position_value(source)
+        if value is None:
+            return None
+        return outcome_for(value, orientation == game.VERTICAL)
+
+
+def outcome_for(value, vertical_to_move):
+    """'win' or 'loss' for the side to move in a position worth value."""
+    outcome = cgt.outcome_class(value)
+    if outcome == "N":
+        return "win"
+    if outcome == "P":
+        return "loss"
+    vertical_wins = outcome == "L"
+    return "win" if vertical_wins == vertical_to_move else "loss"
@@ -0,0 +1,184 @@
+"""
+Background move search for the computer opponent and the hint action.
+
+The search runs on one daemon thread so the caller (the Tk main loop) never
+waits for it: submit() hands over a copy of the game and returns at once,
+and finished searches are collected with poll(), which never blocks. Each
+submit() or cancel() stops the search in progress, and results of searches
+that were superseded are dropped, so a board change can never be answered
+with a move for the old position.
+"""
+import queue
+import random
+from threading import Event, Lock, Thread
+
+from src.engine.solver import Solver
+
+
+class SearchRequest:
+    """One search: a private copy of the game plus its limits."""
+
+    def __init__(self, search_id, game, orientation, time_limit, max_depth, purpose):
+        self.search_id = search_id
+        self.game = game
+        self.orientation = orientation
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.purpose = purpose  # e.g. "move" or "hint"; handed back with the result
+
+
+class SearchOutcome:
+    """A finished search: best move as (row, col) or None if there is none."""
+
+    def __init__(self, request, best_move, result=None, source="search"):
+        self.search_id = request.search_id
+        self.purpose = request.purpose
+        self.orientation = request.orientation
+        self.best_move = best_move
+        self.result = result  # SolveResult, None when the move came from the table
+        self.source = source  # "search", "table" or "sample"
+
+
+class SearchWorker:
+    """
+    Iterative-deepening searches on a background thread, one at a time.
+    The thread is started on the first submit().
+
+    Boards with more than max_search_cells cells are not searched (the
+    solver's per-shape tables grow with the square of the board); the move
+    is then the best of a random sample of legal placements.
+    """
+
+    def __init__(self, tablebase=None, tt_bits=20, seed=None, max_search_cells=1024, samples=64):
+        self.tablebase = tablebase
+        self.max_search_cells = max_search_cells
+        self.samples = samples
+        self._stop = Event()
+        self.solver = Solver(tt_bits=tt_bits, tablebase=tablebase, stop=self._stop)
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = Lock()
+        self._current = 0
+        self._busy_id = None
+        self._thread = None
+        self._rng = random.Random(seed)
+
+    def submit(self, game, orientation=None, time_limit=1.0, max_depth=None, purpose="move"):
+        """
+        Start searching a copy of `game` for `orientation` (default: the
+        side to move), cancelling whatever was running. Returns the search id.
+        """
+        if orientation is None:
+            orientation = game.current_orientation
+        with self._lock:
+            self._current += 1
+            request = SearchRequest(self._current, game.copy(), orientation, time_limit, max_depth, purpose)
+            self._busy_id = request.search_id
+            self._stop.set()
+        self._requests.put(request)
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="search-worker", daemon=True)
+            self._thread.start()
+        return request.search_id
+
+    def cancel(self):
+        """Abandon the search in progress; its result will never be returned."""
+        with self._lock:
+            self._current += 1
+            self._stop.set()
+
+    @property
+    def busy(self):
+        """True while a search that has not been cancelled is pending or running."""
+        with self._lock:
+            return self._busy_id == self._current
+
+    def poll(self):
+        """Finished, still-current SearchOutcomes; never blocks."""
+        outcomes = []
+        while True:
+            try:
+                outcome = self._results.get_nowait()
+            except queue.Empty:
+                return outcomes
+            if outcome.search_id == self._current:
+                outcomes.append(outcome)
+
+    def close(self):
+        """Stop the worker thread."""
+        self.cancel()
+        self._requests.put(None)
+        if self._thread is not None:
+            self._thread.join(1.0)
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            with self._lock:
+                if request.search_id != self._current:
+                    continue  # superseded before it started
+                self._stop.clear()
+            outcome = self._search(request)
+            with self._lock:
+                if self._busy_id == request.search_id:
+                    self._busy_id = None
+            self._results.put(outcome)
+
+    def _search(self, request):
+        game, orientation = request.game, request.orientation
+        if game.rows * game.cols > self.max_search_cells:
+            return SearchOutcome(request, self._sampled_move(game, orientation), source="sample")
+        if self.tablebase is not None:
+            hit = self.tablebase.probe(game, orientation)
+            if hit is not None and hit[1] is not None:
+                return SearchOutcome(request, hit[1], source="table")
+        result = self.solver.solve(game, orientation, time_limit=request.time_limit,
+                                   max_depth=request.max_depth)
+        best_move = result.best_move
+        if best_move is None:
+            # Cancelled or out of time before the first iteration finished
+            moves = game.legal_moves(orientation)
+            best_move = self._rng.choice(moves) if moves else None
+        return SearchOutcome(request, best_move, result)
+
+    def _sampled_move(self, game, orientation):
+        """
+        The sampled legal placement that takes the most placements away from
+        the opponent while using up the fewest of our own. Falls back to any
+        legal placement once random draws stop finding them.
+        """
+        rng, rows, cols = self._rng, game.rows, game.cols
+        best, best_gain = None, None
+        found = 0
+        for _ in range(self.samples * 4):
+            row, col = rng.randrange(rows), rng.randrange(cols)
+            if not game._is_valid(row, col, orientation):
+                continue
+            gain = _mobility_gain(game, row, col, orientation)
+            if best is None or gain > best_gain:
+                best, best_gain = (row, col), gain
+            found += 1
+            if found == self.samples or self._stop.is_set():
+                break
+        if best is None:
+            moves = game.legal_moves(orientation)
+            best = rng.choice(moves) if moves else None
+        return best
+
+
+def _mobility_gain(game, row, col, orientation):
+    """Opponent placements a move destroys minus own placements it uses up besides itself."""
+    if orientation == game.VERTICAL:
+        other = game.HORIZONTAL
+        cells = ((row, col), (row + 1, col))
+        theirs = {(r, c - dc) for r, c in cells for dc in (0, 1)}
+        mine = {(row - 1, col), (row + 1, col)}
+    else:
+        other = game.VERTICAL
+        cells = ((row, col), (row, col + 1))
+        theirs = {(r - dr, c) for r, c in cells for dr in (0, 1)}
+        mine = {(row, col - 1), (row, col + 1)}
+    return (sum(1 for r, c in theirs if game._is_valid(r, c, other))
+            - sum(1 for r, c in mine if game._is_valid(r, c, orientation)))
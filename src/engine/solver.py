@@ -0,0 +1,433 @@
+import time
+from src.engine.bitboard import popcount, iter_bits
+from src.engine.zobrist import keys_for
+from src.engine.regions import RegionMap, outcome_for
+
+# Scores are from the point of view of the side to move.
+# Heuristic scores at the search horizon always stay strictly inside (-WIN, WIN).
+WIN = 1 << 30
+PROVEN_DEPTH = 1 << 20
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when the node or time budget runs out."""
+
+
+class TranspositionTable:
+    """
+    Fixed-size table indexed by the low bits of a 64-bit Zobrist key.
+    Each slot holds (key, depth, value, flag, move, generation).
+
+    Replacement policy: a slot is overwritten when it is empty, holds the
+    same position, was written by an older search (aging), or holds a
+    shallower result than the new one (depth-preferred).
+    """
+
+    def __init__(self, size_bits=20):
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """Age existing entries and reset the statistics."""
+        self.generation += 1
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, value, flag, move):
+        index = key & self.mask
+        old = self.slots[index]
+        if (old is None or old[0] == key or old[5] != self.generation
+                or depth >= old[1]):
+            self.slots[index] = (key, depth, value, flag, move, self.generation)
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+
+class SolveResult:
+    """Outcome of a Solver.solve call, from the point of view of `orientation`."""
+
+    def __init__(self, orientation, value, best_move, depth, exact, nodes, elapsed, tt_probes, tt_hits):
+        self.orientation = orientation
+        self.value = value
+        self.best_move = best_move  # (row, col) or None when there is no legal move
+        self.depth = depth
+        self.exact = exact
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.tt_probes = tt_probes
+        self.tt_hits = tt_hits
+
+    @property
+    def outcome(self):
+        """'win', 'loss' or None when the budget ran out before a proof."""
+        if not self.exact:
+            return None
+        return "win" if self.value > 0 else "loss"
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def __repr__(self):
+        return (f"SolveResult(outcome={self.outcome}, best_move={self.best_move}, depth={self.depth}, "
+                f"nodes={self.nodes}, nps={self.nodes_per_second:.0f}, tt_hit_rate={self.tt_hit_rate:.2%})")
+
+
+class _Geometry:
+    """Per-board-shape masks shared by every search on that shape."""
+
+    def __init__(self, rows, cols):
+        size = rows * cols
+        self.rows = rows
+        self.cols = cols
+        self.full = (1 << size) - 1
+        self.vertical_anchors = (1 << ((rows - 1) * cols)) - 1
+        self.horizontal_anchors = 0
+        for row in range(rows):
+            self.horizontal_anchors |= ((1 << (cols - 1)) - 1) << (row * cols)
+        self.keys = keys_for(rows, cols)
+
+        # Parity masks for the safe-move / move-bound cutoff
+        self.not_first_col = 0
+        self.not_last_col = 0
+        self.even_rows = 0
+        self.odd_rows = 0
+        self.even_cols = 0
+        self.odd_cols = 0
+        for i in range(size):
+            row, col = divmod(i, cols)
+            if col:
+                self.not_first_col |= 1 << i
+            if col + 1 < cols:
+                self.not_last_col |= 1 << i
+            if row % 2:
+                self.odd_rows |= 1 << i
+            else:
+                self.even_rows |= 1 << i
+            if col % 2:
+                self.odd_cols |= 1 << i
+            else:
+                self.even_cols |= 1 << i
+
+        # For each anchor, the opponent anchors it destroys and the own
+        # anchors it uses up; used for move ordering.
+        self.vertical_kills = [0] * size
+        self.vertical_self = [0] * size
+        self.horizontal_kills = [0] * size
+        self.horizontal_self = [0] * size
+        for i in range(size):
+            below = i + cols
+            if below < size:
+                kills = 0
+                for cell in (i, below):
+                    kills |= 1 << cell
+                    if cell % cols:
+                        kills |= 1 << (cell - 1)
+                self.vertical_kills[i] = kills
+                self.vertical_self[i] = ((1 << i) | (1 << below)
+                                         | ((1 << (i - cols)) if i >= cols else 0))
+            if i % cols + 1 < cols:
+                kills = 0
+                for cell in (i, i + 1):
+                    kills |= 1 << cell
+                    if cell >= cols:
+                        kills |= 1 << (cell - cols)
+                self.horizontal_kills[i] = kills
+                self.horizontal_self[i] = (1 << i) | (1 << (i + 1)) | ((1 << (i - 1)) if i else 0)
+
+
+_geometry_cache = {}
+
+
+def geometry_for(rows, cols):
+    geometry = _geometry_cache.get((rows, cols))
+    if geometry is None:
+        geometry = _geometry_cache[(rows, cols)] = _Geometry(rows, cols)
+    return geometry
+
+
+class Solver:
+    """
+    Exact Domineering solver: negamax with alpha-beta pruning, iterative
+    deepening, TT/killer-count move ordering and a Zobrist transposition
+    table that is kept between calls.
+
+    The player with no legal placement on their turn loses, so every
+    position is a win or a loss for the side to move.
+    """
+
+    def __init__(self, tt_bits=20, analyzer=None, region_cells=20, tablebase=None, stop=None):
+        self.tt = TranspositionTable(tt_bits)
+        # Optional RegionAnalyzer: once at most region_cells cells are empty,
+        # positions are settled by summing cached region values instead of searching.
+        self.analyzer = analyzer
+        self.region_cells = region_cells
+        # Optional Tablebase: consulted before searching, and inside the search
+        # once few enough cells are empty for a table box to hold them.
+        self.tablebase = tablebase
+        # Optional threading/multiprocessing Event: the search gives up once it is set
+        self.stop = stop
+        self._splitter = None
+        self.nodes = 0
+        self._deadline = None
+        self._max_nodes = None
+        self._shape = None
+
+    def solve(self, game, orientation=None, time_limit=None, max_nodes=None, max_depth=None):
+        """
+        Solve `game` with `orientation` (default: game.current_orientation) to move.
+        Stops early when time_limit (seconds) or max_nodes is exhausted; the
+        result then carries the best move of the last completed iteration.
+        """
+        if orientation is None:
+            orientation = game.current_orientation
+        vertical = orientation == game.VERTICAL
+        rows, cols = game.rows, game.cols
+        if self._shape != (rows, cols):
+            self.tt.clear()
+            self._shape = (rows, cols)
+            self._splitter = RegionMap(rows, cols)
+        geo = geometry_for(rows, cols)
+        occupied = game.bitboard.occupied
+
+        self.tt.new_search()
+        self.nodes = 0
+        start = time.perf_counter()
+        self._deadline = start + time_limit if time_limit is not None else None
+        self._max_nodes = max_nodes
+        # Each ply removes two cells, so the game cannot last longer than this
+        if max_depth is None:
+            max_depth = popcount(geo.full & ~occupied) // 2 + 1
+
+        if self.tablebase is not None:
+            hit = self.tablebase.probe_occupancy(occupied, rows, cols, vertical)
+            if hit is not None and hit[0] is not None:
+                outcome, anchor = hit
+                best_move = divmod(anchor, cols) if anchor is not None else None
+                return SolveResult(orientation, WIN if outcome == "win" else -WIN, best_move, 0, True, 0,
+                                   time.perf_counter() - start, 0, 0)
+
+        key = game.zobrist_hash(orientation)
+        value, move, depth, exact = 0, None, 0, False
+        for iteration in range(1, max_depth + 1):
+            try:
+                value, move = self._search_root(geo, occupied, vertical, iteration, key)
+            except SearchAborted:
+                break
+            depth = iteration
+            if value >= WIN or value <= -WIN:
+                exact = True
+                break
+
+        elapsed = time.perf_counter() - start
+        best_move = divmod(move, cols) if move is not None else None
+        return SolveResult(orientation, value, best_move, depth, exact, self.nodes, elapsed,
+                           self.tt.probes, self.tt.hits)
+
+    def _check_budget(self):
+        if self.stop is not None and self.stop.is_set():
+            raise SearchAborted()
+        if self._max_nodes is not None and self.nodes >= self._max_nodes:
+            raise SearchAborted()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAborted()
+
+    def _ordered_moves(self, geo, mine, theirs, vertical, tt_move):
+        """Best-first: TT move, then moves that destroy most opponent placements."""
+        if vertical:
+            kills, own = geo.vertical_kills, geo.vertical_self
+        else:
+            kills, own = geo.horizontal_kills, geo.horizontal_self
+        scored = [(popcount(theirs & kills[m]) * 2 - popcount(mine & own[m]), m)
+                  for m in iter_bits(mine) if m != tt_move]
+        scored.sort(reverse=True)
+        moves = [m for _, m in scored]
+        if tt_move is not None and tt_move >= 0 and (mine >> tt_move) & 1:
+            moves.insert(0, tt_move)
+        return moves
+
+    def _search_root(self, geo, occupied, vertical, depth, key):
+        free = ~occupied & geo.full
+        vmoves = free & (free >> geo.cols) & geo.vertical_anchors
+        hmoves = free & (free >> 1) & geo.horizontal_anchors
+        mine, theirs = (vmoves, hmoves) if vertical else (hmoves, vmoves)
+        if not mine:
+            return -WIN, None
+
+        entry = self.tt.probe(key)
+        tt_move = entry[4] if entry is not None else None
+        pair = (1 | (1 << geo.cols)) if vertical else 0b11
+        move_keys = geo.keys.vertical_move if vertical else geo.keys.horizontal_move
+        side = geo.keys.side
+
+        alpha, beta = -WIN, WIN
+        best, best_move = -WIN - 1, None
+        for move in self._ordered_moves(geo, mine, theirs, vertical, tt_move):
+            value = -self._negamax(geo, occupied | (pair << move), not vertical, depth - 1,
+                                   -beta, -alpha, key ^ move_keys[move] ^ side)
+            if value > best:
+                best, best_move = value, move
+                if value > alpha:
+                    alpha = value
+                if alpha >= beta:
+                    break
+        flag = LOWER if best >= beta else EXACT
+        self.tt.store(key, PROVEN_DEPTH if best >= WIN or best <= -WIN else depth, best, flag, best_move)
+        return best, best_move
+
+    # A player with S guaranteed moves beats an opponent who can make at most
+    # M more moves when S > M (moving first) or S >= M (moving second).
+
+    @staticmethod
+    def _safe_vertical(geo, free):
+        """Lower bound on disjoint vertical placements horizontal can never block."""
+        open_sides = ((free << 1) & geo.not_first_col) | ((free >> 1) & geo.not_last_col)
+        safe = free & ~open_sides
+        pairs = safe & (safe >> geo.cols) & geo.vertical_anchors
+        return max(popcount(pairs & geo.even_rows), popcount(pairs & geo.odd_rows))
+
+    @staticmethod
+    def _safe_horizontal(geo, free):
+        """Lower bound on disjoint horizontal placements vertical can never block."""
+        safe = free & ~(((free << geo.cols) & geo.full) | (free >> geo.cols))
+        pairs = safe & (safe >> 1) & geo.horizontal_anchors
+        return max(popcount(pairs & geo.even_cols), popcount(pairs & geo.odd_cols))
+
+    @staticmethod
+    def _max_vertical(geo, vmoves):
+        """Upper bound on vertical moves left: each one covers an even-row and an odd-row cell."""
+        covered = vmoves | (vmoves << geo.cols)
+        return min(popcount(covered & geo.even_rows), popcount(covered & geo.odd_rows))
+
+    @staticmethod
+    def _max_horizontal(geo, hmoves):
+        """Upper bound on horizontal moves left: each one covers an even-column and an odd-column cell."""
+        covered = hmoves | (hmoves << 1)
+        return min(popcount(covered & geo.even_cols), popcount(covered & geo.odd_cols))
+
+    def _region_outcome(self, free, vertical):
+        analyzer = self.analyzer
+        cols = self._shape[1]
+        total = None
+        for region in self._splitter.split(free):
+            if not region & (region - 1):
+                continue
+            value = analyzer.region_value(region, cols)
+            if value is None:
+                return None
+            total = value if total is None else total + value
+        if total is None:
+            return "loss"
+        return outcome_for(total, vertical)
+
+    def _negamax(self, geo, occupied, vertical, depth, alpha, beta, key):
+        self.nodes += 1
+        if not self.nodes & 1023:
+            self._check_budget()
+
+        free = ~occupied & geo.full
+        vmoves = free & (free >> geo.cols) & geo.vertical_anchors
+        hmoves = free & (free >> 1) & geo.horizontal_anchors
+        if vertical:
+            mine, theirs = vmoves, hmoves
+        else:
+            mine, theirs = hmoves, vmoves
+        if not mine:
+            return -WIN
+        if not theirs:
+            # Any move we make leaves the opponent stuck
+            return WIN
+        if vertical:
+            if self._safe_vertical(geo, free) > self._max_horizontal(geo, hmoves):
+                return WIN
+            if self._safe_horizontal(geo, free) >= self._max_vertical(geo, vmoves):
+                return -WIN
+        else:
+            if self._safe_horizontal(geo, free) > self._max_vertical(geo, vmoves):
+                return WIN
+            if self._safe_vertical(geo, free) >= self._max_horizontal(geo, hmoves):
+                return -WIN
+        if self.analyzer is not None and popcount(free) <= self.region_cells:
+            outcome = self._region_outcome(free, vertical)
+            if outcome is not None:
+                return WIN if outcome == "win" else -WIN
+        if self.tablebase is not None and popcount(free) <= self.tablebase.max_cells:
+            hit = self.tablebase.probe_occupancy(occupied, geo.rows, geo.cols, vertical)
+            if hit is not None and hit[0] is not None:
+                return WIN if hit[0] == "win" else -WIN
+        if depth <= 0:
+            return popcount(mine) - popcount(theirs)
+
+        alpha_orig = alpha
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_move = entry[4]
+            if entry[1] >= depth:
+                value, flag = entry[2], entry[3]
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    if value > alpha:
+                        alpha = value
+                elif value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+
+        pair = (1 | (1 << geo.cols)) if vertical else 0b11
+        move_keys = geo.keys.vertical_move if vertical else geo.keys.horizontal_move
+        side = geo.keys.side
+        negamax = self._negamax
+
+        best, best_move = -WIN - 1, -1
+        for move in self._ordered_moves(geo, mine, theirs, vertical, tt_move):
+            value = -negamax(geo, occupied | (pair << move), not vertical, depth - 1,
+                             -beta, -alpha, key ^ move_keys[move] ^ side)
+            if value > best:
+                best, best_move = value, move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        proven = (best >= WIN and flag != UPPER) or (best <= -WIN and flag != LOWER)
+        self.tt.store(key, PROVEN_DEPTH if proven else depth, best, flag, best_move)
+        return best
+
+
+def solve(game, orientation=None, time_limit=None, max_nodes=None, tt_bits=20):
+    """Convenience wrapper: solve a single position with a fresh Solver."""
+    return Solver(tt_bits).solve(game, orientation, time_limit=time_limit, max_nodes=max_nodes)
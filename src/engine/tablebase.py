@@ -0,0 +1,366 @@
+"""
+Precomputed outcomes and best moves, stored in a sorted memory-mapped file.
+
+A position is looked up by the bounding box of its empty cells: only those
+cells matter, so an 8x8 endgame whose empty cells fit in a 4x4 box is the
+same lookup as the matching 4x4 position. The box contents are brought to
+a canonical form under the left-right mirror, the top-bottom mirror and the
+180 degree rotation (none of them swap vertical and horizontal), so each
+class of symmetric positions is stored once.
+
+The table holds every position of every box of up to `max_cells` cells,
+solved by retrograde analysis, plus an opening book of positions reached in
+the first plies of a larger board, searched with a node budget. Records are
+fixed-size and sorted by key, so a lookup is a binary search over the mapped
+file and the file can be shared read-only between processes.
+
+    python -m src.engine.tablebase --max-cells 16 --book-depth 1
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from src.engine.domineering_game import Game
+
+MAGIC = b"DTB1"
+_HEADER = struct.Struct(">4sBBHI")  # magic, unused, occupancy bytes, max_cells, record count
+_VALUE = struct.Struct(">BH")  # outcome, best move anchor in the canonical box
+NO_MOVE = 0xFFFF
+
+LOSS = 0
+WIN = 1
+UNKNOWN = 2  # book entry whose search ran out of budget: the move is a good guess, not a proof
+OUTCOMES = {LOSS: "loss", WIN: "win", UNKNOWN: None}
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                            "data", "domineering.dtb")
+
+
+class TablebaseError(ValueError):
+    """Raised when a table file is malformed."""
+
+
+def _free_box(free, rows, cols):
+    """(top, left, height, width) of the bounding box of the free cells."""
+    row_mask = (1 << cols) - 1
+    top = bottom = None
+    columns = 0
+    for row in range(rows):
+        line = (free >> (row * cols)) & row_mask
+        if line:
+            if top is None:
+                top = row
+            bottom = row
+            columns |= line
+    left = (columns & -columns).bit_length() - 1
+    return top, left, bottom - top + 1, columns.bit_length() - left
+
+
+def _mirror_line(line, width):
+    mirrored = 0
+    for _ in range(width):
+        mirrored = (mirrored << 1) | (line & 1)
+        line >>= 1
+    return mirrored
+
+
+def _canonical(lines, width):
+    """
+    Smallest image of a box (one occupancy int per row) under the symmetry
+    group, as (occupancy, image number): bit 0 of the image number is the
+    left-right mirror and bit 1 the top-bottom mirror.
+    """
+    mirrored = [_mirror_line(line, width) for line in lines]
+    best = None
+    for image, image_lines in enumerate((lines, mirrored, lines[::-1], mirrored[::-1])):
+        occupancy = 0
+        for row, line in enumerate(image_lines):
+            occupancy |= line << (row * width)
+        if best is None or occupancy < best[0]:
+            best = (occupancy, image)
+    return best
+
+
+def _map_move(anchor, vertical, height, width, image):
+    """Anchor of a move after applying an image (each image is its own inverse)."""
+    row, col = divmod(anchor, width)
+    if image & 1:
+        col = width - 1 - col if vertical else width - 2 - col
+    if image & 2:
+        row = height - 2 - row if vertical else height - 1 - row
+    return row * width + col
+
+
+class _Key:
+    """Where a position lands in the table: packed key plus how to map moves back."""
+
+    def __init__(self, packed, image, top, left, height, width):
+        self.packed = packed
+        self.image = image
+        self.top = top
+        self.left = left
+        self.height = height
+        self.width = width
+
+
+def position_key(occupied, rows, cols, vertical, occupancy_bytes):
+    """The table key of a position, or None when no cell is free."""
+    free = ((1 << (rows * cols)) - 1) & ~occupied
+    if not free:
+        return None
+    top, left, height, width = _free_box(free, rows, cols)
+    if (height * width + 7) // 8 > occupancy_bytes:
+        return None
+    line_mask = (1 << width) - 1
+    lines = [(occupied >> ((top + row) * cols + left)) & line_mask for row in range(height)]
+    occupancy, image = _canonical(lines, width)
+    packed = (bytes((height, width)) + occupancy.to_bytes(occupancy_bytes, "big")
+              + (b"\x01" if vertical else b"\x00"))
+    return _Key(packed, image, top, left, height, width)
+
+
+class Tablebase:
+    """Read-only view of a table file; picklable, each process maps the file itself."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise TablebaseError(f"{path}: truncated header")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, self.occupancy_bytes, self.max_cells, self.count = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise TablebaseError(f"{path}: not a tablebase file")
+        self.key_size = 2 + self.occupancy_bytes + 1
+        self.record_size = self.key_size + _VALUE.size
+        if len(self._map) != _HEADER.size + self.count * self.record_size:
+            raise TablebaseError(f"{path}: size does not match {self.count} records")
+        self.probes = 0
+        self.hits = 0
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __len__(self):
+        return self.count
+
+    def _find(self, key):
+        """Record index of `key`, by binary search over the mapped records."""
+        data, size, key_size = self._map, self.record_size, self.key_size
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _HEADER.size + mid * size
+            if data[offset:offset + key_size] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            offset = _HEADER.size + lo * size
+            if data[offset:offset + key_size] == key:
+                return lo
+        return None
+
+    def probe_occupancy(self, occupied, rows, cols, vertical):
+        """
+        Look up a raw position. Returns (outcome, anchor) with outcome 'win',
+        'loss' or None (unproven book move) and anchor the board index of the
+        best move or None, or None when the position is not in the table.
+        """
+        self.probes += 1
+        key = position_key(occupied, rows, cols, vertical, self.occupancy_bytes)
+        if key is None:
+            return None
+        record = self._find(key.packed)
+        if record is None:
+            return None
+        self.hits += 1
+        outcome, move = _VALUE.unpack_from(self._map, _HEADER.size + record * self.record_size + self.key_size)
+        anchor = None
+        if move != NO_MOVE:
+            box_anchor = _map_move(move, vertical, key.height, key.width, key.image)
+            row, col = divmod(box_anchor, key.width)
+            anchor = (key.top + row) * cols + key.left + col
+        return OUTCOMES[outcome], anchor
+
+    def probe(self, game, orientation=None):
+        """
+        Look up `game` with `orientation` (default: the current one) to move.
+        Returns (outcome, (row, col) or None), or None when not in the table.
+        """
+        if orientation is None:
+            orientation = game.current_orientation
+        hit = self.probe_occupancy(game.bitboard.occupied, game.rows, game.cols, orientation == game.VERTICAL)
+        if hit is None:
+            return None
+        outcome, anchor = hit
+        return outcome, divmod(anchor, game.cols) if anchor is not None else None
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def close(self):
+        self._map.close()
+
+
+def load_default():
+    """The table at DEFAULT_PATH, or None if it has not been built."""
+    try:
+        return Tablebase(DEFAULT_PATH)
+    except (OSError, TablebaseError):
+        return None
+
+
+# Building
+
+def _box_moves(height, width):
+    """[(anchor, footprint)] of every vertical and every horizontal placement in a box."""
+    vertical = [(a, (1 << a) | (1 << (a + width))) for a in range((height - 1) * width)]
+    horizontal = [(r * width + c, 3 << (r * width + c)) for r in range(height) for c in range(width - 1)]
+    return vertical, horizontal
+
+
+def solve_box(height, width):
+    """
+    Retrograde analysis of every occupancy of a height x width box.
+    Returns (win_vertical, win_horizontal): bytearrays indexed by occupancy,
+    1 when the side to move wins. Adding a domino only sets bits, so scanning
+    occupancies downwards visits every successor first.
+    """
+    vertical_moves, horizontal_moves = _box_moves(height, width)
+    size = 1 << (height * width)
+    win_vertical = bytearray(size)
+    win_horizontal = bytearray(size)
+    for occupied in range(size - 1, -1, -1):
+        for _, footprint in vertical_moves:
+            if not occupied & footprint and not win_horizontal[occupied | footprint]:
+                win_vertical[occupied] = 1
+                break
+        for _, footprint in horizontal_moves:
+            if not occupied & footprint and not win_vertical[occupied | footprint]:
+                win_horizontal[occupied] = 1
+                break
+    return win_vertical, win_horizontal
+
+
+def _box_entries(height, width, occupancy_bytes, entries):
+    """Add every position whose free cells span the whole box to `entries`."""
+    win_vertical, win_horizontal = solve_box(height, width)
+    vertical_moves, horizontal_moves = _box_moves(height, width)
+    full = (1 << (height * width)) - 1
+    line_mask = (1 << width) - 1
+    first_col = sum(1 << (r * width) for r in range(height))
+    last_col = first_col << (width - 1)
+    last_row = line_mask << ((height - 1) * width)
+    for occupied in range(full):
+        free = full & ~occupied
+        if not (free & line_mask and free & last_row and free & first_col and free & last_col):
+            continue  # stored under a smaller box
+        lines = [(occupied >> (row * width)) & line_mask for row in range(height)]
+        canonical, image = _canonical(lines, width)
+        for vertical, wins, replies, moves in ((True, win_vertical, win_horizontal, vertical_moves),
+                                               (False, win_horizontal, win_vertical, horizontal_moves)):
+            packed = (bytes((height, width)) + canonical.to_bytes(occupancy_bytes, "big")
+                      + (b"\x01" if vertical else b"\x00"))
+            if packed in entries:
+                continue
+            won = wins[occupied]
+            move = NO_MOVE
+            for anchor, footprint in moves:
+                if not occupied & footprint and (not won or not replies[occupied | footprint]):
+                    move = _map_move(anchor, vertical, height, width, image)
+                    break
+            entries[packed] = (WIN if won else LOSS, move)
+
+
+def _book_entries(rows, cols, depth, max_nodes, occupancy_bytes, entries, log=None):
+    """Search every position of the first `depth` plies of a rows x cols board."""
+    from src.engine.solver import Solver, WIN as SOLVER_WIN
+    solver = Solver()
+    frontier = [[]]
+    seen = set()
+    for ply in range(depth + 1):
+        orientation = Game.VERTICAL if ply % 2 == 0 else Game.HORIZONTAL
+        vertical = orientation == Game.VERTICAL
+        next_frontier = []
+        for moves in frontier:
+            game = Game(rows=rows, cols=cols)
+            for row, col, move_orientation in moves:
+                game.current_orientation = move_orientation
+                game.place_domino(row, col)
+            game.current_orientation = orientation
+            key = position_key(game.bitboard.occupied, rows, cols, vertical, occupancy_bytes)
+            if key is None or key.packed in seen:
+                continue
+            seen.add(key.packed)
+            if key.packed not in entries:
+                result = solver.solve(game, max_nodes=max_nodes)
+                if result.best_move is None:
+                    entry = (LOSS, NO_MOVE)
+                else:
+                    row, col = result.best_move
+                    box_anchor = (row - key.top) * key.width + col - key.left
+                    move = _map_move(box_anchor, vertical, key.height, key.width, key.image)
+                    outcome = UNKNOWN if not result.exact else WIN if result.value >= SOLVER_WIN else LOSS
+                    entry = (outcome, move)
+                entries[key.packed] = entry
+            if ply < depth:
+                next_frontier.extend(moves + [(row, col, orientation)]
+                                     for row, col in game.legal_moves(orientation))
+        if log is not None:
+            log(f"book ply {ply}: {len(seen)} positions")
+        frontier = next_frontier
+
+
+def build(path, max_cells=16, book_shape=(8, 8), book_depth=0, book_nodes=20000, log=None):
+    """
+    Write a table with every box of up to max_cells cells and the first
+    book_depth plies of book_shape. Returns the number of records.
+    """
+    rows, cols = book_shape
+    occupancy_bytes = (max(max_cells, rows * cols) + 7) // 8
+    entries = {}
+    for height in range(1, max_cells + 1):
+        for width in range(1, max_cells // height + 1):
+            if height * width >= 2:
+                _box_entries(height, width, occupancy_bytes, entries)
+                if log is not None:
+                    log(f"{height}x{width}: {len(entries)} records")
+    if book_depth >= 0 and rows * cols > max_cells:
+        _book_entries(rows, cols, book_depth, book_nodes, occupancy_bytes, entries, log)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, 0, occupancy_bytes, max_cells, len(entries)))
+        for packed in sorted(entries):
+            f.write(packed + _VALUE.pack(*entries[packed]))
+    os.replace(temporary, path)  # readers never see a half-written table
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Domineering tablebase and opening book")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    parser.add_argument("--max-cells", type=int, default=16, help="solve every box of up to this many cells")
+    parser.add_argument("--book-size", default="8x8", help="board of the opening book, ROWSxCOLS")
+    parser.add_argument("--book-depth", type=int, default=1, help="plies of the opening book (-1 for none)")
+    parser.add_argument("--book-nodes", type=int, default=20000, help="node budget per book position")
+    args = parser.parse_args()
+
+    rows, cols = (int(n) for n in args.book_size.lower().split("x"))
+    start = time.perf_counter()
+    count = build(args.out, args.max_cells, (rows, cols), args.book_depth, args.book_nodes, log=print)
+    print(f"{count} records, {os.path.getsize(args.out)} bytes in {time.perf_counter() - start:.1f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
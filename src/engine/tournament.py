@@ -0,0 +1,411 @@
+"""
+Headless engine-vs-engine tournaments.
+
+Engines are given as specs, a name from ENGINES with optional settings:
+"random", "greedy", "solver:tt_bits=18", "mcts:policy=random,exploration=1.0".
+Pairings are a round robin or a gauntlet (the first engine against every
+other one), on every board size, with sides alternating so each engine
+plays vertical in half its games. Games run in parallel on a process pool
+with a fixed time per move.
+
+Every finished game is appended to a JSON-lines results file as soon as it
+ends, so an interrupted run picks up where it stopped when started again
+with the same arguments. Ratings are Bradley-Terry maximum-likelihood Elo
+with virtual draws as prior (as in BayesElo) and bootstrap confidence
+intervals, plus nodes/sec per engine.
+
+    python -m src.engine.tournament --engines random greedy solver mcts --sizes 6x6 8x8 \\
+        --games 20 --time 0.1 --results tournament.jsonl
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.engine.domineering_game import Game
+
+
+class RandomPlayer:
+    """Uniformly random legal moves."""
+
+    def __init__(self):
+        self.rng = random.Random()
+
+    def new_game(self, seed):
+        self.rng.seed(seed)
+
+    def choose(self, game, orientation, time_limit):
+        """(move, nodes) for the side `orientation`."""
+        return self.rng.choice(game.legal_moves(orientation)), 1
+
+
+class GreedyPlayer(RandomPlayer):
+    """The move that takes the most placements away from the opponent, ties broken at random."""
+
+    def choose(self, game, orientation, time_limit):
+        from src.engine.search_worker import _mobility_gain
+        moves = game.legal_moves(orientation)
+        self.rng.shuffle(moves)
+        return max(moves, key=lambda move: _mobility_gain(game, move[0], move[1], orientation)), len(moves)
+
+
+class SolverPlayer(RandomPlayer):
+    """Iterative-deepening Solver; max_depth caps the search depth."""
+
+    def __init__(self, tt_bits=20, max_depth=None):
+        RandomPlayer.__init__(self)
+        from src.engine.solver import Solver
+        self.solver = Solver(tt_bits=tt_bits)
+        self.max_depth = max_depth
+
+    def choose(self, game, orientation, time_limit):
+        result = self.solver.solve(game, orientation, time_limit=time_limit, max_depth=self.max_depth)
+        if result.best_move is None:
+            return self.rng.choice(game.legal_moves(orientation)), result.nodes
+        return result.best_move, result.nodes
+
+
+class MCTSPlayer(RandomPlayer):
+    """MCTS with its tree reused between moves of a game; rollouts count as nodes."""
+
+    def __init__(self, **options):
+        RandomPlayer.__init__(self)
+        from src.engine.mcts import MCTS
+        self.mcts = MCTS(**options)
+
+    def new_game(self, seed):
+        RandomPlayer.new_game(self, seed)
+        self.mcts.rng.seed(seed)
+        self.mcts.root = None
+
+    def choose(self, game, orientation, time_limit):
+        result = self.mcts.search(game, orientation, time_limit=time_limit)
+        return result.best_move, result.rollouts
+
+
+ENGINES = {
+    "random": RandomPlayer,
+    "greedy": GreedyPlayer,
+    "solver": SolverPlayer,
+    "mcts": MCTSPlayer,
+}
+
+
+def parse_engine(spec):
+    """(name, settings) of an engine spec such as "mcts:policy=random,exploration=1.0"."""
+    name, _, options = spec.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine {name!r} (expected one of {', '.join(sorted(ENGINES))})")
+    settings = {}
+    for option in filter(None, options.split(",")):
+        key, sep, text = option.partition("=")
+        if not sep:
+            raise ValueError(f"engine setting {option!r} is not key=value")
+        settings[key.strip()] = _parse_value(text.strip())
+    return name, settings
+
+
+def _parse_value(text):
+    if text.lower() == "none":
+        return None
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def create_engine(spec):
+    name, settings = parse_engine(spec)
+    return ENGINES[name](**settings)
+
+
+def parse_size(text):
+    rows, cols = (int(n) for n in text.lower().split("x"))
+    return rows, cols
+
+
+# Games
+
+_players = {}
+
+
+def _player(spec):
+    """Engines are built once per worker process and kept between games."""
+    player = _players.get(spec)
+    if player is None:
+        player = _players[spec] = create_engine(spec)
+    return player
+
+
+def play_game(game_id, size, vertical, horizontal, time_limit, seed):
+    """
+    Pool task: play one game and return its record. Engines are looked up by
+    spec in this process; "nodes" and "secs" hold the vertical and horizontal
+    engines' totals.
+    """
+    rows, cols = parse_size(size)
+    game = Game(rows=rows, cols=cols)
+    players = {game.VERTICAL: _player(vertical), game.HORIZONTAL: _player(horizontal)}
+    for offset, player in enumerate(players.values()):
+        player.new_game(seed + offset)
+    nodes = {game.VERTICAL: 0, game.HORIZONTAL: 0}
+    secs = {game.VERTICAL: 0.0, game.HORIZONTAL: 0.0}
+    while game.has_moves(game.current_orientation):
+        orientation = game.current_orientation
+        start = time.perf_counter()
+        (row, col), searched = players[orientation].choose(game, orientation, time_limit)
+        secs[orientation] += time.perf_counter() - start
+        nodes[orientation] += searched
+        if not game.place_domino(row, col):
+            raise RuntimeError(f"{players[orientation]!r} played the illegal move {(row, col)} in game {game_id}")
+        game.toggle_orientation()
+    # The side to move has no placement left and loses
+    winner = "h" if game.current_orientation == game.VERTICAL else "v"
+    return {"id": game_id, "size": size, "v": vertical, "h": horizontal, "w": winner,
+            "plies": len(game.history),
+            "nodes": [nodes[game.VERTICAL], nodes[game.HORIZONTAL]],
+            "secs": [round(secs[game.VERTICAL], 4), round(secs[game.HORIZONTAL], 4)]}
+
+
+def schedule(engines, sizes, games, mode="round-robin"):
+    """
+    Every game of the tournament as (game_id, size, vertical spec, horizontal spec).
+    Ids only depend on the arguments, which is what makes runs resumable.
+    """
+    if mode == "round-robin":
+        pairs = [(a, b) for i, a in enumerate(engines) for b in engines[i + 1:]]
+    elif mode == "gauntlet":
+        pairs = [(engines[0], other) for other in engines[1:]]
+    else:
+        raise ValueError(f"unknown mode {mode!r}")
+    tasks = []
+    for number in range(games):
+        for size in sizes:
+            for a, b in pairs:
+                vertical, horizontal = (a, b) if number % 2 == 0 else (b, a)
+                tasks.append((f"{size}/{a}/{b}/{number}", size, vertical, horizontal))
+    return tasks
+
+
+def read_results(path):
+    """Records already in a results file; a line cut short by an interruption is skipped."""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+class Tournament:
+    """
+    A tournament whose finished games live in `results_path`. run() plays
+    whatever is not in the file yet; ratings() rates everything that is.
+    """
+
+    def __init__(self, engines, sizes=("8x8",), games=2, time_limit=0.1, mode="round-robin",
+                 results_path="tournament.jsonl", workers=None, seed=0):
+        for spec in engines:
+            parse_engine(spec)  # fail before any game is played
+        if len(set(engines)) < 2:
+            raise ValueError("a tournament needs at least two different engines")
+        self.engines = list(engines)
+        self.sizes = list(sizes)
+        self.games = games
+        self.time_limit = time_limit
+        self.mode = mode
+        self.results_path = results_path
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+
+    def pending(self):
+        done = {record["id"] for record in read_results(self.results_path)}
+        return [task for task in schedule(self.engines, self.sizes, self.games, self.mode) if task[0] not in done]
+
+    def run(self, progress=None):
+        """Play the pending games; progress(record, finished, total) is called after each one."""
+        tasks = self.pending()
+        total = len(tasks)
+        if not tasks:
+            return 0
+        finished = 0
+        _end_last_line(self.results_path)
+        with open(self.results_path, "a") as out, ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(play_game, *task, self.time_limit, _game_seed(self.seed, task[0]))
+                       for task in tasks]
+            try:
+                for future in as_completed(futures):
+                    record = future.result()
+                    out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    out.flush()
+                    finished += 1
+                    if progress is not None:
+                        progress(record, finished, total)
+            except BaseException:
+                # Games already written stay; the rest is played on the next run
+                for future in futures:
+                    future.cancel()
+                raise
+        return finished
+
+    def ratings(self, prior=2.0, samples=200):
+        records = [record for record in read_results(self.results_path)
+                   if record["v"] in self.engines and record["h"] in self.engines and record["size"] in self.sizes]
+        return rate(records, prior, samples, self.seed)
+
+
+def _end_last_line(path):
+    """Terminate a line cut short by an interruption, so the next record starts on its own line."""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def _game_seed(seed, game_id):
+    # str hashes are salted per process; this has to be stable across runs
+    value = seed
+    for char in game_id:
+        value = (value * 31 + ord(char)) & 0xFFFFFFFF
+    return value
+
+
+# Ratings
+
+def _bradley_terry(engines, wins, prior, iterations=500):
+    """
+    Elo by maximum likelihood (MM algorithm). wins[a][b] counts a's wins
+    over b; each pair that met gets `prior` virtual draws, so an engine that
+    won or lost every game still gets a finite rating.
+    """
+    index = {engine: i for i, engine in enumerate(engines)}
+    n = len(engines)
+    won = [[0.0] * n for _ in range(n)]
+    for a, row in wins.items():
+        for b, count in row.items():
+            won[index[a]][index[b]] += count
+    for i in range(n):
+        for j in range(n):
+            if i != j and (won[i][j] or won[j][i]):
+                won[i][j] += prior / 2
+    games = [[won[i][j] + won[j][i] for j in range(n)] for i in range(n)]
+    strength = [1.0] * n
+    for _ in range(iterations):
+        updated = []
+        for i in range(n):
+            total = sum(won[i])
+            denominator = sum(games[i][j] / (strength[i] + strength[j]) for j in range(n) if j != i)
+            updated.append(total / denominator if denominator and total else strength[i])
+        mean = math.exp(sum(math.log(s) for s in updated) / n)
+        converged = max(abs(u / mean - s) for u, s in zip(updated, strength)) < 1e-9
+        strength = [u / mean for u in updated]
+        if converged:
+            break
+    # Average rating 0
+    return {engine: 400 * math.log10(strength[index[engine]]) for engine in engines}
+
+
+def rate(records, prior=2.0, samples=200, seed=0):
+    """
+    One dict per engine, best first: games, score, elo with a 95% bootstrap
+    interval (elo_low, elo_high) and nodes_per_second over all its moves.
+    """
+    engines = sorted({record["v"] for record in records} | {record["h"] for record in records})
+    if len(engines) < 2:
+        return []
+
+    def tally(sample):
+        wins = {engine: {} for engine in engines}
+        for record in sample:
+            winner, loser = (record["v"], record["h"]) if record["w"] == "v" else (record["h"], record["v"])
+            wins[winner][loser] = wins[winner].get(loser, 0) + 1
+        return wins
+
+    elo = _bradley_terry(engines, tally(records), prior)
+    rng = random.Random(seed)
+    resampled = {engine: [] for engine in engines}
+    for _ in range(samples):
+        sample = [records[rng.randrange(len(records))] for _ in records]
+        for engine, value in _bradley_terry(engines, tally(sample), prior).items():
+            resampled[engine].append(value)
+
+    table = []
+    for engine in engines:
+        played = [record for record in records if engine in (record["v"], record["h"])]
+        score = sum(1 for record in played if record[record["w"]] == engine)
+        nodes = secs = 0
+        for record in played:
+            side = 0 if record["v"] == engine else 1
+            nodes += record["nodes"][side]
+            secs += record["secs"][side]
+        values = sorted(resampled[engine])
+        table.append({
+            "engine": engine,
+            "games": len(played),
+            "score": score,
+            "elo": round(elo[engine], 1),
+            "elo_low": round(values[int(0.025 * (len(values) - 1))], 1) if values else None,
+            "elo_high": round(values[int(0.975 * (len(values) - 1))], 1) if values else None,
+            "nodes_per_second": round(nodes / secs) if secs else 0,
+        })
+    table.sort(key=lambda row: row["elo"], reverse=True)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine-vs-engine tournament")
+    parser.add_argument("--engines", nargs="+", required=True,
+                        help=f"engine specs, e.g. mcts:policy=random ({', '.join(sorted(ENGINES))})")
+    parser.add_argument("--mode", choices=["round-robin", "gauntlet"], default="round-robin",
+                        help="gauntlet plays the first engine against each of the others")
+    parser.add_argument("--sizes", nargs="+", default=["8x8"], help="board sizes, ROWSxCOLS")
+    parser.add_argument("--games", type=int, default=2, help="games per pairing and size, sides alternating")
+    parser.add_argument("--time", type=float, default=0.1, help="seconds per move")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--results", default="tournament.jsonl", help="results file, appended to and resumed from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the ratings as JSON")
+    args = parser.parse_args()
+
+    try:
+        tournament = Tournament(args.engines, args.sizes, args.games, args.time, args.mode, args.results,
+                                args.workers, args.seed)
+        for size in args.sizes:
+            parse_size(size)
+    except ValueError as error:
+        parser.error(str(error))
+
+    def progress(record, finished, total):
+        winner = record[record["w"]]
+        print(f"[{finished}/{total}] {record['size']} {record['v']} (v) - {record['h']} (h): {winner} "
+              f"wins in {record['plies']} plies", file=sys.stderr)
+
+    try:
+        tournament.run(progress)
+    except KeyboardInterrupt:
+        print("Interrupted; run again with the same arguments to resume", file=sys.stderr)
+    table = tournament.ratings()
+    if args.json:
+        print(json.dumps(table, indent=2))
+        return
+    print(f"{'engine':32} {'games':>6} {'score':>6} {'elo':>8} {'95% interval':>17} {'nodes/s':>10}")
+    for row in table:
+        interval = f"[{row['elo_low']:+.0f}, {row['elo_high']:+.0f}]"
+        print(f"{row['engine']:32} {row['games']:6} {row['score']:6} {row['elo']:+8.1f} {interval:>17} "
+              f"{row['nodes_per_second']:10}")
+
+
+if __name__ == "__main__":
+    main()
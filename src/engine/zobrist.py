@@ -0,0 +1,51 @@
+import random
+from array import array
+
+# Fixed seed so hashes are stable across runs and processes
+ZOBRIST_SEED = 0x0D0E1E7E
+
+_key_cache = {}
+
+
+class ZobristKeys:
+    """
+    64-bit Zobrist keys for a rows x cols board.
+    Only occupancy matters for Domineering, so there is one key per cell,
+    one per domino placement (the XOR of its two cells) and one for the
+    side to move (set when vertical is to move). The keys are packed into
+    unsigned 64-bit arrays, which keeps very large boards small in memory.
+    """
+
+    def __init__(self, rows, cols, seed=ZOBRIST_SEED):
+        rng = random.Random(seed ^ (rows << 16) ^ cols)
+        size = rows * cols
+        self.rows = rows
+        self.cols = cols
+        self.cell = array("Q", (rng.getrandbits(64) for _ in range(size)))
+        self.side = rng.getrandbits(64)
+        self.vertical_move = array("Q", (
+            self.cell[i] ^ self.cell[i + cols] if i + cols < size else 0
+            for i in range(size)
+        ))
+        self.horizontal_move = array("Q", (
+            self.cell[i] ^ self.cell[i + 1] if (i % cols) + 1 < cols else 0
+            for i in range(size)
+        ))
+
+    def hash_position(self, occupied, vertical_to_move):
+        """Hash an occupancy bitboard from scratch."""
+        h = self.side if vertical_to_move else 0
+        cell = self.cell
+        while occupied:
+            low = occupied & -occupied
+            h ^= cell[low.bit_length() - 1]
+            occupied ^= low
+        return h
+
+
+def keys_for(rows, cols):
+    """Shared ZobristKeys for a board shape."""
+    keys = _key_cache.get((rows, cols))
+    if keys is None:
+        keys = _key_cache[(rows, cols)] = ZobristKeys(rows, cols)
+    return keys
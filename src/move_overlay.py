@@ -0,0 +1,122 @@
+import tkinter as tk
+from src.engine.bitboard import popcount
+from src.settings import *
+
+# One hex digit per cell: bit 0 - vertical can still cover it, bit 1 - horizontal can,
+# bit 2 - in a vertical placement that cannot be blocked, bit 3 - same for horizontal
+_PALETTE = {"1": VERTICAL_MOVE_COLOR, "2": HORIZONTAL_MOVE_COLOR, "3": HIGHLIGHT_COLOR,
+            "5": VERTICAL_SAFE_COLOR, "a": HORIZONTAL_SAFE_COLOR}
+_COLORS = {digit: _PALETTE.get(digit, DEAD_CELL_COLOR) for digit in "0123456789abcdef"}
+
+REPAINT_LIMIT = 32  # changed cells beyond which the whole board is recoloured
+REACH = 1  # a cell's colour depends on the cells at most this many rows and columns away
+
+
+class MoveOverlay:
+    """
+    Heatmap of the placements left on a Board, shown as a single image item.
+
+    The colours are kept in a PhotoImage with one pixel per cell; the canvas
+    shows a copy of it scaled up to the cell size by Tk (copy -zoom), for
+    the whole board or, on a large board, the cells in view. After a move
+    only the cells within REACH of the changed ones are recoloured, from the
+    whole-board masks of Game.move_coverage(), and copied again, so the
+    overlay costs nothing while the board does not change.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        game = board.game
+        canvas = board.canvas
+        self.cells = tk.PhotoImage(master=canvas, width=game.cols, height=game.rows)
+        self.image = tk.PhotoImage(master=canvas)
+        self.item = canvas.create_image(0, 0, anchor="nw", image=self.image, tags="overlay")
+        self.region = None  # (first row, end row, first col, end col) shown by self.image
+        self._occupied = game.bitboard.occupied
+        self._paint(0, game.rows, 0, game.cols)
+
+    def update(self):
+        """Recolour the cells around whatever was placed or removed since the last update."""
+        game = self.board.game
+        occupied = game.bitboard.occupied
+        changed = occupied ^ self._occupied
+        self._occupied = occupied
+        if not changed:
+            return
+        if popcount(changed) > REPAINT_LIMIT:
+            self._paint(0, game.rows, 0, game.cols)
+            return
+        masks = game.move_coverage()
+        while changed:
+            low = changed & -changed
+            changed ^= low
+            row, col = divmod(low.bit_length() - 1, game.cols)
+            self._paint(max(0, row - REACH), min(game.rows, row + REACH + 1),
+                        max(0, col - REACH), min(game.cols, col + REACH + 1), masks)
+
+    def place(self, first_row, end_row, first_col, end_col):
+        """Show a block of cells (the whole board, or the view of a large board) at the current cell size."""
+        board = self.board
+        size = board.cell_size
+        self.region = (first_row, end_row, first_col, end_col)
+        self.image.blank()
+        self.image.configure(width=(end_col - first_col) * size, height=(end_row - first_row) * size)
+        board.canvas.coords(self.item, first_col * size, first_row * size)
+        if board.virtual:
+            board.canvas.tag_lower(self.item)  # under the grid lines, which are drawn without fill
+        else:
+            board.canvas.tag_raise(self.item, "grid")  # over the filled squares, under the dominoes
+            self._draw_lines()
+        self._show(*self.region)
+
+    def destroy(self):
+        self.board.canvas.delete("overlay")
+        self.cells = self.image = None
+
+    def _draw_lines(self):
+        """Cell borders over the image, which covers the squares' outlines."""
+        board = self.board
+        canvas, size = board.canvas, board.cell_size
+        rows, cols = board.game.rows, board.game.cols
+        canvas.delete("overlay_lines")
+        for col in range(cols + 1):
+            canvas.create_line(col * size, 0, col * size, rows * size, fill=GRID_COLOR,
+                               tags=("overlay", "overlay_lines"))
+        for row in range(rows + 1):
+            canvas.create_line(0, row * size, cols * size, row * size, fill=GRID_COLOR,
+                               tags=("overlay", "overlay_lines"))
+        canvas.tag_raise("overlay_lines", self.item)
+
+    def _paint(self, first_row, end_row, first_col, end_col, masks=None):
+        """Recolour a block of cells in the one-pixel-per-cell image and show it."""
+        game = self.board.game
+        if masks is None:
+            masks = game.move_coverage()
+        cols = game.cols
+        width = end_col - first_col
+        low = (1 << width) - 1
+        lines = []
+        for row in range(first_row, end_row):
+            shift = row * cols + first_col
+            # Read the row's bits as hex digits so the four masks add up to one digit per cell
+            digits = 0
+            for weight, mask in zip((1, 2, 4, 8), masks):
+                digits += weight * int(format((mask >> shift) & low, f"0{width}b"), 16)
+            codes = format(digits, f"0{width}x")[::-1]
+            lines.append("{" + " ".join(map(_COLORS.__getitem__, codes)) + "}")
+        self.cells.put(" ".join(lines), to=(first_col, first_row))
+        self._show(first_row, end_row, first_col, end_col)
+
+    def _show(self, first_row, end_row, first_col, end_col):
+        """Copy the part of a block of cells that is in self.region to the canvas image, scaled up."""
+        if self.region is None:
+            return
+        region_top, region_bottom, region_left, region_right = self.region
+        top, bottom = max(first_row, region_top), min(end_row, region_bottom)
+        left, right = max(first_col, region_left), min(end_col, region_right)
+        if top >= bottom or left >= right:
+            return
+        size = self.board.cell_size
+        self.image.tk.call(self.image, "copy", self.cells, "-from", left, top, right, bottom,
+                           "-to", (left - region_left) * size, (top - region_top) * size,
+                           "-zoom", size, size)
@@ -1,9 +1,40 @@
 BOARD_SIZE = 8  # Default 8x8 grid
 CELL_SIZE = 64  # Size of each cell in pixels
+VIEWPORT_SIZE = 536  # Boards larger than this (in pixels) are shown through a scrollable, zoomable view
+MIN_CELL_SIZE = 6  # Smallest cell size when zooming out of a large board
+ZOOM_STEP = 1.25  # Cell size factor per zoom step
+MAX_BOARD_SIZE = 1000  # Largest board offered for local games
+PREVIEW_FRAME_MS = 16  # Hover previews are coalesced to one update per ~60 Hz frame
+DISPATCH_INTERVAL_MS = 16  # Network events are handed to the Tk thread once per frame...
+DISPATCH_MAX_BATCH = 64  # ...at most this many per batch, with one redraw after each batch
+AI_POLL_MS = 16  # How often the UI checks for a finished computer move or hint
+ASYNC_STARTUP = True  # Show the window at once and register with DOG on a worker thread
+REGISTER_TIMEOUT_S = 10.0  # ...after which the status bar reports the server as unreachable
+REGISTER_RETRY_S = 2.0  # First wait before registering again after a failure, doubled on each failure...
+REGISTER_RETRY_MAX_S = 60.0  # ...up to this
+METRICS_DUMP_PATH = "domineering-metrics.json"  # Written while metrics are on; a .prom path gives Prometheus text
+METRICS_DUMP_INTERVAL_S = 5.0
+PROFILE_PATH = "domineering-profile.folded"  # Sampled stacks, written when the profiler is turned off
+PROFILE_INTERVAL_S = 0.005
+
+# Computer opponent: level -> (seconds per move, maximum search depth or None)
+AI_LEVELS = {
+    "Fácil": (0.1, 2),
+    "Médio": (0.5, 6),
+    "Difícil": (2.0, None),
+}
+AI_DEFAULT_LEVEL = "Médio"
         
 # Visual settings
 GRID_COLOR = "#cccccc"
 VERTICAL_PLAYER_COLOR = "blue"
 HORIZONTAL_PLAYER_COLOR = "red"
 BG_COLOR = "#2f4255"  # Background color
-# HIGHLIGHT_COLOR = "#ffff99"  # Highlight for valid moves
+HIGHLIGHT_COLOR = "#ffff99"  # Highlight for valid moves (cells both players can still use)
+
+# Move overlay ("Mostrar jogadas possíveis"): one colour per cell
+VERTICAL_MOVE_COLOR = "#d5e2ff"  # only vertical can still use the cell
+HORIZONTAL_MOVE_COLOR = "#ffd9d9"  # only horizontal can still use the cell
+VERTICAL_SAFE_COLOR = "#8fb1ff"  # part of a vertical placement horizontal can never block
+HORIZONTAL_SAFE_COLOR = "#ff9d9d"  # part of a horizontal placement vertical can never block
+DEAD_CELL_COLOR = "#b8b8b8"  # nobody can place a domino there any more
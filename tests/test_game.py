@@ -0,0 +1,160 @@
+import random
+
+import pytest
+
+from src.engine.domineering_game import Game
+
+
+def counters(game):
+    return (dict(game._move_counts), {o: list(lines) for o, lines in game._safe_lines.items()},
+            {o: list(counts) for o, counts in game._safe_counts.items()}, dict(game._safe_totals),
+            list(game._vertical_safe_rows))
+
+
+def rebuilt_counters(game):
+    fresh = game.copy()
+    fresh._rebuild_counters()
+    return counters(fresh)
+
+
+def play_randomly(game, rng, moves):
+    for _ in range(moves):
+        legal = game.legal_moves(game.current_orientation)
+        if not legal:
+            break
+        assert game.place_domino(*rng.choice(legal))
+        game.toggle_orientation()
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 6), (5, 1), (2, 2), (8, 8), (7, 11), (13, 5)])
+def test_counters_match_a_rebuild_through_place_and_undo(rows, cols):
+    rng = random.Random(rows * 100 + cols)
+    for _ in range(10):
+        game = Game(rows=rows, cols=cols)
+        assert counters(game) == rebuilt_counters(game)
+        while game.has_moves(game.current_orientation):
+            play_randomly(game, rng, 1)
+            assert counters(game) == rebuilt_counters(game)
+            if rng.random() < 0.3:
+                game.undo_move()
+                assert counters(game) == rebuilt_counters(game)
+
+
+def test_place_domino_rejects_illegal_moves():
+    game = Game(4)
+    assert not game.place_domino(3, 0)  # vertical off the bottom edge
+    assert game.place_domino(0, 0)
+    assert not game.place_domino(1, 0)  # overlaps
+    game.current_orientation = Game.HORIZONTAL
+    assert not game.place_domino(0, 3)  # horizontal off the right edge
+    assert not game.place_domino(-1, 0)
+    assert game.history == [(0, 0, Game.VERTICAL)]
+
+
+def game_with(*moves):
+    game = Game(4)
+    for row, col, orientation in moves:
+        game.current_orientation = orientation
+        assert game.place_domino(row, col)
+    return game
+
+
+VERTICAL_PAIR = ((0, 0, Game.VERTICAL), (2, 0, Game.VERTICAL))
+HORIZONTAL_PAIR = ((0, 2, Game.HORIZONTAL), (1, 0, Game.HORIZONTAL))
+
+
+@pytest.mark.parametrize("moves, removal", [
+    (VERTICAL_PAIR, (1, 0, Game.VERTICAL)),  # bottom cell of (0, 0) and top cell of (2, 0)
+    (VERTICAL_PAIR, (0, 0, Game.HORIZONTAL)),  # a vertical domino
+    (HORIZONTAL_PAIR, (0, 3, Game.HORIZONTAL)),  # second cell of (0, 2), wrapping onto (1, 0)
+    (HORIZONTAL_PAIR, (0, 2, Game.VERTICAL)),  # a horizontal domino
+    (HORIZONTAL_PAIR, (3, 3, Game.VERTICAL)),  # empty
+])
+def test_remove_domino_rejects_cells_that_are_not_an_anchor(moves, removal):
+    game = game_with(*moves)
+    before = (bytes(game.cells), game.board_hash, list(game.history), game.bitboard.vertical,
+              game.bitboard.horizontal, counters(game))
+    assert not game.remove_domino(*removal)
+    assert (bytes(game.cells), game.board_hash, list(game.history), game.bitboard.vertical,
+            game.bitboard.horizontal, counters(game)) == before
+    assert counters(game) == rebuilt_counters(game)
+
+
+def test_remove_domino_takes_back_any_placed_domino():
+    moves = ((0, 0, Game.VERTICAL), (2, 0, Game.VERTICAL), (0, 2, Game.HORIZONTAL), (1, 1, Game.HORIZONTAL))
+    game = game_with(*moves)
+    game.track_regions()
+    empty_hash = Game(4).board_hash
+    for row, col, orientation in (moves[0], moves[3], moves[1], moves[2]):  # not in placement order
+        assert game.remove_domino(row, col, orientation)
+        assert game.get_cell_state(row, col) is None
+        assert (row, col, orientation) not in game.history
+        assert counters(game) == rebuilt_counters(game)
+        assert not game.remove_domino(row, col, orientation)  # already gone
+    assert game.history == [] and game.board_hash == empty_hash
+    assert bytes(game.cells) == bytes(16) and game.bitboard.occupied == 0
+    assert game.regions.regions == [game.regions.full]
+
+
+def test_undo_and_redo_restore_the_position():
+    rng = random.Random(7)
+    game = Game(6)
+    play_randomly(game, rng, 8)
+    positions = []
+    while game.can_undo():
+        positions.append((game.bitboard.vertical, game.bitboard.horizontal, game.board_hash,
+                          game.current_orientation, bytes(game.cells)))
+        game.undo_move()
+    assert game.bitboard.occupied == 0 and game.board_hash == 0
+    assert game.current_orientation == Game.VERTICAL
+    while game.can_redo():
+        game.redo_move()
+        assert counters(game) == rebuilt_counters(game)
+    assert (game.bitboard.vertical, game.bitboard.horizontal, game.board_hash,
+            game.current_orientation, bytes(game.cells)) == positions[0]
+
+
+def test_a_new_move_discards_the_redo_stack():
+    game = Game(4)
+    game.place_domino(0, 0)
+    game.toggle_orientation()
+    game.undo_move()
+    assert game.can_redo()
+    game.place_domino(2, 2)
+    assert not game.can_redo()
+    assert game.redo_move() is None
+
+
+def test_snapshot_round_trip():
+    rng = random.Random(3)
+    game = Game(rows=7, cols=9)
+    play_randomly(game, rng, 12)
+    data = game.snapshot()
+    loaded, order = Game.from_snapshot(data)
+    assert order == len(game.history)
+    assert (loaded.rows, loaded.cols) == (7, 9)
+    assert loaded.bitboard.vertical == game.bitboard.vertical
+    assert loaded.bitboard.horizontal == game.bitboard.horizontal
+    assert loaded.cells == game.cells
+    assert loaded.board_hash == game.board_hash
+    assert loaded.current_orientation == game.current_orientation
+    assert loaded.history == [] and not loaded.can_undo()
+    assert counters(loaded) == counters(game)
+    assert loaded.snapshot(order) == data
+
+
+def test_load_snapshot_rejects_malformed_data():
+    game = Game(rows=5, cols=6)
+    game.place_domino(0, 0)
+    data = game.snapshot()
+    with pytest.raises(ValueError):
+        Game(rows=6, cols=5).load_snapshot(data)
+    with pytest.raises(ValueError):
+        game.load_snapshot(data[:-1])
+    with pytest.raises(ValueError):
+        game.load_snapshot(data[:5])
+    tampered = bytearray(data)
+    tampered[-1] ^= 1  # a lone horizontal cell, and a hash that no longer matches
+    with pytest.raises(ValueError):
+        game.load_snapshot(bytes(tampered))
+    assert game.history == [(0, 0, Game.VERTICAL)]
@@ -0,0 +1,74 @@
+import base64
+import json
+
+import pytest
+
+from src.engine.move_codec import (MoveFormatError, decode_move, decode_snapshot, encode_move, encode_snapshot,
+                                   parse_move)
+
+
+@pytest.mark.parametrize("row, col, orientation, order, status", [
+    (0, 0, "vertical", 0, "next"),
+    (7, 6, "horizontal", 41, "progress"),
+    (999, 998, "vertical", 2 ** 32 - 1, "finished"),
+    (3, 4, "horizontal", 5, "interrupted"),
+])
+def test_move_round_trip(row, col, orientation, order, status):
+    text = encode_move(row, col, orientation, order, status)
+    assert text.startswith("d1.")
+    assert decode_move(text) == {"row": row, "col": col, "orientation": orientation, "order": order,
+                                 "match_status": status}
+    assert parse_move(text) == decode_move(text)
+
+
+@pytest.mark.parametrize("args", [
+    (0, 0, "diagonal"),
+    (0, 0, "vertical", 0, "paused"),
+    (-1, 0, "vertical"),
+    (70000, 0, "vertical"),
+])
+def test_encode_rejects_bad_moves(args):
+    with pytest.raises(MoveFormatError):
+        encode_move(*args)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "d1.",
+    "d1.AQADAAQAAAA",  # one character short
+    "d1.AQADAAQAAAAHX",  # one character long
+    "d1.AQADAAQAAA!H",  # not base64
+    "x1.AQADAAQAAAAH",
+])
+def test_decode_rejects_malformed_strings(text):
+    with pytest.raises(MoveFormatError):
+        decode_move(text)
+
+
+def test_decode_rejects_unknown_status():
+    text = encode_move(1, 2, "vertical")
+    packed = bytearray(base64.urlsafe_b64decode(text[3:]))
+    packed[0] |= 0b1110  # status 7, past the known ones
+    with pytest.raises(MoveFormatError):
+        decode_move("d1." + base64.urlsafe_b64encode(bytes(packed)).decode("ascii"))
+
+
+def test_parse_move_reads_legacy_json():
+    move = {"row": 2, "col": 3, "orientation": "vertical", "match_status": "next"}
+    assert parse_move(json.dumps(move)) == move
+    assert parse_move(move) is move
+
+
+@pytest.mark.parametrize("payload", ["not json", "[1, 2]", 42, None])
+def test_parse_move_rejects_other_payloads(payload):
+    with pytest.raises(MoveFormatError):
+        parse_move(payload)
+
+
+def test_snapshot_string_round_trip():
+    data = bytes(range(40))
+    assert decode_snapshot(encode_snapshot(data)) == data
+    with pytest.raises(MoveFormatError):
+        decode_snapshot("d1.AQADAAQAAAAH")
+    with pytest.raises(MoveFormatError):
+        decode_snapshot("s1.!!!!")
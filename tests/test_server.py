@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from dog_server.server import DogServer
+from src.engine.domineering_game import Game
+from src.engine.move_codec import decode_snapshot, encode_move
+
+
+@pytest.fixture
+def server():
+    """A server with a match between "a" (vertical, to move) and "b" (horizontal)."""
+    server = DogServer(board_size=4)
+    for player_id in ("a", "b"):
+        assert server.handle("/player/", {"player_id": player_id, "game_id": "g", "player_name": player_id})[0] == 200
+    status, payload = server.handle("/start/", {"player_id": "a"})
+    assert status == 200 and payload["code"] == "2"
+    return server
+
+
+def move(server, player_id, text):
+    return server.handle("/move/", {"player_id": player_id, "move": text})
+
+
+def board(server):
+    game, _ = Game.from_snapshot(decode_snapshot(server.handle("/match/sync/", {"player_id": "a"})[1]["snapshot"]))
+    return game
+
+
+def test_legal_moves_are_played_and_published(server):
+    assert move(server, "a", encode_move(0, 0, "vertical")) == (200, {"message": "ok"})
+    assert move(server, "b", json.dumps({"row": 0, "col": 1, "orientation": "horizontal",
+                                         "match_status": "next"}))[0] == 200
+    game = board(server)
+    assert game.get_cell_state(1, 0) == Game.VERTICAL
+    assert game.get_cell_state(0, 2) == Game.HORIZONTAL
+    assert game.current_orientation == Game.VERTICAL
+    status, payload = server.handle("/match/", {"player_id": "a"})
+    assert payload["0"] == "b" and json.loads(payload["1"])["order"] == 2
+
+
+def test_moves_out_of_turn_are_refused(server):
+    assert move(server, "b", encode_move(0, 0, "horizontal"))[0] == 409
+    assert board(server).bitboard.occupied == 0
+
+
+@pytest.mark.parametrize("text", [
+    encode_move(0, 0, "horizontal"),  # the other player's orientation
+    encode_move(3, 0, "vertical"),  # off the board
+    encode_move(40, 40, "vertical"),
+    json.dumps({"row": "x", "col": 0, "match_status": "next"}),
+])
+def test_illegal_placements_are_refused(server, text):
+    status, _ = move(server, "a", text)
+    assert status == 400
+    assert board(server).bitboard.occupied == 0
+    assert move(server, "a", encode_move(0, 0, "vertical"))[0] == 200  # still a's turn
+
+
+def test_overlapping_placement_is_refused(server):
+    assert move(server, "a", encode_move(0, 0, "vertical"))[0] == 200
+    assert move(server, "b", encode_move(1, 0, "horizontal"))[0] == 400
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "not a move",
+    "[1, 2]",
+    json.dumps({"row": 0, "col": 0, "match_status": "later"}),
+    json.dumps({"orientation": "vertical", "match_status": "next"}),  # no placement
+    json.dumps({"row": 0, "match_status": "progress"}),
+])
+def test_malformed_moves_are_refused(server, text):
+    assert move(server, "a", text)[0] == 400
+    assert server.handle("/match/", {"player_id": "b"}) == (200, {})
+
+
+def test_withdrawal_needs_no_placement_and_ends_the_match(server):
+    assert move(server, "b", json.dumps({"match_status": "interrupted"}))[0] == 200
+    assert server.matches_finished == 1
+    assert move(server, "a", encode_move(0, 0, "vertical")) == (400, {"message": "Partida encerrada"})
+
+
+def test_players_outside_a_match_cannot_move():
+    server = DogServer()
+    assert move(server, "nobody", encode_move(0, 0, "vertical"))[0] == 400
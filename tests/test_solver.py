@@ -0,0 +1,52 @@
+from functools import lru_cache
+
+import pytest
+
+from src.engine.bitboard import Bitboard, iter_bits
+from src.engine.domineering_game import Game
+from src.engine.solver import Solver
+
+
+def brute_force(rows, cols, vertical=True):
+    """Plain minimax over the bitboards: 'win' or 'loss' for the side to move on an empty board."""
+    board = Bitboard(rows, cols)
+
+    @lru_cache(maxsize=None)
+    def wins(occupied, vertical):
+        pair = board.vertical_pair if vertical else board.horizontal_pair
+        return any(not wins(occupied | (pair << move), not vertical)
+                   for move in iter_bits(board.moves(vertical, occupied)))
+
+    return "win" if wins(0, vertical) else "loss"
+
+
+@pytest.mark.parametrize("rows", range(1, 5))
+@pytest.mark.parametrize("cols", range(1, 6))
+def test_small_boards_match_brute_force(rows, cols):
+    result = Solver(tt_bits=16).solve(Game(rows=rows, cols=cols))
+    assert result.exact
+    assert result.outcome == brute_force(rows, cols)
+
+
+# Published values: the first player wins 4x4 and loses 5x5
+@pytest.mark.parametrize("size, outcome", [(4, "win"), (5, "loss")])
+def test_known_square_boards(size, outcome):
+    result = Solver(tt_bits=16).solve(Game(size))
+    assert result.exact
+    assert result.outcome == outcome
+
+
+def test_winning_move_leaves_a_lost_position():
+    game = Game(4)
+    result = Solver(tt_bits=16).solve(game)
+    assert result.outcome == "win"
+    assert game.place_domino(*result.best_move)
+    game.toggle_orientation()
+    reply = Solver(tt_bits=16).solve(game)
+    assert reply.exact and reply.outcome == "loss"
+
+
+def test_side_to_move_can_be_given():
+    game = Game(rows=2, cols=1)
+    assert Solver().solve(game, Game.HORIZONTAL).outcome == "loss"
+    assert Solver().solve(game, Game.VERTICAL).outcome == "win"